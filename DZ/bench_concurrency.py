@@ -0,0 +1,66 @@
+# bench_concurrency.py
+# Нагрузочный тест: N процессов одновременно пишут в один tasks.json.
+# Запуск: python bench_concurrency.py [операций на процесс] [число процессов ...]
+#         (по умолчанию 500 операций и 1 2 4 8 процессов)
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from multiprocessing import Pool
+
+from main import TaskManager
+from storage import FsyncPolicy, JournalStorage
+
+
+def open_manager(filename):
+    return TaskManager(filename, storage=JournalStorage(filename, compact_every=1000, fsync=FsyncPolicy.NEVER))
+
+
+def worker(args):
+    filename, worker_id, operations = args
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        manager = open_manager(filename)
+        created = []
+        for i in range(operations):
+            manager.add_task(f"Процесс {worker_id}, задача {i}")
+            created.append(manager.next_id - 1)
+            if i % 2:
+                manager.complete_task(created[i - 1])
+        manager.close()
+    return created
+
+
+def bench(processes, operations, tmpdir):
+    filename = os.path.join(tmpdir, f"tasks_{processes}.json")
+    start = time.perf_counter()
+    with Pool(processes) as pool:
+        results = pool.map(worker, [(filename, n, operations) for n in range(processes)])
+    elapsed = time.perf_counter() - start
+
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        manager = open_manager(filename)
+    ids = [task_id for created in results for task_id in created]
+    total = processes * operations
+    completed = processes * (operations // 2)
+    consistent = (len(set(ids)) == total and manager.count_tasks() == (total, completed)
+                  and sorted(manager.tasks) == sorted(ids))
+    manager.close()
+
+    # Каждая итерация - add, каждая вторая ещё и complete
+    ops = processes * (operations + operations // 2)
+    print(f"{processes:>9} {ops:>9} {elapsed:9.3f} {ops / elapsed:11.0f} {'да' if consistent else 'НЕТ':>14}")
+    return consistent
+
+
+def main():
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    counts = [int(arg) for arg in sys.argv[2:]] or [1, 2, 4, 8]
+    print(f"{'процессов':>9} {'операций':>9} {'время,с':>9} {'операций/с':>11} {'согласованно':>14}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        ok = all([bench(processes, operations, tmpdir) for processes in counts])
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
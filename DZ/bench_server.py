@@ -0,0 +1,95 @@
+# bench_server.py
+# Генератор нагрузки для server.py: поднимает сервер на свободном порту
+# во временном каталоге и гоняет смешанные запросы с нескольких соединений.
+# Запуск: python bench_server.py [соединений] [запросов на соединение] [fsync]
+#         (по умолчанию 32 соединения, 200 запросов, fsync=always)
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from http_client import request
+
+
+async def client(port, requests, latencies, rng):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    created = []
+    for i in range(requests):
+        roll = rng.random()
+        start = time.perf_counter()
+        if roll < 0.5 or not created:
+            status, task = await request(reader, writer, "POST", "/tasks", {'description': f"Задача {i}"})
+            created.append(task['id'])
+        elif roll < 0.7:
+            status, _ = await request(reader, writer, "POST", f"/tasks/{created.pop()}/complete")
+        elif roll < 0.9:
+            status, _ = await request(reader, writer, "GET", "/tasks?status=pending&limit=20")
+        else:
+            status, _ = await request(reader, writer, "GET", "/stats")
+        latencies.append(time.perf_counter() - start)
+        assert status in (200, 201), status
+    writer.close()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_server(port):
+    for _ in range(100):
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.05)
+    raise RuntimeError("сервер не запустился")
+
+
+async def run(port, connections, requests):
+    await wait_for_server(port)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, requests, latencies, random.Random(n)) for n in range(connections)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    _, stats = await request(reader, writer, "GET", "/stats")
+    writer.close()
+    return elapsed, sorted(latencies), stats
+
+
+def main():
+    connections = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    fsync = sys.argv[3] if len(sys.argv) > 3 else "always"
+    port = free_port()
+    server_py = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        server = subprocess.Popen([sys.executable, server_py, "--port", str(port), "--fsync", fsync,
+                                   "--file", os.path.join(tmpdir, "tasks.json")], stdout=subprocess.DEVNULL)
+        try:
+            elapsed, latencies, stats = asyncio.run(run(port, connections, requests))
+        finally:
+            server.terminate()
+            server.wait()
+
+    total = len(latencies)
+    p50 = latencies[total // 2] * 1000
+    p99 = latencies[min(total - 1, int(total * 0.99))] * 1000
+    print(f"соединений: {connections}, запросов: {total}, fsync: {fsync}")
+    print(f"запросов/с: {total / elapsed:.0f}")
+    print(f"задержка p50: {p50:.2f} мс, p99: {p99:.2f} мс")
+    print(f"изменений: {stats['writes']} в {stats['batches']} групповых коммитах "
+          f"(в среднем {stats['writes'] / max(stats['batches'], 1):.1f} на коммит)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# bench_storage.py
+# Сравнение форматов файла задач: время сохранения, загрузки и размер.
+# Запуск: python bench_storage.py [число задач ...]   (по умолчанию 10000 100000 1000000)
+import os
+import sys
+import tempfile
+import time
+
+from formats import FileFormat
+from stats import TaskStats
+from storage import FORMAT_VERSION, FsyncPolicy, JsonFileStorage
+
+
+def make_state(count):
+    tasks = []
+    for i in range(1, count + 1):
+        completed = i % 3 == 0
+        tasks.append({
+            'id': i,
+            'description': f"Задача номер {i}: подготовить отчёт по лабораторной работе",
+            'created': "2025-12-22 13:05:30",
+            'completed': completed,
+            'completed_at': "2025-12-23 09:15:00" if completed else None
+        })
+    return {
+        'version': FORMAT_VERSION,
+        'next_id': count + 1,
+        'tasks': tasks,
+        'stats': TaskStats.from_tasks(tasks).to_dict()
+    }
+
+
+def bench(count, tmpdir):
+    state = make_state(count)
+    for file_format in FileFormat:
+        filename = os.path.join(tmpdir, f"tasks_{count}.{file_format.value}")
+        storage = JsonFileStorage(filename, fsync=FsyncPolicy.NEVER, file_format=file_format)
+
+        start = time.perf_counter()
+        storage.save(state)
+        save_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        loaded = JsonFileStorage(filename).load()
+        load_time = time.perf_counter() - start
+        assert len(loaded['tasks']) == count
+
+        size = os.path.getsize(filename)
+        os.remove(filename)
+        print(f"{count:>9} {file_format.value:>8} {save_time:9.3f} {load_time:9.3f} {size / 2 ** 20:10.2f}")
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000]
+    print(f"{'задач':>9} {'формат':>8} {'запись,с':>9} {'чтение,с':>9} {'размер,МБ':>10}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for count in counts:
+            bench(count, tmpdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# formats.py
+import json
+import struct
+import sys
+from array import array
+from enum import Enum
+
+# Двоичный формат: сигнатура, затем заголовок '<HQI' (версия, next_id, число задач),
+# статистика (длина + JSON) и столбцы: id (int64), completed (байт),
+# created и completed_at (по 19 ASCII-символов, нули - нет значения),
+# длины описаний в символах (uint32) и все описания одной строкой UTF-8.
+BINARY_MAGIC = b"DZTASKS\x00"
+BINARY_VERSION = 1
+HEADER = struct.Struct('<HQI')
+LENGTH = struct.Struct('<I')
+TIME_WIDTH = 19
+NO_TIME = b"\x00" * TIME_WIDTH
+
+
+class FileFormat(Enum):
+    JSON = "json"        # с отступами, удобно читать глазами
+    COMPACT = "compact"  # JSON без отступов и пробелов
+    BINARY = "binary"    # столбцовый двоичный формат с заголовком версии
+
+
+def detect_format(data):
+    return FileFormat.BINARY if data.startswith(BINARY_MAGIC) else FileFormat.JSON
+
+
+def encode_state(state, file_format):
+    file_format = FileFormat(file_format)
+    if file_format == FileFormat.JSON:
+        return json.dumps(state, ensure_ascii=False, indent=2).encode('utf-8')
+    if file_format == FileFormat.COMPACT:
+        return json.dumps(state, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return encode_binary(state)
+
+
+def decode_state(data):
+    """Разбирает содержимое файла любого формата; ValueError при повреждении"""
+    if detect_format(data) == FileFormat.BINARY:
+        try:
+            return decode_binary(data)
+        except (struct.error, IndexError, UnicodeDecodeError) as e:
+            raise ValueError(f"повреждённый двоичный файл задач: {e}") from e
+    return json.loads(data)
+
+
+def _column(typecode, values):
+    column = array(typecode, values)
+    if sys.byteorder != 'little':
+        column.byteswap()
+    return column.tobytes()
+
+
+def encode_binary(state):
+    tasks = state['tasks']
+    created = "".join(t['created'] for t in tasks).encode('ascii')
+    if len(created) != TIME_WIDTH * len(tasks):
+        raise ValueError("время создания должно быть в формате 'YYYY-MM-DD HH:MM:SS'")
+    stats = json.dumps(state['stats'], ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    parts = [
+        BINARY_MAGIC,
+        HEADER.pack(BINARY_VERSION, state['next_id'], len(tasks)),
+        LENGTH.pack(len(stats)), stats,
+        _column('q', [t['id'] for t in tasks]),
+        bytes(1 if t['completed'] else 0 for t in tasks),
+        created,
+        b"".join(t['completed_at'].encode('ascii') if t['completed_at'] else NO_TIME for t in tasks),
+        _column('I', [len(t['description']) for t in tasks]),
+        "".join(t['description'] for t in tasks).encode('utf-8'),
+    ]
+    return b"".join(parts)
+
+
+def decode_binary(data):
+    view = memoryview(data)
+    pos = len(BINARY_MAGIC)
+    version, next_id, count = HEADER.unpack_from(view, pos)
+    if version != BINARY_VERSION:
+        raise ValueError(f"неизвестная версия двоичного формата: {version}")
+    pos += HEADER.size
+
+    (stats_len,) = LENGTH.unpack_from(view, pos)
+    pos += LENGTH.size
+    stats = json.loads(bytes(view[pos:pos + stats_len]))
+    pos += stats_len
+
+    def column(typecode, size):
+        nonlocal pos
+        values = array(typecode)
+        values.frombytes(view[pos:pos + size * count])
+        if sys.byteorder != 'little':
+            values.byteswap()
+        pos += size * count
+        return values
+
+    ids = column('q', 8)
+    completed = bytes(view[pos:pos + count])
+    pos += count
+    created = bytes(view[pos:pos + TIME_WIDTH * count]).decode('ascii')
+    pos += TIME_WIDTH * count
+    completed_at = bytes(view[pos:pos + TIME_WIDTH * count]).decode('ascii')
+    pos += TIME_WIDTH * count
+    lengths = column('I', 4)
+    descriptions = bytes(view[pos:]).decode('utf-8')
+    if len(ids) != count or len(lengths) != count or sum(lengths) != len(descriptions):
+        raise ValueError("повреждённый двоичный файл задач: не совпадают размеры столбцов")
+
+    tasks = []
+    start = 0
+    for i in range(count):
+        end = start + lengths[i]
+        at = completed_at[i * TIME_WIDTH:(i + 1) * TIME_WIDTH]
+        tasks.append({
+            'id': ids[i],
+            'description': descriptions[start:end],
+            'created': created[i * TIME_WIDTH:(i + 1) * TIME_WIDTH],
+            'completed': bool(completed[i]),
+            'completed_at': None if at[0] == "\x00" else at
+        })
+        start = end
+
+    return {'next_id': next_id, 'tasks': tasks, 'stats': stats}
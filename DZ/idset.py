@@ -0,0 +1,67 @@
+# idset.py
+from bisect import bisect_left, bisect_right, insort
+
+
+class IdSet:
+    """Отсортированное множество id задач для keyset-пагинации.
+
+    Id лежат в блоках по диапазону значений (id // BLOCK), номера
+    непустых блоков хранятся отсортированными. Добавление и удаление
+    затрагивают один блок, а id после курсора находятся бисекцией по
+    номерам блоков: O(log n + k), сколько бы id ни было удалено или
+    отфильтровано перед ними.
+    """
+
+    BLOCK = 256
+
+    def __init__(self, ids=()):
+        self._blocks = {}  # номер блока -> отсортированный список id
+        self._keys = []    # номера непустых блоков по возрастанию
+        self._len = 0
+        for task_id in ids:
+            self.add(task_id)
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, task_id):
+        block = self._blocks.get(task_id // self.BLOCK, ())
+        i = bisect_left(block, task_id)
+        return i < len(block) and block[i] == task_id
+
+    def add(self, task_id):
+        key = task_id // self.BLOCK
+        block = self._blocks.get(key)
+        if block is None:
+            self._blocks[key] = [task_id]
+            insort(self._keys, key)
+        elif block[-1] < task_id:
+            # Обычный случай: новые id больше всех прежних
+            block.append(task_id)
+        else:
+            i = bisect_left(block, task_id)
+            if i < len(block) and block[i] == task_id:
+                return
+            block.insert(i, task_id)
+        self._len += 1
+
+    def discard(self, task_id):
+        key = task_id // self.BLOCK
+        block = self._blocks.get(key)
+        if block is None:
+            return
+        i = bisect_left(block, task_id)
+        if i < len(block) and block[i] == task_id:
+            del block[i]
+            self._len -= 1
+            if not block:
+                del self._blocks[key]
+                del self._keys[bisect_left(self._keys, key)]
+
+    def after(self, task_id):
+        """Id больше task_id по возрастанию"""
+        i = bisect_left(self._keys, (task_id + 1) // self.BLOCK)
+        while i < len(self._keys):
+            block = self._blocks[self._keys[i]]
+            yield from block[bisect_right(block, task_id):]
+            i += 1
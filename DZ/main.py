@@ -1,85 +1,352 @@
-import json
+import argparse
 import os
-from datetime import datetime
+import sqlite3
+import sys
+from contextlib import contextmanager
+from itertools import islice
+from formats import FileFormat
+from idset import IdSet
+from search import SearchIndex, fold, tokenize
+from stats import TaskStats, day_start, per_hour
+from storage import FORMAT_VERSION, FsyncPolicy, JsonFileStorage, JournalStorage
+from task import Task, format_time, now
+
+
+PAGE_SIZE = 20
+
+
+def format_task(task):
+    status = "✅" if task.completed else "⏳"
+    text = f"{task.id}. {status} {task.description}\n   📅 Создана: {task.created_str}\n"
+    if task.completed:
+        text += f"   🏁 Завершена: {task.completed_at_str}\n"
+    return text + "-" * 50 + "\n"
 
 
 class TaskManager:
-    def __init__(self, filename="tasks.json"):
+    def __init__(self, filename="tasks.json", storage=None):
         self.filename = filename
-        self.tasks = self.load_tasks()
+        self.storage = storage or JsonFileStorage(filename)
+        # Индекс id -> Task; порядок вставки совпадает с порядком создания
+        self.tasks = {}
+        # Отсортированные id всех и невыполненных задач - для постраничного вывода
+        self.task_ids = IdSet()
+        self.pending_ids = IdSet()
+        # Id никогда не переиспользуются и не перенумеровываются
+        self.next_id = 1
+        # Счётчики обновляются на каждом изменении и сохраняются вместе с задачами
+        self.stats = TaskStats()
+        # Отложенные записи внутри batch()
+        self._batch_depth = 0
+        self._pending = []
+        # Поисковый индекс строится при первом поиске и дальше обновляется
+        self.search_index = None
+        self.load_tasks()
 
     def load_tasks(self):
-        if os.path.exists(self.filename):
-            try:
-                with open(self.filename, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                return []
-        return []
-
-    def save_tasks(self):
-        with open(self.filename, 'w', encoding='utf-8') as f:
-            json.dump(self.tasks, f, ensure_ascii=False, indent=2)
-
-    def add_task(self, description):
-        task = {
-            'id': len(self.tasks) + 1,
-            'description': description,
-            'created': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'completed': False,
-            'completed_at': None
-        }
-        self.tasks.append(task)
-        self.save_tasks()
-        print(f"✅ Задача добавлена (ID: {task['id']})")
+        self._set_state(self.storage.load())
+        return self.tasks
+
+    def _set_state(self, state):
+        self.tasks = {data['id']: Task.from_dict(data) for data in state['tasks']}
+        self.task_ids = IdSet(self.tasks)
+        self.pending_ids = IdSet(task.id for task in self.tasks.values() if not task.completed)
+        self.next_id = state['next_id']
+        self.stats = TaskStats.from_dict(state['stats'])
+        self.search_index = None
+
+    def refresh(self):
+        """Подтягивает изменения, сделанные другими процессами"""
+        self.storage.acquire()
+        try:
+            self._refresh()
+        finally:
+            self.storage.release()
 
-    def show_tasks(self, show_all=True):
-        if not self.tasks:
-            print("📭 Список задач пуст")
+    def _refresh(self):
+        change = self.storage.refresh()
+        if change is None:
+            return
+        kind, data = change
+        if kind == 'state':
+            self._set_state(data)
+        else:
+            for record in data:
+                self._apply_record(record)
+
+    def _apply_record(self, record):
+        """Применяет запись журнала другого процесса к задачам в памяти"""
+        data = record['task']
+        old = self.tasks.get(data['id'])
+        if record['op'] == 'delete':
+            if old is not None:
+                del self.tasks[old.id]
+                self.task_ids.discard(old.id)
+                self.pending_ids.discard(old.id)
+                self.stats.on_delete(old.completed)
+                if self.search_index is not None:
+                    self.search_index.remove(old.id, old.description)
             return
 
-        print("\n" + "=" * 50)
-        print("📋 СПИСОК ЗАДАЧ")
-        print("=" * 50)
+        task = Task.from_dict(data)
+        self.tasks[task.id] = task
+        self.task_ids.add(task.id)
+        if task.completed:
+            self.pending_ids.discard(task.id)
+        else:
+            self.pending_ids.add(task.id)
+        self.next_id = max(self.next_id, task.id + 1)
+        if old is None:
+            self.stats.on_add(task.created_day)
+            if self.search_index is not None:
+                self.search_index.add(task.id, task.description)
+        if task.completed and not (old is not None and old.completed):
+            self.stats.on_complete(task.completed_day)
+
+    def snapshot(self):
+        return {
+            'version': FORMAT_VERSION,
+            'next_id': self.next_id,
+            'tasks': [task.to_dict() for task in self.tasks.values()],
+            'stats': self.stats.to_dict()
+        }
 
-        for task in self.tasks:
-            if not show_all and task['completed']:
-                continue
+    def save_tasks(self):
+        with self.batch():
+            self.storage.save(self.snapshot())
+
+    def close(self):
+        self.storage.close()
+
+    @contextmanager
+    def batch(self):
+        """Группирует изменения: всё, что сделано внутри блока, сохраняется
+        одной записью при выходе из самого внешнего batch().
+
+        Самый внешний batch() держит блокировку хранилища и сначала
+        подтягивает чужие изменения, так что другие процессы не затираются.
+        Если блок завершился исключением (или запись не удалась), отложенные
+        записи отбрасываются, а задачи в памяти откатываются к хранилищу.
+        """
+        if self._batch_depth == 0:
+            self._begin()
+        self._batch_depth += 1
+        failed = True
+        try:
+            yield self
+            failed = False
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                try:
+                    if not failed:
+                        try:
+                            self.flush()
+                        except BaseException:
+                            self._rollback()
+                            raise
+                    else:
+                        self._rollback()
+                finally:
+                    self._end()
+
+    def _begin(self):
+        self.storage.acquire()
+        try:
+            self._refresh()
+        except BaseException:
+            self.storage.release()
+            raise
+
+    def _end(self):
+        self.storage.release()
+
+    def _rollback(self):
+        # В хранилище ничего не попало - перечитываем его вместо своих изменений
+        self._pending = []
+        self._set_state(self.storage.load())
+
+    def flush(self):
+        if self._pending:
+            records, self._pending = self._pending, []
+            self.storage.log_many(records, self.snapshot)
+
+    def _log(self, op, task):
+        if self._batch_depth:
+            self._pending.append({'op': op, 'task': task.to_dict()})
+        else:
+            self.storage.log(op, task.to_dict(), self.snapshot)
+
+    def get_task(self, task_id):
+        return self.tasks.get(task_id)
+
+    def iter_tasks(self, show_all=True):
+        for task in self.tasks.values():
+            if show_all or not task.completed:
+                yield task
+
+    def page_tasks(self, show_all=True, page_size=PAGE_SIZE, after_id=0):
+        """Страница задач с id > after_id (keyset-курсор по id).
+
+        Возвращает (задачи, курсор следующей страницы или None). Id берутся
+        из отсортированного множества всех или невыполненных задач:
+        O(log n + page_size), сколько бы задач ни было удалено или выполнено
+        перед курсором. Курсор возвращается, только если после страницы
+        есть ещё хотя бы одна подходящая задача.
+        """
+        if page_size < 1:
+            raise ValueError("размер страницы должен быть положительным")
+        ids = self.task_ids if show_all else self.pending_ids
+        found = list(islice(ids.after(after_id), page_size + 1))
+        page = [self.tasks[task_id] for task_id in found[:page_size]]
+        cursor = page[-1].id if len(found) > page_size else None
+        return page, cursor
+
+    def search_tasks(self, query, limit=None):
+        """Задачи, в описании которых есть все слова запроса (по префиксу, без учёта регистра)"""
+        if self.search_index is None:
+            self.search_index = SearchIndex.from_tasks(self.tasks.values())
+        ids = self.search_index.search(query)
+        return [self.tasks[task_id] for task_id in ids[:limit]]
+
+    def count_tasks(self):
+        """Возвращает (всего, выполнено)"""
+        return self.stats.total, self.stats.completed
+
+    def activity(self, since):
+        """Возвращает (создано, выполнено) начиная с дня since ('YYYY-MM-DD')"""
+        return self.stats.activity(since)
+
+    # --- изменения без вывода на экран (для сервера и пакетных операций) ---
+
+    def insert_task(self, description, created):
+        """Добавляет задачу; внутри batch() запись в хранилище откладывается"""
+        task = Task(self.next_id, description, created)
+        self.tasks[task.id] = task
+        self.task_ids.add(task.id)
+        self.pending_ids.add(task.id)
+        self.next_id += 1
+        self.stats.on_add(task.created_day)
+        if self.search_index is not None:
+            self.search_index.add(task.id, description)
+        self._log('add', task)
+        return task
+
+    def mark_completed(self, task, completed_at):
+        """Отмечает задачу выполненной (проверка, что она ещё не выполнена, - на вызывающем)"""
+        task.completed = True
+        task.completed_at = completed_at
+        self.pending_ids.discard(task.id)
+        self.stats.on_complete(task.completed_day)
+        self._log('update', task)
+
+    def remove_task(self, task_id):
+        """Удаляет задачу и возвращает её; None, если такой нет"""
+        task = self.tasks.pop(task_id, None)
+        if task is not None:
+            self.task_ids.discard(task_id)
+            self.pending_ids.discard(task_id)
+            self.stats.on_delete(task.completed)
+            if self.search_index is not None:
+                self.search_index.remove(task_id, task.description)
+            self._log('delete', task)
+        return task
 
-            status = "✅" if task['completed'] else "⏳"
-            print(f"{task['id']}. {status} {task['description']}")
-            print(f"   📅 Создана: {task['created']}")
-            if task['completed']:
-                print(f"   🏁 Завершена: {task['completed_at']}")
-            print("-" * 50)
+    def add_task(self, description):
+        with self.batch():
+            task = self.insert_task(description, now())
+        print(f"✅ Задача добавлена (ID: {task.id})")
+
+    def add_tasks(self, descriptions):
+        """Добавляет задачи пачкой с одним сохранением"""
+        created = now()
+        with self.batch():
+            tasks = [self.insert_task(description, created) for description in descriptions]
+        print(f"✅ Добавлено задач: {len(tasks)}")
+        return tasks
+
+    def complete_tasks(self, task_ids):
+        """Отмечает задачи выполненными, несуществующие и уже выполненные пропускает"""
+        completed_at = now()
+        count = 0
+        with self.batch():
+            for task_id in task_ids:
+                task = self.get_task(task_id)
+                if task is not None and not task.completed:
+                    self.mark_completed(task, completed_at)
+                    count += 1
+        print(f"✅ Отмечено выполненными: {count}")
+        return count
+
+    def delete_tasks(self, task_ids):
+        """Удаляет задачи пачкой, несуществующие id пропускает"""
+        with self.batch():
+            count = sum(1 for task_id in task_ids if self.remove_task(task_id) is not None)
+        print(f"🗑️ Удалено задач: {count}")
+        return count
+
+    def show_tasks(self, show_all=True, page_size=None, after_id=0):
+        """Выводит задачи постранично, каждая страница - одна запись в stdout.
+
+        Без page_size выводит все задачи (страницами по PAGE_SIZE), иначе -
+        одну страницу после задачи after_id. Возвращает курсор следующей
+        страницы или None.
+        """
+        if after_id == 0:
+            self.refresh()
+        if not self.count_tasks()[0]:
+            print("📭 Список задач пуст")
+            return None
+
+        if after_id == 0:
+            sys.stdout.write("\n" + "=" * 50 + "\n📋 СПИСОК ЗАДАЧ\n" + "=" * 50 + "\n")
+
+        while True:
+            tasks, cursor = self.page_tasks(show_all, page_size or PAGE_SIZE, after_id)
+            sys.stdout.write("".join(format_task(task) for task in tasks))
+            sys.stdout.flush()
+            if page_size or cursor is None:
+                return cursor
+            after_id = cursor
+
+    def search(self, query, limit=PAGE_SIZE):
+        self.refresh()
+        tasks = self.search_tasks(query, limit + 1)
+        if not tasks:
+            print(f"🔍 По запросу «{query}» ничего не найдено")
+            return []
+
+        text = "\n" + "=" * 50 + f"\n🔎 ПОИСК: {query}\n" + "=" * 50 + "\n"
+        text += "".join(format_task(task) for task in tasks[:limit])
+        if len(tasks) > limit:
+            text += f"… показаны первые {limit}, уточните запрос\n"
+        sys.stdout.write(text)
+        sys.stdout.flush()
+        return tasks[:limit]
 
     def complete_task(self, task_id):
-        for task in self.tasks:
-            if task['id'] == task_id:
-                if task['completed']:
-                    print(f"⚠️ Задача {task_id} уже выполнена")
-                    return
-                task['completed'] = True
-                task['completed_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                self.save_tasks()
-                print(f"✅ Задача {task_id} отмечена как выполненная")
+        with self.batch():
+            task = self.get_task(task_id)
+            if task is None:
+                print(f"❌ Задача с ID {task_id} не найдена")
+                return
+            if task.completed:
+                print(f"⚠️ Задача {task_id} уже выполнена")
                 return
-        print(f"❌ Задача с ID {task_id} не найдена")
+            self.mark_completed(task, now())
+        print(f"✅ Задача {task_id} отмечена как выполненная")
 
     def delete_task(self, task_id):
-        for i, task in enumerate(self.tasks):
-            if task['id'] == task_id:
-                deleted_task = self.tasks.pop(i)
-                for j, t in enumerate(self.tasks[i:], start=i):
-                    t['id'] = j + 1
-                self.save_tasks()
-                print(f"🗑️ Задача удалена: {deleted_task['description']}")
-                return
-        print(f"❌ Задача с ID {task_id} не найдена")
+        with self.batch():
+            deleted_task = self.remove_task(task_id)
+        if deleted_task is None:
+            print(f"❌ Задача с ID {task_id} не найдена")
+            return
+        print(f"🗑️ Задача удалена: {deleted_task.description}")
 
     def get_statistics(self):
-        total = len(self.tasks)
-        completed = sum(1 for task in self.tasks if task['completed'])
+        self.refresh()
+        total, completed = self.count_tasks()
         pending = total - completed
 
         print("\n" + "=" * 50)
@@ -88,9 +355,221 @@ class TaskManager:
         print(f"📋 Всего задач: {total}")
         print(f"✅ Выполнено: {completed} ({completed / total * 100:.1f}%)" if total > 0 else "✅ Выполнено: 0")
         print(f"⏳ Осталось: {pending} ({pending / total * 100:.1f}%)" if total > 0 else "⏳ Осталось: 0")
+        print("-" * 50)
+        for title, days in (("Сегодня", 1), ("За 7 дней", 7)):
+            created, done = self.activity(day_start(days - 1))
+            print(f"📈 {title}: создано {created}, выполнено {done} ({per_hour(done, days):.2f} в час)")
         print("=" * 50)
 
 
+class SqliteTaskManager(TaskManager):
+    """TaskManager поверх локальной базы SQLite.
+
+    Задачи не держатся в памяти: выборки и статистика - запросы по
+    индексам на completed и created. База в режиме WAL, все запросы
+    параметризованы, поэтому sqlite3 переиспользует подготовленные выражения.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS tasks ("
+        " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " description TEXT NOT NULL,"
+        " created TEXT NOT NULL,"
+        " completed INTEGER NOT NULL DEFAULT 0,"
+        " completed_at TEXT,"
+        " folded TEXT NOT NULL DEFAULT '')",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks (completed)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks (created)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_completed_at ON tasks (completed_at)",
+    )
+
+    # Полнотекстовый индекс FTS5 по колонке folded (описание, приведённое
+    # search.fold), синхронизируется триггерами. Текст уже нормализован так
+    # же, как в SearchIndex, поэтому токенизатор ничего не складывает сам
+    FTS_SCHEMA = (
+        "CREATE VIRTUAL TABLE tasks_fts USING fts5("
+        " folded, content='tasks', content_rowid='id',"
+        " tokenize=\"unicode61 remove_diacritics 0 tokenchars '_'\")",
+        "CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN"
+        " INSERT INTO tasks_fts (rowid, folded) VALUES (new.id, new.folded); END",
+        "CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN"
+        " INSERT INTO tasks_fts (tasks_fts, rowid, folded) VALUES ('delete', old.id, old.folded); END",
+        "INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')",
+    )
+
+    def __init__(self, filename="tasks.db"):
+        self.filename = filename
+        self.storage = None
+        self._batch_depth = 0
+        self.conn = sqlite3.connect(filename)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        # Чтобы INSERT OR REPLACE тоже вызывал триггер удаления из FTS
+        self.conn.execute("PRAGMA recursive_triggers=ON")
+        with self.conn:
+            for statement in self.SCHEMA:
+                self.conn.execute(statement)
+        self._add_folded()
+        self.fts = self._create_fts()
+
+    def _add_folded(self):
+        """Добавляет колонку folded в базу, созданную до её появления"""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(tasks)")}
+        if "folded" in columns:
+            return
+        with self.conn:
+            # Старый FTS-индекс был построен по description - строится заново
+            self.conn.execute("DROP TRIGGER IF EXISTS tasks_fts_insert")
+            self.conn.execute("DROP TRIGGER IF EXISTS tasks_fts_delete")
+            self.conn.execute("DROP TABLE IF EXISTS tasks_fts")
+            self.conn.execute("ALTER TABLE tasks ADD COLUMN folded TEXT NOT NULL DEFAULT ''")
+            rows = self.conn.execute("SELECT id, description FROM tasks").fetchall()
+            self.conn.executemany("UPDATE tasks SET folded = ? WHERE id = ?",
+                                  ((fold(description), task_id) for task_id, description in rows))
+
+    def _create_fts(self):
+        """Создаёт FTS5-индекс; False, если sqlite собран без FTS5"""
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'").fetchone()
+        if exists:
+            return True
+        try:
+            with self.conn:
+                for statement in self.FTS_SCHEMA:
+                    self.conn.execute(statement)
+        except sqlite3.OperationalError:
+            return False
+        return True
+
+    def load_tasks(self):
+        pass
+
+    def save_tasks(self):
+        self.conn.commit()
+
+    def refresh(self):
+        # Согласованность между процессами обеспечивает сам SQLite
+        pass
+
+    def _begin(self):
+        # Блокировка на запись сразу, чтобы чтение и изменение в batch() были атомарны
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def _end(self):
+        pass
+
+    def flush(self):
+        self.conn.commit()
+
+    def _rollback(self):
+        self.conn.rollback()
+
+    def _commit(self):
+        if not self._batch_depth:
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def import_tasks(self, tasks):
+        """Загружает задачи (Task, например из TaskManager) одной транзакцией"""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO tasks (id, description, created, completed, completed_at, folded)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                ((t.id, t.description, t.created_str, int(t.completed), t.completed_at_str, fold(t.description))
+                 for t in tasks))
+
+    @staticmethod
+    def _row_to_task(row):
+        return Task(row[0], row[1], row[2], bool(row[3]), row[4])
+
+    def get_task(self, task_id):
+        row = self.conn.execute(
+            "SELECT id, description, created, completed, completed_at FROM tasks WHERE id = ?",
+            (task_id,)).fetchone()
+        return self._row_to_task(row) if row else None
+
+    def iter_tasks(self, show_all=True):
+        if show_all:
+            cursor = self.conn.execute(
+                "SELECT id, description, created, completed, completed_at FROM tasks ORDER BY id")
+        else:
+            cursor = self.conn.execute(
+                "SELECT id, description, created, completed, completed_at FROM tasks"
+                " WHERE completed = 0 ORDER BY id")
+        for row in cursor:
+            yield self._row_to_task(row)
+
+    def page_tasks(self, show_all=True, page_size=PAGE_SIZE, after_id=0):
+        if page_size < 1:
+            raise ValueError("размер страницы должен быть положительным")
+        # Лишняя строка показывает, есть ли следующая страница
+        if show_all:
+            cursor = self.conn.execute(
+                "SELECT id, description, created, completed, completed_at FROM tasks"
+                " WHERE id > ? ORDER BY id LIMIT ?", (after_id, page_size + 1))
+        else:
+            cursor = self.conn.execute(
+                "SELECT id, description, created, completed, completed_at FROM tasks"
+                " WHERE completed = 0 AND id > ? ORDER BY id LIMIT ?", (after_id, page_size + 1))
+        page = [self._row_to_task(row) for row in cursor]
+        return page[:page_size], (page[page_size - 1].id if len(page) > page_size else None)
+
+    def search_tasks(self, query, limit=None):
+        # Запрос и колонка folded нормализованы одинаково (search.tokenize),
+        # поэтому результат совпадает с SearchIndex: слова как префиксы
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        if self.fts:
+            match = " AND ".join(f'"{token}"*' for token in tokens)
+            cursor = self.conn.execute(
+                "SELECT id, description, created, completed, completed_at FROM tasks"
+                " WHERE id IN (SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ?) ORDER BY id LIMIT ?",
+                (match, -1 if limit is None else limit))
+        else:
+            # " " + folded начинается с пробела, поэтому "% слово%" - префикс слова
+            condition = " AND ".join("(' ' || folded) LIKE ? ESCAPE '\\'" for _ in tokens)
+            cursor = self.conn.execute(
+                "SELECT id, description, created, completed, completed_at FROM tasks"
+                f" WHERE {condition} ORDER BY id LIMIT ?",
+                ["% " + token.replace("_", "\\_") + "%" for token in tokens] + [-1 if limit is None else limit])
+        return [self._row_to_task(row) for row in cursor]
+
+    def count_tasks(self):
+        total = self.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+        completed = self.conn.execute("SELECT COUNT(*) FROM tasks WHERE completed = 1").fetchone()[0]
+        return total, completed
+
+    def activity(self, since):
+        created = self.conn.execute("SELECT COUNT(*) FROM tasks WHERE created >= ?", (since,)).fetchone()[0]
+        completed = self.conn.execute(
+            "SELECT COUNT(*) FROM tasks WHERE completed_at >= ?", (since,)).fetchone()[0]
+        return created, completed
+
+    def insert_task(self, description, created):
+        cursor = self.conn.execute(
+            "INSERT INTO tasks (description, created, folded) VALUES (?, ?, ?)",
+            (description, format_time(created), fold(description)))
+        self._commit()
+        return Task(cursor.lastrowid, description, created)
+
+    def mark_completed(self, task, completed_at):
+        self.conn.execute(
+            "UPDATE tasks SET completed = 1, completed_at = ? WHERE id = ?", (format_time(completed_at), task.id))
+        self._commit()
+        task.completed = True
+        task.completed_at = completed_at
+
+    def remove_task(self, task_id):
+        task = self.get_task(task_id)
+        if task is not None:
+            self.conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+            self._commit()
+        return task
+
+
 def clear_screen():
     os.system('cls' if os.name == 'nt' else 'clear')
 
@@ -105,28 +584,77 @@ def show_menu():
     print("4. ✅ Отметить задачу как выполненную")
     print("5. 🗑️ Удалить задачу")
     print("6. 📊 Показать статистику")
-    print("7. 💾 Сохранить и выйти")
+    print("7. 🔎 Найти задачу")
+    print("8. 💾 Сохранить и выйти")
     print("=" * 50)
 
 
+def browse_tasks(manager, show_all=True):
+    """Постраничный просмотр задач в меню"""
+    cursor = manager.show_tasks(show_all, page_size=PAGE_SIZE)
+    while cursor is not None:
+        answer = input("\nEnter - следующая страница, q - закончить просмотр: ").strip().lower()
+        if answer == 'q':
+            break
+        cursor = manager.show_tasks(show_all, page_size=PAGE_SIZE, after_id=cursor)
+
+
+def read_descriptions(source):
+    """Описания задач из файла (по одной в строке); '-' - стандартный ввод"""
+    f = sys.stdin if source == '-' else open(source, 'r', encoding='utf-8')
+    try:
+        for line in f:
+            description = line.strip()
+            if description:
+                yield description
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def create_manager(args):
+    if args.sqlite:
+        manager = SqliteTaskManager(args.sqlite)
+        # Первый запуск с SQLite: переносим задачи из tasks.json
+        if not manager.count_tasks()[0] and os.path.exists("tasks.json"):
+            manager.import_tasks(TaskManager(storage=JournalStorage("tasks.json")).iter_tasks())
+        return manager
+    return TaskManager(storage=JournalStorage("tasks.json", fsync=args.fsync, file_format=args.format))
+
+
 def main():
-    manager = TaskManager()
+    parser = argparse.ArgumentParser(description="Менеджер задач")
+    parser.add_argument('--sqlite', metavar='DB', help="хранить задачи в базе SQLite (например, tasks.db)")
+    parser.add_argument('--import', dest='import_file', metavar='FILE',
+                        help="добавить задачи из файла (по одной в строке, '-' - stdin) и выйти")
+    parser.add_argument('--fsync', choices=[p.value for p in FsyncPolicy], default=FsyncPolicy.ALWAYS.value,
+                        help="когда сбрасывать tasks.json и журнал на диск (по умолчанию always)")
+    parser.add_argument('--format', choices=[f.value for f in FileFormat],
+                        help="формат сохранения tasks.json (по умолчанию - как у существующего файла)")
+    args = parser.parse_args()
+    manager = create_manager(args)
+
+    if args.import_file:
+        # add_tasks уже записал одну пачку в журнал (и свернул его, если пора)
+        manager.add_tasks(read_descriptions(args.import_file))
+        manager.close()
+        return
 
     while True:
         clear_screen()
         show_menu()
 
         try:
-            choice = input("\nВыберите действие (1-7): ").strip()
+            choice = input("\nВыберите действие (1-8): ").strip()
 
             if choice == '1':
                 clear_screen()
-                manager.show_tasks(show_all=True)
+                browse_tasks(manager, show_all=True)
                 input("\nНажмите Enter для продолжения...")
 
             elif choice == '2':
                 clear_screen()
-                manager.show_tasks(show_all=False)
+                browse_tasks(manager, show_all=False)
                 input("\nНажмите Enter для продолжения...")
 
             elif choice == '3':
@@ -140,7 +668,7 @@ def main():
 
             elif choice == '4':
                 clear_screen()
-                manager.show_tasks(show_all=False)
+                browse_tasks(manager, show_all=False)
                 try:
                     task_id = int(input("\nВведите ID задачи для завершения: ").strip())
                     manager.complete_task(task_id)
@@ -150,7 +678,7 @@ def main():
 
             elif choice == '5':
                 clear_screen()
-                manager.show_tasks(show_all=True)
+                browse_tasks(manager, show_all=True)
                 try:
                     task_id = int(input("\nВведите ID задачи для удаления: ").strip())
                     confirm = input(f"Вы уверены, что хотите удалить задачу {task_id}? (да/нет): ").strip().lower()
@@ -166,6 +694,17 @@ def main():
                 input("\nНажмите Enter для продолжения...")
 
             elif choice == '7':
+                clear_screen()
+                query = input("Введите слова для поиска: ").strip()
+                if query:
+                    manager.search(query)
+                else:
+                    print("❌ Запрос не может быть пустым")
+                input("\nНажмите Enter для продолжения...")
+
+            elif choice == '8':
+                manager.save_tasks()
+                manager.close()
                 print("\n💾 Данные сохранены. До свидания!")
                 break
 
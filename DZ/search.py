@@ -0,0 +1,71 @@
+# search.py
+import re
+from bisect import bisect_left, insort
+
+WORD_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Слова текста в нижнем регистре; ё приравнивается к е"""
+    return WORD_RE.findall(text.casefold().replace("ё", "е"))
+
+
+def fold(text):
+    """Текст из слов tokenize через пробел - по нему ищет SQLite"""
+    return " ".join(tokenize(text))
+
+
+class SearchIndex:
+    """Инвертированный индекс: слово -> множество id задач.
+
+    Словарь слов дополнительно хранится отсортированным, поэтому слово
+    запроса ищется как префикс (bisect) - "отч" находит "отчёт".
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.vocabulary = []
+
+    @classmethod
+    def from_tasks(cls, tasks):
+        index = cls()
+        for task in tasks:
+            index.add(task.id, task.description)
+        return index
+
+    def add(self, task_id, text):
+        for token in set(tokenize(text)):
+            ids = self.postings.get(token)
+            if ids is None:
+                ids = self.postings[token] = set()
+                insort(self.vocabulary, token)
+            ids.add(task_id)
+
+    def remove(self, task_id, text):
+        # Опустевшие слова остаются в словаре, при поиске они просто пустые
+        for token in set(tokenize(text)):
+            ids = self.postings.get(token)
+            if ids is not None:
+                ids.discard(task_id)
+
+    def _prefix_ids(self, prefix):
+        ids = set()
+        i = bisect_left(self.vocabulary, prefix)
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(prefix):
+            ids |= self.postings[self.vocabulary[i]]
+            i += 1
+        return ids
+
+    def search(self, query):
+        """Отсортированные id задач, содержащих все слова запроса (как префиксы)"""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # Начинаем с самого редкого слова, чтобы пересечения были короткими
+        sets = sorted((self._prefix_ids(token) for token in set(tokens)), key=len)
+        result = sets[0]
+        for ids in sets[1:]:
+            if not result:
+                break
+            result = result & ids
+        return sorted(result)
@@ -0,0 +1,258 @@
+# server.py
+# Локальный HTTP/JSON сервис над одним TaskManager.
+# Запуск: python server.py [--port 8765] [--unix PATH] [--file tasks.json]
+#
+#   GET    /tasks?status=all|pending&after=ID&limit=N   страница задач
+#   GET    /tasks/ID                                    одна задача
+#   POST   /tasks            {"description": "..."}     добавить
+#   POST   /tasks/ID/complete                           отметить выполненной
+#   DELETE /tasks/ID                                    удалить
+#   GET    /search?q=...&limit=N                        поиск
+#   GET    /stats                                       статистика
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from main import PAGE_SIZE, TaskManager
+from storage import FsyncPolicy, JournalStorage
+from task import now
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 409: "Conflict", 500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class TaskServer:
+    """Все клиенты работают с одним TaskManager в памяти.
+
+    Обращения к менеджеру выполняются в одном рабочем потоке, поэтому
+    цикл событий не блокируется на диске. Изменения, пришедшие пока
+    записывается предыдущая пачка, копятся в очереди и применяются
+    следующей пачкой в одном batch() - групповой коммит: одна блокировка,
+    одна запись в журнал и один fsync на всю пачку. Ответ на изменение
+    отправляется только после того, как пачка записана.
+    """
+
+    def __init__(self, manager, max_batch=1000):
+        self.manager = manager
+        self.max_batch = max_batch
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self._queue = []
+        self._wakeup = None
+        self._committer = None
+        self.batches = 0
+        self.writes = 0
+
+    async def start(self, host="127.0.0.1", port=8765, unix_path=None):
+        self._wakeup = asyncio.Event()
+        self._committer = asyncio.create_task(self._commit_loop())
+        if unix_path:
+            return await asyncio.start_unix_server(self.handle, path=unix_path)
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def stop(self):
+        if self._committer is not None:
+            self._committer.cancel()
+        await self._in_worker(self.manager.close)
+        self.executor.shutdown()
+
+    async def _in_worker(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    # --- групповой коммит ---
+
+    async def write(self, fn, *args):
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((fn, args, future))
+        self._wakeup.set()
+        return await future
+
+    async def _commit_loop(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._queue:
+                ops, self._queue = self._queue[:self.max_batch], self._queue[self.max_batch:]
+                try:
+                    results = await self._in_worker(self._apply, ops)
+                except Exception as e:
+                    # Пачка не записалась (например, ошибка диска)
+                    results = [(False, e)] * len(ops)
+                for (fn, args, future), (ok, value) in zip(ops, results):
+                    if future.done():
+                        continue
+                    if ok:
+                        future.set_result(value)
+                    else:
+                        future.set_exception(value)
+
+    def _apply(self, ops):
+        results = []
+        with self.manager.batch():
+            for fn, args, future in ops:
+                try:
+                    results.append((True, fn(*args)))
+                except Exception as e:
+                    results.append((False, e))
+        self.batches += 1
+        self.writes += len(ops)
+        return results
+
+    # --- операции (выполняются в рабочем потоке) ---
+
+    def _add(self, description):
+        return self.manager.insert_task(description, now()).to_dict()
+
+    def _complete(self, task_id):
+        task = self.manager.get_task(task_id)
+        if task is None:
+            raise HttpError(404, f"задача {task_id} не найдена")
+        if task.completed:
+            raise HttpError(409, f"задача {task_id} уже выполнена")
+        self.manager.mark_completed(task, now())
+        return task.to_dict()
+
+    def _delete(self, task_id):
+        task = self.manager.remove_task(task_id)
+        if task is None:
+            raise HttpError(404, f"задача {task_id} не найдена")
+        return task.to_dict()
+
+    def _get(self, task_id):
+        self.manager.refresh()
+        task = self.manager.get_task(task_id)
+        if task is None:
+            raise HttpError(404, f"задача {task_id} не найдена")
+        return task.to_dict()
+
+    def _page(self, show_all, after_id, limit):
+        self.manager.refresh()
+        tasks, cursor = self.manager.page_tasks(show_all, limit, after_id)
+        return {'tasks': [task.to_dict() for task in tasks], 'next': cursor}
+
+    def _search(self, query, limit):
+        self.manager.refresh()
+        return {'tasks': [task.to_dict() for task in self.manager.search_tasks(query, limit)]}
+
+    def _stats(self):
+        self.manager.refresh()
+        total, completed = self.manager.count_tasks()
+        return {'total': total, 'completed': completed, 'pending': total - completed,
+                'batches': self.batches, 'writes': self.writes}
+
+    # --- HTTP ---
+
+    @staticmethod
+    def _limit(query):
+        limit = int(query.get('limit', PAGE_SIZE))
+        if limit < 1:
+            raise HttpError(400, "limit должен быть положительным")
+        return limit
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        parts = [part for part in url.path.split("/") if part]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        try:
+            if parts == ["tasks"] and method == "GET":
+                show_all = query.get('status', 'all') != 'pending'
+                return 200, await self._in_worker(self._page, show_all, int(query.get('after', 0)),
+                                                  self._limit(query))
+            if parts == ["tasks"] and method == "POST":
+                data = json.loads(body or b"{}")
+                if not isinstance(data, dict):
+                    raise HttpError(400, "ожидается JSON-объект")
+                description = str(data.get('description', "")).strip()
+                if not description:
+                    raise HttpError(400, "описание задачи не может быть пустым")
+                return 201, await self.write(self._add, description)
+            if len(parts) == 2 and parts[0] == "tasks" and method == "GET":
+                return 200, await self._in_worker(self._get, int(parts[1]))
+            if len(parts) == 2 and parts[0] == "tasks" and method == "DELETE":
+                return 200, await self.write(self._delete, int(parts[1]))
+            if len(parts) == 3 and parts[0] == "tasks" and parts[2] == "complete" and method == "POST":
+                return 200, await self.write(self._complete, int(parts[1]))
+            if parts == ["search"] and method == "GET":
+                return 200, await self._in_worker(self._search, query.get('q', ""),
+                                                  self._limit(query))
+            if parts == ["stats"] and method == "GET":
+                return 200, await self._in_worker(self._stats)
+        except HttpError as e:
+            return e.status, {'error': str(e)}
+        except ValueError as e:
+            return 400, {'error': str(e)}
+        return 404, {'error': f"нет обработчика для {method} {url.path}"}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, _ = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode('latin-1').partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                try:
+                    status, payload = await self.dispatch(method, target, body)
+                except Exception as e:
+                    # Ошибка обработчика не должна обрывать соединение без ответа
+                    status, payload = 500, {'error': f"внутренняя ошибка: {e}"}
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                             f"Content-Type: application/json; charset=utf-8\r\n"
+                             f"Content-Length: {len(data)}\r\n\r\n".encode('latin-1') + data)
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(args):
+    storage = JournalStorage(args.file, fsync=args.fsync)
+    server = TaskServer(TaskManager(args.file, storage=storage))
+    listener = await server.start(args.host, args.port, args.unix)
+    where = args.unix or f"http://{args.host}:{listener.sockets[0].getsockname()[1]}"
+    print(f"🚀 Сервер задач слушает {where}", flush=True)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сервер менеджера задач")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', metavar='PATH', help="слушать Unix-сокет вместо TCP")
+    parser.add_argument('--file', default="tasks.json")
+    parser.add_argument('--fsync', choices=[p.value for p in FsyncPolicy], default=FsyncPolicy.ALWAYS.value)
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        print("\n👋 Сервер остановлен")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# stats.py
+from datetime import datetime, timedelta
+
+
+class TaskStats:
+    """Счётчики задач, обновляемые на каждом изменении за O(1).
+
+    total / completed - текущее состояние списка, created_per_day /
+    completed_per_day - гистограммы событий по дням ('YYYY-MM-DD' -> число);
+    удаление задачи историю не меняет.
+    """
+
+    def __init__(self, total=0, completed=0, created_per_day=None, completed_per_day=None):
+        self.total = total
+        self.completed = completed
+        self.created_per_day = created_per_day or {}
+        self.completed_per_day = completed_per_day or {}
+
+    @property
+    def pending(self):
+        return self.total - self.completed
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['total'], data['completed'],
+                   dict(data.get('created_per_day', {})), dict(data.get('completed_per_day', {})))
+
+    @classmethod
+    def from_tasks(cls, tasks):
+        """Пересчёт по сохранённым задачам (словарям из файла)"""
+        stats = cls()
+        for task in tasks:
+            stats.on_add(task['created'][:10])
+            if task['completed']:
+                stats.on_complete(task['completed_at'][:10])
+        return stats
+
+    def to_dict(self):
+        return {
+            'total': self.total,
+            'completed': self.completed,
+            'created_per_day': self.created_per_day,
+            'completed_per_day': self.completed_per_day
+        }
+
+    def on_add(self, day):
+        """day - 'YYYY-MM-DD' создания задачи"""
+        self.total += 1
+        self.created_per_day[day] = self.created_per_day.get(day, 0) + 1
+
+    def on_complete(self, day):
+        """day - 'YYYY-MM-DD' выполнения задачи"""
+        self.completed += 1
+        self.completed_per_day[day] = self.completed_per_day.get(day, 0) + 1
+
+    def on_delete(self, was_completed):
+        self.total -= 1
+        if was_completed:
+            self.completed -= 1
+
+    def activity(self, since):
+        """(создано, выполнено) с дня since (строка 'YYYY-MM-DD') включительно"""
+        created = sum(n for day, n in self.created_per_day.items() if day >= since)
+        completed = sum(n for day, n in self.completed_per_day.items() if day >= since)
+        return created, completed
+
+
+def day_start(days_ago=0, now=None):
+    """Строка 'YYYY-MM-DD' для дня days_ago дней назад"""
+    now = now or datetime.now()
+    return (now - timedelta(days=days_ago)).strftime("%Y-%m-%d")
+
+
+def per_hour(count, days, now=None):
+    """Среднее число событий в час за последние days дней (включая сегодняшний)"""
+    now = now or datetime.now()
+    hours_today = now.hour + now.minute / 60 + now.second / 3600
+    hours = max((days - 1) * 24 + hours_today, 1)
+    return count / hours
@@ -0,0 +1,444 @@
+# storage.py
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from enum import Enum
+from formats import FileFormat, decode_state, detect_format, encode_state
+from stats import TaskStats
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+FORMAT_VERSION = 2
+
+
+class FsyncPolicy(Enum):
+    """Когда сбрасывать записанное на диск (os.fsync)"""
+    ALWAYS = "always"      # после каждой записи - ничего не теряется
+    INTERVAL = "interval"  # журнал - групповой сброс не позже fsync_interval_ms после записи,
+                           # снимки (save) - сразу, как при ALWAYS
+    NEVER = "never"        # на усмотрение ОС - быстрее всего
+
+
+class TaskStorage(ABC):
+    """Базовый класс хранилища задач для TaskManager.
+
+    Хранилище оперирует состоянием вида
+    {'version': 2, 'next_id': <следующий id>, 'tasks': [<задачи>],
+     'stats': <TaskStats.to_dict()>}.
+    """
+
+    @abstractmethod
+    def load(self):
+        """Возвращает состояние (см. empty_state)"""
+        pass
+
+    @abstractmethod
+    def save(self, state):
+        """Полностью перезаписывает хранилище"""
+        pass
+
+    def log(self, op, task, snapshot):
+        """Фиксирует одну операцию (add / update / delete) над задачей.
+
+        snapshot - функция без аргументов, возвращающая полное состояние;
+        по умолчанию хранилище просто перезаписывается целиком.
+        """
+        self.save(snapshot())
+
+    def log_many(self, records, snapshot):
+        """Фиксирует пачку записей {'op': ..., 'task': ...} одной записью"""
+        self.save(snapshot())
+
+    def acquire(self):
+        """Захватывает хранилище для изменения (между процессами)"""
+        pass
+
+    def release(self):
+        pass
+
+    def refresh(self):
+        """Проверяет, не изменили ли хранилище другие процессы.
+
+        Вызывается под acquire(). Возвращает None, если изменений нет,
+        ('state', состояние) - если нужно перечитать всё, или
+        ('records', записи журнала) - если достаточно применить новые записи.
+        """
+        return None
+
+    def close(self):
+        pass
+
+
+class FileLock:
+    """Межпроцессная блокировка на отдельном файле (flock / msvcrt.locking).
+
+    Повторный acquire() в том же объекте только увеличивает счётчик.
+    В самом файле блокировки хранится номер версии хранилища: его
+    увеличивает каждый процесс, перезаписавший снимок.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._fd = None
+        self._depth = 0
+
+    def acquire(self):
+        if self._depth == 0:
+            if self._fd is None:
+                self._fd = os.open(self.filename, os.O_RDWR | os.O_CREAT, 0o644)
+            if os.name == 'nt':
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+            else:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+        self._depth += 1
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            if os.name == 'nt':
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def version(self):
+        """Текущий номер версии (вызывать под блокировкой)"""
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        data = os.read(self._fd, 32)
+        return int(data) if data.strip() else 0
+
+    def bump_version(self):
+        version = self.version() + 1
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        os.ftruncate(self._fd, 0)
+        os.write(self._fd, str(version).encode('ascii'))
+        return version
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+            self._depth = 0
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+class JsonFileStorage(TaskStorage):
+    """Все задачи в одном файле, перезапись на каждое изменение.
+
+    Файл пишется атомарно: во временный файл рядом и затем os.replace,
+    так что при падении на диске остаётся либо старая, либо новая версия.
+    Формат файла (см. FileFormat) определяется при загрузке автоматически;
+    сохраняется в file_format, а если он не задан - в формате прочитанного
+    файла (для нового файла - JSON с отступами).
+
+    Несколько процессов могут работать с одним файлом: изменения идут под
+    блокировкой <файл>.lock, а перед изменением файл перечитывается, если
+    его штамп (inode, mtime, размер) отличается от последнего известного.
+    """
+
+    def __init__(self, filename, fsync=FsyncPolicy.ALWAYS, fsync_interval_ms=100, file_format=None):
+        self.filename = filename
+        self.fsync = FsyncPolicy(fsync)
+        self.fsync_interval = fsync_interval_ms / 1000
+        self._last_sync = 0.0
+        self._sync_timer = None
+        self._sync_lock = threading.Lock()
+        self.file_format = FileFormat(file_format) if file_format else None
+        self.lock = FileLock(filename + ".lock")
+        self._stamp = None
+
+    def acquire(self):
+        self.lock.acquire()
+
+    def release(self):
+        self.lock.release()
+
+    def refresh(self):
+        if self._current_stamp() != self._stamp:
+            return 'state', self.load()
+        return None
+
+    def _current_stamp(self):
+        return self.lock.version(), file_stamp(self.filename)
+
+    def load(self):
+        with self.lock:
+            return self._load_snapshot()
+
+    def _load_snapshot(self):
+        self._stamp = self._current_stamp()
+        if self._stamp[1] is None:
+            return empty_state()
+        try:
+            with open(self.filename, 'rb') as f:
+                data = f.read()
+            if self.file_format is None:
+                self.file_format = detect_format(data)
+            return migrate(decode_state(data))
+        except ValueError:
+            # Не затираем повреждённый файл молча - откладываем его в сторону
+            broken = self.filename + ".broken"
+            os.replace(self.filename, broken)
+            self._stamp = self._current_stamp()
+            print(f"⚠️ Файл {self.filename} повреждён и сохранён как {broken}")
+            return empty_state()
+
+    def save(self, state):
+        # Снимок при INTERVAL сбрасывается сразу, как при ALWAYS: без fsync перед
+        # os.replace после сбоя питания вместо файла может остаться пустой
+        durable = self.fsync in (FsyncPolicy.ALWAYS, FsyncPolicy.INTERVAL)
+        with self.lock:
+            tmp_filename = self.filename + ".tmp"
+            with open(tmp_filename, 'wb') as f:
+                f.write(encode_state(state, self.file_format or FileFormat.JSON))
+                f.flush()
+                if durable:
+                    os.fsync(f.fileno())
+            os.replace(tmp_filename, self.filename)
+            if durable:
+                sync_directory(self.filename)
+            self.lock.bump_version()
+            self._stamp = self._current_stamp()
+
+    def close(self):
+        self.lock.close()
+
+    def _sync(self, f, force=False):
+        """Сброс дозаписываемого файла на диск согласно политике fsync.
+
+        При INTERVAL запись внутри интервала не ждёт fsync: сброс
+        откладывается таймером до конца интервала, так что записанное
+        попадает на диск не позже чем через fsync_interval, даже если
+        новых записей больше не будет.
+        """
+        if self.fsync == FsyncPolicy.NEVER:
+            return
+        with self._sync_lock:
+            now = time.monotonic()
+            if force or self.fsync == FsyncPolicy.ALWAYS or now - self._last_sync >= self.fsync_interval:
+                if self._sync_timer is not None:
+                    self._sync_timer.cancel()
+                    self._sync_timer = None
+                os.fsync(f.fileno())
+                self._last_sync = now
+            elif self._sync_timer is None:
+                self._sync_timer = threading.Timer(self._last_sync + self.fsync_interval - now,
+                                                   self._deferred_sync, (f,))
+                self._sync_timer.daemon = True
+                self._sync_timer.start()
+
+    def _deferred_sync(self, f):
+        with self._sync_lock:
+            if self._sync_timer is not threading.current_thread():
+                return  # таймер уже отменён обычным сбросом
+            self._sync_timer = None
+            if not f.closed:
+                os.fsync(f.fileno())
+                self._last_sync = time.monotonic()
+
+
+class JournalStorage(JsonFileStorage):
+    """Снимок в файле + журнал операций (одна строка JSON на изменение).
+
+    Каждое изменение - дозапись одной строки в журнал, O(1).
+    После compact_every записей журнал сворачивается в новый снимок.
+    При загрузке читается снимок и поверх него проигрывается журнал.
+
+    Политика INTERVAL - групповой коммит: записи внутри интервала
+    сбрасываются на диск одним fsync в конце интервала (по таймеру),
+    а оставшиеся - при close().
+    """
+
+    def __init__(self, filename, journal_filename=None, compact_every=1000,
+                 fsync=FsyncPolicy.ALWAYS, fsync_interval_ms=100, file_format=None):
+        super().__init__(filename, fsync, fsync_interval_ms, file_format)
+        self.journal_filename = journal_filename or filename + ".journal"
+        self.compact_every = compact_every
+        self.journal_size = 0
+        # Сколько байт журнала уже прочитано или записано этим процессом
+        self._journal_pos = 0
+        self._journal = None
+
+    def load(self):
+        with self.lock:
+            self._close_journal()
+            state = self._load_snapshot()
+            self.journal_size = 0
+            self._journal_pos = 0
+            records = self._read_journal()
+            if not records:
+                return state
+
+            tasks = {task['id']: task for task in state['tasks']}
+            stats = TaskStats.from_dict(state['stats'])
+            for record in records:
+                apply_record(tasks, record, stats)
+                state['next_id'] = max(state['next_id'], record['task']['id'] + 1)
+
+            state['tasks'] = list(tasks.values())
+            state['stats'] = stats.to_dict()
+            return state
+
+    def refresh(self):
+        if self._current_stamp() != self._stamp:
+            # Другой процесс свернул журнал в новый снимок
+            return 'state', self.load()
+        records = self._read_journal()
+        return ('records', records) if records else None
+
+    def _read_journal(self):
+        """Записи журнала после уже прочитанной позиции"""
+        if not os.path.exists(self.journal_filename):
+            return []
+        records = []
+        with open(self.journal_filename, 'rb') as f:
+            f.seek(self._journal_pos)
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("incomplete record")
+                    record = json.loads(line.decode('utf-8'))
+                except ValueError:
+                    # Оборванная последняя запись (падение во время записи)
+                    break
+                records.append(record)
+                self._journal_pos += len(line)
+
+        if self._journal_pos != os.path.getsize(self.journal_filename):
+            # Отрезаем хвост, иначе новые записи склеятся с обрывком
+            with open(self.journal_filename, 'r+b') as f:
+                f.truncate(self._journal_pos)
+        self.journal_size += len(records)
+        return records
+
+    def log(self, op, task, snapshot):
+        self.log_many([{'op': op, 'task': task}], snapshot)
+
+    def log_many(self, records, snapshot):
+        with self.lock:
+            if self._journal is None:
+                self._journal = open(self.journal_filename, 'ab')
+            data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode('utf-8')
+            self._journal.write(data)
+            self._journal.flush()
+            self._sync(self._journal)
+            self._journal_pos += len(data)
+            self.journal_size += len(records)
+
+        if self.compact_every and self.journal_size >= self.compact_every:
+            self.save(snapshot())
+
+    def save(self, state):
+        """Компактизация: пишет снимок и очищает журнал"""
+        with self.lock:
+            super().save(state)
+            self._close_journal()
+            if os.path.exists(self.journal_filename):
+                os.remove(self.journal_filename)
+            self.journal_size = 0
+            self._journal_pos = 0
+
+    def _close_journal(self):
+        if self._journal is not None:
+            self._sync(self._journal, force=True)
+            with self._sync_lock:
+                self._journal.close()
+            self._journal = None
+
+    def close(self):
+        self._close_journal()
+        super().close()
+
+
+def file_stamp(filename):
+    """Штамп версии файла: (inode, mtime в нс, размер) или None, если файла нет"""
+    try:
+        st = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def sync_directory(filename):
+    """fsync каталога, чтобы переименование файла тоже пережило сбой питания"""
+    if os.name == 'nt':
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(filename)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def empty_state():
+    return {'version': FORMAT_VERSION, 'next_id': 1, 'tasks': [], 'stats': TaskStats().to_dict()}
+
+
+def migrate(data):
+    """Приводит содержимое файла к текущему формату.
+
+    Старый формат - просто список задач с id 1..n (перенумерация при
+    удалении). Id сохраняются как есть, задачам без id или с повторным
+    id выдаются новые; next_id ставится после максимального id.
+    Счётчики статистики, если их нет, пересчитываются по задачам.
+    """
+    if isinstance(data, dict):
+        data.setdefault('version', FORMAT_VERSION)
+        data.setdefault('tasks', [])
+        data.setdefault('next_id', max((t['id'] for t in data['tasks']), default=0) + 1)
+        if 'stats' not in data:
+            data['stats'] = TaskStats.from_tasks(data['tasks']).to_dict()
+        return data
+
+    state = empty_state()
+    seen = set()
+    pending = []
+    for task in data:
+        task_id = task.get('id')
+        if isinstance(task_id, int) and task_id not in seen:
+            seen.add(task_id)
+        else:
+            pending.append(task)
+        state['tasks'].append(task)
+
+    next_id = max(seen, default=0) + 1
+    for task in pending:
+        task['id'] = next_id
+        next_id += 1
+    state['next_id'] = next_id
+    state['stats'] = TaskStats.from_tasks(state['tasks']).to_dict()
+    return state
+
+
+def apply_record(tasks, record, stats):
+    """Применяет одну запись журнала к словарю задач {id: задача} и счётчикам.
+
+    Операции идемпотентны, поэтому повторное проигрывание журнала поверх
+    уже включившего его снимка не портит список задач.
+    """
+    op = record['op']
+    task = record['task']
+    old = tasks.get(task['id'])
+
+    if op == 'add' or op == 'update':
+        tasks[task['id']] = task
+        if old is None:
+            stats.on_add(task['created'][:10])
+            old = {'completed': False}
+        if task['completed'] and not old['completed']:
+            stats.on_complete(task['completed_at'][:10])
+    elif op == 'delete' and old is not None:
+        del tasks[task['id']]
+        stats.on_delete(old['completed'])
@@ -0,0 +1,100 @@
+# task.py
+import time
+from datetime import datetime
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def now():
+    """Текущее время в секундах Unix"""
+    return int(time.time())
+
+
+def format_time(timestamp):
+    return time.strftime(TIME_FORMAT, time.localtime(timestamp))
+
+
+def parse_time(text):
+    """'YYYY-MM-DD HH:MM:SS' (местное время) -> секунды Unix; быстрее strptime"""
+    return int(datetime(int(text[0:4]), int(text[5:7]), int(text[8:10]),
+                        int(text[11:13]), int(text[14:16]), int(text[17:19])).timestamp())
+
+
+class Task:
+    """Запись задачи.
+
+    __slots__ вместо словаря на каждую задачу, время - целые секунды Unix.
+    Загруженные из файла строки времени разбираются только при первом
+    обращении к created / completed_at, а при выводе и сохранении
+    неизменённой задачи отдаются как есть.
+    """
+
+    __slots__ = ('id', 'description', 'completed', '_created', '_completed_at')
+
+    def __init__(self, id, description, created, completed=False, completed_at=None):
+        self.id = id
+        self.description = description
+        self.completed = completed
+        # int (секунды) или str (ещё не разобранная строка из файла)
+        self._created = created
+        self._completed_at = completed_at
+
+    @property
+    def created(self):
+        if isinstance(self._created, str):
+            self._created = parse_time(self._created)
+        return self._created
+
+    @property
+    def completed_at(self):
+        if isinstance(self._completed_at, str):
+            self._completed_at = parse_time(self._completed_at)
+        return self._completed_at
+
+    @completed_at.setter
+    def completed_at(self, value):
+        self._completed_at = value
+
+    @property
+    def created_str(self):
+        value = self._created
+        return value if isinstance(value, str) else format_time(value)
+
+    @property
+    def completed_at_str(self):
+        value = self._completed_at
+        if value is None or isinstance(value, str):
+            return value
+        return format_time(value)
+
+    @property
+    def created_day(self):
+        """'YYYY-MM-DD' создания (для гистограмм статистики)"""
+        return self.created_str[:10]
+
+    @property
+    def completed_day(self):
+        return self.completed_at_str[:10]
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['id'], data['description'], data['created'],
+                   data['completed'], data['completed_at'])
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'description': self.description,
+            'created': self.created_str,
+            'completed': self.completed,
+            'completed_at': self.completed_at_str
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, Task):
+            return NotImplemented
+        return (self.id, self.description, self.completed, self.created, self.completed_at) == \
+               (other.id, other.description, other.completed, other.created, other.completed_at)
+
+    def __repr__(self):
+        return f"Task({self.id!r}, {self.description!r}, completed={self.completed!r})"
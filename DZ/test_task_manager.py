@@ -0,0 +1,773 @@
+# test_task_manager.py
+
+import asyncio
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest.mock import patch
+
+from formats import BINARY_MAGIC, FileFormat, encode_state
+from http_client import request
+from idset import IdSet
+from main import SqliteTaskManager, TaskManager, main as task_main, read_descriptions
+from search import SearchIndex
+from server import TaskServer
+from stats import TaskStats, day_start
+from storage import FsyncPolicy, JsonFileStorage, JournalStorage
+from task import Task, format_time, parse_time
+
+
+class TaskManagerTestCase(unittest.TestCase):
+    """Общая подготовка: временный каталог и подавление вывода"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, "tasks.json")
+        self.out = StringIO()
+        self._redirect = redirect_stdout(self.out)
+        self._redirect.__enter__()
+
+    def tearDown(self):
+        self._redirect.__exit__(None, None, None)
+        shutil.rmtree(self.tmpdir)
+
+
+class TestJournalStorage(TaskManagerTestCase):
+    """Тесты журнального хранилища"""
+
+    def test_mutations_are_appended_to_journal(self):
+        """Изменения дописываются в журнал, снимок не трогается"""
+        manager = TaskManager(self.filename, storage=JournalStorage(self.filename))
+        manager.add_task("Первая")
+        manager.add_task("Вторая")
+        manager.complete_task(1)
+        manager.close()
+
+        self.assertFalse(os.path.exists(self.filename))
+        with open(self.filename + ".journal", encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 3)
+
+    def test_replay_snapshot_and_journal(self):
+        """Загрузка = снимок + проигрывание журнала"""
+        manager = TaskManager(self.filename, storage=JournalStorage(self.filename))
+        manager.add_task("Первая")
+        manager.save_tasks()
+        manager.add_task("Вторая")
+        manager.add_task("Третья")
+        manager.delete_task(1)
+        manager.complete_task(2)
+        manager.close()
+
+        reloaded = TaskManager(self.filename, storage=JournalStorage(self.filename))
+        self.assertEqual(reloaded.tasks, manager.tasks)
+
+    def test_compaction(self):
+        """После compact_every записей журнал сворачивается в снимок"""
+        storage = JournalStorage(self.filename, compact_every=3)
+        manager = TaskManager(self.filename, storage=storage)
+        for i in range(4):
+            manager.add_task(f"Задача {i}")
+        manager.close()
+
+        self.assertEqual(len(JsonFileStorage(self.filename).load()['tasks']), 3)
+        self.assertEqual(storage.journal_size, 1)
+        reloaded = TaskManager(self.filename, storage=JournalStorage(self.filename))
+        self.assertEqual(len(reloaded.tasks), 4)
+
+    def test_truncated_journal_tail_is_ignored(self):
+        """Оборванная последняя строка журнала не ломает загрузку"""
+        manager = TaskManager(self.filename, storage=JournalStorage(self.filename))
+        manager.add_task("Первая")
+        manager.close()
+        with open(self.filename + ".journal", 'a', encoding='utf-8') as f:
+            f.write('{"op": "add", "ta')
+
+        reloaded = TaskManager(self.filename, storage=JournalStorage(self.filename))
+        self.assertEqual(len(reloaded.tasks), 1)
+
+        # Обрывок отрезан, новые записи не склеиваются с ним
+        reloaded.add_task("Вторая")
+        reloaded.close()
+        again = TaskManager(self.filename, storage=JournalStorage(self.filename))
+        self.assertEqual(len(again.tasks), 2)
+
+
+class TestDurability(TaskManagerTestCase):
+    """Тесты атомарной записи и политик fsync"""
+
+    def count_fsyncs(self, storage, action):
+        calls = []
+        original = os.fsync
+        os.fsync = lambda fd: (calls.append(fd), original(fd))
+        try:
+            action(storage)
+        finally:
+            os.fsync = original
+        return len(calls)
+
+    def test_atomic_save_leaves_no_temp_file(self):
+        """Сохранение через временный файл и переименование"""
+        manager = TaskManager(self.filename)
+        manager.add_task("Задача")
+        self.assertEqual(sorted(os.listdir(self.tmpdir)), ["tasks.json", "tasks.json.lock"])
+
+    def test_broken_file_is_kept_aside(self):
+        """Повреждённый файл не теряется молча"""
+        with open(self.filename, 'w', encoding='utf-8') as f:
+            f.write('{"version": 2, "tasks": [')
+        manager = TaskManager(self.filename)
+        self.assertEqual(manager.count_tasks(), (0, 0))
+        self.assertTrue(os.path.exists(self.filename + ".broken"))
+        self.assertIn("повреждён", self.out.getvalue())
+
+    def test_fsync_policies(self):
+        """ALWAYS - fsync на каждую запись журнала, INTERVAL - групповой, NEVER - ни одного"""
+        def write(storage):
+            manager = TaskManager(self.filename, storage=storage)
+            for i in range(5):
+                manager.add_task(f"Задача {i}")
+
+        always = JournalStorage(self.filename, fsync=FsyncPolicy.ALWAYS)
+        self.assertEqual(self.count_fsyncs(always, write), 5)
+        always.close()
+
+        interval = JournalStorage(self.filename, fsync="interval", fsync_interval_ms=60000)
+        self.assertEqual(self.count_fsyncs(interval, write), 1)
+        self.assertEqual(self.count_fsyncs(interval, lambda s: s.close()), 1)
+
+        never = JournalStorage(self.filename, fsync=FsyncPolicy.NEVER)
+        self.assertEqual(self.count_fsyncs(never, write), 0)
+        never.close()
+
+    def test_interval_flushes_after_idle(self):
+        """INTERVAL: пачка записей без последующих попадает на диск по таймеру, без close()"""
+        storage = JournalStorage(self.filename, fsync="interval", fsync_interval_ms=50)
+        manager = TaskManager(self.filename, storage=storage)
+
+        def burst_then_idle(storage):
+            for i in range(5):
+                manager.add_task(f"Задача {i}")
+            time.sleep(0.3)
+
+        # Первая запись сбрасывается сразу, остальные четыре - одним отложенным fsync
+        self.assertEqual(self.count_fsyncs(storage, burst_then_idle), 2)
+        self.assertIsNone(storage._sync_timer)
+        self.assertEqual(self.count_fsyncs(storage, lambda s: s.close()), 1)
+
+
+class TestTaskRecord(unittest.TestCase):
+    """Тесты записи Task"""
+
+    def test_lazy_time_parsing(self):
+        """Строки времени из файла разбираются только при обращении"""
+        data = {'id': 1, 'description': "a", 'created': "2025-12-22 13:05:30",
+                'completed': True, 'completed_at': "2025-12-22 13:05:39"}
+        task = Task.from_dict(data)
+        self.assertIsInstance(task._created, str)
+        self.assertEqual(task.to_dict(), data)
+        self.assertEqual(task.completed_at - task.created, 9)
+        self.assertIsInstance(task._created, int)
+        self.assertEqual(task.to_dict(), data)
+
+    def test_time_round_trip(self):
+        """format_time и parse_time взаимно обратны"""
+        self.assertEqual(parse_time(format_time(1766400330)), 1766400330)
+
+    def test_slots(self):
+        """У записи нет __dict__"""
+        task = Task(1, "a", 0)
+        self.assertFalse(hasattr(task, '__dict__'))
+        with self.assertRaises(AttributeError):
+            task.priority = 1
+
+
+class TestFileFormats(TaskManagerTestCase):
+    """Тесты форматов файла задач"""
+
+    def make_tasks(self, file_format):
+        manager = TaskManager(self.filename, storage=JsonFileStorage(self.filename, file_format=file_format))
+        manager.add_tasks(["Первая", "Вторая — с юникодом ✅", ""])
+        manager.complete_task(2)
+        manager.delete_task(1)
+        return manager
+
+    def test_round_trip_and_detection(self):
+        """Каждый формат читается обратно без указания формата"""
+        for file_format in FileFormat:
+            manager = self.make_tasks(file_format)
+            storage = JsonFileStorage(self.filename)
+            reloaded = TaskManager(self.filename, storage=storage)
+            self.assertEqual(storage.file_format, FileFormat.BINARY if file_format == FileFormat.BINARY
+                             else FileFormat.JSON)
+            self.assertEqual(reloaded.tasks, manager.tasks)
+            self.assertEqual(reloaded.next_id, manager.next_id)
+            self.assertEqual(reloaded.stats.to_dict(), manager.stats.to_dict())
+            os.remove(self.filename)
+
+    def test_format_is_kept_on_save(self):
+        """Без явного формата файл пересохраняется в том же формате"""
+        self.make_tasks(FileFormat.BINARY)
+        manager = TaskManager(self.filename)
+        manager.add_task("Ещё")
+        with open(self.filename, 'rb') as f:
+            self.assertTrue(f.read().startswith(BINARY_MAGIC))
+
+    def test_compact_is_smaller(self):
+        """Компактный JSON меньше JSON с отступами"""
+        state = TaskManager(self.filename).snapshot()
+        state['tasks'] = [Task(i, "задача", 0).to_dict() for i in range(10)]
+        self.assertLess(len(encode_state(state, FileFormat.COMPACT)), len(encode_state(state, FileFormat.JSON)))
+
+    def test_broken_binary(self):
+        """Обрезанный двоичный файл считается повреждённым"""
+        self.make_tasks(FileFormat.BINARY)
+        with open(self.filename, 'r+b') as f:
+            f.truncate(40)
+        manager = TaskManager(self.filename)
+        self.assertEqual(manager.count_tasks(), (0, 0))
+        self.assertTrue(os.path.exists(self.filename + ".broken"))
+
+
+class TestSharedAccess(TaskManagerTestCase):
+    """Тесты работы нескольких клиентов с одним файлом"""
+
+    def open(self, **kwargs):
+        return TaskManager(self.filename, storage=JournalStorage(self.filename, **kwargs))
+
+    def test_writers_do_not_overwrite_each_other(self):
+        """Каждый клиент перед изменением подтягивает журнал другого"""
+        first, second = self.open(), self.open()
+        first.add_task("от первого")
+        second.add_task("от второго")
+        first.add_task("снова от первого")
+        second.complete_task(1)
+        first.delete_task(2)
+
+        second.refresh()
+        self.assertEqual(list(first.tasks), [1, 3])
+        self.assertEqual(first.tasks, second.tasks)
+        self.assertEqual(first.stats.to_dict(), second.stats.to_dict())
+        self.assertEqual(self.open().tasks, first.tasks)
+
+    def test_reload_after_foreign_compaction(self):
+        """Если другой клиент свернул журнал, состояние перечитывается целиком"""
+        first, second = self.open(compact_every=2), self.open(compact_every=2)
+        first.add_task("a")
+        first.add_task("b")
+        self.assertEqual(first.storage.journal_size, 0)
+
+        second.add_task("c")
+        self.assertEqual(list(second.tasks), [1, 2, 3])
+        first.save_tasks()
+        self.assertEqual(list(first.tasks), [1, 2, 3])
+
+    def test_json_storage_reloads_on_change(self):
+        """Обычный JSON-файл перечитывается, если его сохранил кто-то другой"""
+        first, second = TaskManager(self.filename), TaskManager(self.filename)
+        first.add_task("a")
+        second.add_task("b")
+        first.refresh()
+        self.assertEqual(list(first.tasks), [1, 2])
+
+
+class TestTaskIds(TaskManagerTestCase):
+    """Тесты стабильных id и индекса задач"""
+
+    def test_ids_are_not_renumbered_or_reused(self):
+        """Удаление не перенумеровывает задачи, id не переиспользуются"""
+        manager = TaskManager(self.filename)
+        for i in range(3):
+            manager.add_task(f"Задача {i}")
+        manager.delete_task(2)
+        manager.add_task("Новая")
+
+        self.assertEqual(list(manager.tasks), [1, 3, 4])
+        manager.delete_task(4)
+
+        reloaded = TaskManager(self.filename)
+        reloaded.add_task("Ещё одна")
+        self.assertEqual(list(reloaded.tasks), [1, 3, 5])
+
+    def test_unknown_id(self):
+        """Операции с несуществующим id ничего не меняют"""
+        manager = TaskManager(self.filename)
+        manager.add_task("Задача")
+        manager.complete_task(42)
+        manager.delete_task(42)
+        self.assertIn("не найдена", self.out.getvalue())
+        self.assertEqual(len(manager.tasks), 1)
+
+    def test_legacy_list_format_is_migrated(self):
+        """Старый tasks.json (просто список) читается и пересохраняется в новом формате"""
+        legacy = [
+            {'id': 1, 'description': "a", 'created': "2025-12-22 13:05:30",
+             'completed': True, 'completed_at': "2025-12-22 13:05:39"},
+            {'id': 2, 'description': "b", 'created': "2025-12-25 14:02:23",
+             'completed': False, 'completed_at': None},
+        ]
+        with open(self.filename, 'w', encoding='utf-8') as f:
+            json.dump(legacy, f)
+
+        manager = TaskManager(self.filename)
+        self.assertEqual(list(manager.tasks), [1, 2])
+        manager.add_task("c")
+        self.assertEqual(manager.tasks[3].description, "c")
+
+        with open(self.filename, encoding='utf-8') as f:
+            data = json.load(f)
+        self.assertEqual(data['next_id'], 4)
+        self.assertEqual(len(data['tasks']), 3)
+
+
+class TestTaskStats(TaskManagerTestCase):
+    """Тесты инкрементальных счётчиков статистики"""
+
+    def make_manager(self):
+        return TaskManager(self.filename, storage=JournalStorage(self.filename, compact_every=4))
+
+    def test_counters_follow_mutations(self):
+        """Счётчики совпадают с пересчётом по задачам и переживают перезагрузку"""
+        manager = self.make_manager()
+        for i in range(6):
+            manager.add_task(f"Задача {i}")
+        manager.complete_task(1)
+        manager.complete_task(2)
+        manager.delete_task(2)
+        manager.delete_task(3)
+        manager.close()
+
+        self.assertEqual(manager.count_tasks(), (4, 1))
+        self.assertEqual(manager.stats.pending, 3)
+        expected = TaskStats.from_tasks(task.to_dict() for task in manager.tasks.values())
+        self.assertEqual((expected.total, expected.completed), manager.count_tasks())
+
+        reloaded = self.make_manager()
+        self.assertEqual(reloaded.stats.to_dict(), manager.stats.to_dict())
+
+    def test_histograms_keep_history(self):
+        """Гистограммы по дням считают события, удаление их не уменьшает"""
+        manager = self.make_manager()
+        manager.add_task("a")
+        manager.add_task("b")
+        manager.complete_task(1)
+        manager.delete_task(1)
+
+        today = day_start()
+        self.assertEqual(manager.activity(today), (2, 1))
+        self.assertEqual(manager.activity("2100-01-01"), (0, 0))
+        manager.get_statistics()
+        self.assertIn("Сегодня: создано 2, выполнено 1", self.out.getvalue())
+
+
+class TestPagination(TaskManagerTestCase):
+    """Тесты постраничного вывода"""
+
+    def fill(self, manager):
+        for i in range(10):
+            manager.add_task(f"Задача {i}")
+        for task_id in (2, 3, 4):
+            manager.complete_task(task_id)
+        manager.delete_task(6)
+
+    def collect(self, manager, show_all):
+        ids, cursor = [], 0
+        while cursor is not None:
+            page, cursor = manager.page_tasks(show_all, page_size=3, after_id=cursor)
+            self.assertLessEqual(len(page), 3)
+            ids.extend(task.id for task in page)
+        return ids
+
+    def check(self, manager):
+        self.fill(manager)
+        self.assertEqual(self.collect(manager, True), [1, 2, 3, 4, 5, 7, 8, 9, 10])
+        self.assertEqual(self.collect(manager, False), [1, 5, 7, 8, 9, 10])
+
+    def check_last_page(self, manager):
+        """Курсор не выдаётся, если после страницы подходящих задач не осталось"""
+        manager.add_tasks([f"Задача {i}" for i in range(6)])
+        manager.complete_tasks([2, 3, 5, 6])
+        self.assertEqual(manager.page_tasks(False, page_size=1), ([manager.get_task(1)], 1))
+        page, cursor = manager.page_tasks(False, page_size=1, after_id=1)
+        self.assertEqual(([task.id for task in page], cursor), ([4], None))
+        page, cursor = manager.page_tasks(True, page_size=3, after_id=3)
+        self.assertEqual(([task.id for task in page], cursor), ([4, 5, 6], None))
+
+    def test_page_tasks(self):
+        """Курсор проходит все задачи без повторов, фильтр по статусу"""
+        self.check(TaskManager(self.filename))
+        self.check_last_page(TaskManager(os.path.join(self.tmpdir, "other.json")))
+
+    def test_page_tasks_sqlite(self):
+        """То же для SQLite"""
+        manager = SqliteTaskManager(os.path.join(self.tmpdir, "tasks.db"))
+        self.check(manager)
+        manager.close()
+        manager = SqliteTaskManager(os.path.join(self.tmpdir, "other.db"))
+        self.check_last_page(manager)
+        manager.close()
+
+    def test_page_size_must_be_positive(self):
+        """Пустая или отрицательная страница - ValueError, а не IndexError"""
+        sqlite_manager = SqliteTaskManager(os.path.join(self.tmpdir, "tasks.db"))
+        for manager in (TaskManager(self.filename), sqlite_manager):
+            manager.add_task("Задача")
+            for page_size in (0, -1):
+                with self.subTest(manager=type(manager).__name__, page_size=page_size), \
+                        self.assertRaises(ValueError):
+                    manager.page_tasks(page_size=page_size)
+        sqlite_manager.close()
+
+    def test_pages_skip_completed_and_deleted_blocks(self):
+        """Длинные серии выполненных и удалённых задач не попадают в обход, индексы переживают перезагрузку"""
+        manager = TaskManager(self.filename)
+        manager.add_tasks([f"Задача {i}" for i in range(2000)])
+        manager.complete_tasks(range(1, 1500))
+        manager.delete_tasks(range(1500, 1990))
+        page, cursor = manager.page_tasks(False, page_size=5)
+        self.assertEqual([task.id for task in page], [1990, 1991, 1992, 1993, 1994])
+        self.assertEqual(cursor, 1994)
+
+        reloaded = TaskManager(self.filename)
+        self.assertEqual(self.collect(reloaded, False), list(range(1990, 2001)))
+        self.assertEqual(len(self.collect(reloaded, True)), 1510)
+
+    def test_id_set(self):
+        """IdSet: добавление не по порядку, удаление, поиск после курсора"""
+        ids = IdSet([5, 700, 3])
+        ids.add(300)
+        ids.add(300)
+        ids.discard(700)
+        ids.discard(42)
+        self.assertEqual(len(ids), 3)
+        self.assertIn(300, ids)
+        self.assertNotIn(700, ids)
+        self.assertEqual(list(ids.after(0)), [3, 5, 300])
+        self.assertEqual(list(ids.after(5)), [300])
+        self.assertEqual(list(ids.after(300)), [])
+
+    def test_show_tasks_single_page(self):
+        """show_tasks с page_size выводит одну страницу и возвращает курсор"""
+        manager = TaskManager(self.filename)
+        self.fill(manager)
+        cursor = manager.show_tasks(show_all=False, page_size=2)
+        self.assertEqual(cursor, 5)
+        output = self.out.getvalue()
+        self.assertIn("1. ⏳ Задача 0", output)
+        self.assertNotIn("7. ⏳", output)
+
+        manager.show_tasks(show_all=True)
+        self.assertIn("4. ✅ Задача 3", self.out.getvalue())
+
+
+class TestBatch(TaskManagerTestCase):
+    """Тесты пакетных операций"""
+
+    def test_batch_is_single_write(self):
+        """Внутри batch() хранилище пишется один раз"""
+        storage = JsonFileStorage(self.filename)
+        writes = []
+        original_save = storage.save
+        storage.save = lambda state: (writes.append(1), original_save(state))
+        manager = TaskManager(self.filename, storage=storage)
+
+        manager.add_tasks(f"Задача {i}" for i in range(100))
+        self.assertEqual(len(writes), 1)
+        with manager.batch():
+            manager.complete_tasks([1, 2, 3, 999])
+            manager.delete_tasks([3, 4, 999])
+            manager.add_task("Ещё")
+        self.assertEqual(len(writes), 2)
+
+        reloaded = TaskManager(self.filename)
+        self.assertEqual(reloaded.count_tasks(), (99, 2))
+        self.assertEqual(reloaded.next_id, 102)
+
+    def test_batch_journal(self):
+        """Пачка в журнале проигрывается так же, как по одной"""
+        manager = TaskManager(self.filename, storage=JournalStorage(self.filename))
+        manager.add_tasks(["a", "b", "c"])
+        with manager.batch():
+            manager.complete_task(1)
+            manager.delete_task(2)
+        manager.close()
+
+        reloaded = TaskManager(self.filename, storage=JournalStorage(self.filename))
+        self.assertEqual(reloaded.tasks, manager.tasks)
+        self.assertEqual(reloaded.stats.to_dict(), manager.stats.to_dict())
+
+    def test_batch_discarded_on_error(self):
+        """Исключение внутри batch() отбрасывает его изменения в памяти и в хранилище"""
+        for storage in (JsonFileStorage(self.filename),
+                        JournalStorage(os.path.join(self.tmpdir, "journal.json"))):
+            with self.subTest(storage=type(storage).__name__):
+                manager = TaskManager(storage=storage)
+                manager.add_tasks(["a", "b"])
+                with self.assertRaises(RuntimeError), manager.batch():
+                    manager.add_task("c")
+                    manager.complete_task(1)
+                    with manager.batch():
+                        manager.delete_task(2)
+                    raise RuntimeError("сбой")
+                self.assertEqual(manager.count_tasks(), (2, 0))
+                self.assertEqual(manager.next_id, 3)
+                self.assertEqual([t.id for t in manager.page_tasks(False)[0]], [1, 2])
+
+                manager.add_task("d")
+                manager.close()
+                reloaded = TaskManager(storage=type(storage)(storage.filename))
+                self.assertEqual([t.description for t in reloaded.iter_tasks()], ["a", "b", "d"])
+                self.assertEqual(reloaded.tasks, manager.tasks)
+                reloaded.close()
+
+    def test_batch_sqlite_discarded_on_error(self):
+        """В SQLite исключение внутри batch() откатывает транзакцию"""
+        manager = SqliteTaskManager(os.path.join(self.tmpdir, "tasks.db"))
+        manager.add_tasks(["a", "b"])
+        with self.assertRaises(RuntimeError), manager.batch():
+            manager.add_task("c")
+            manager.complete_task(1)
+            raise RuntimeError("сбой")
+        self.assertEqual(manager.count_tasks(), (2, 0))
+        manager.add_task("d")
+        self.assertEqual([t.description for t in manager.iter_tasks()], ["a", "b", "d"])
+        manager.close()
+
+    def test_batch_sqlite(self):
+        """Пакетные операции в SQLite - одна транзакция"""
+        manager = SqliteTaskManager(os.path.join(self.tmpdir, "tasks.db"))
+        tasks = manager.add_tasks(["a", "b", "c"])
+        self.assertEqual([t.id for t in tasks], [1, 2, 3])
+        self.assertEqual(manager.complete_tasks([1, 2, 2]), 2)
+        self.assertEqual(manager.delete_tasks([3, 42]), 1)
+        self.assertEqual(manager.count_tasks(), (2, 2))
+        manager.close()
+
+    def test_read_descriptions(self):
+        """Чтение описаний для импорта пропускает пустые строки"""
+        path = os.path.join(self.tmpdir, "import.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("Первая\n\n  Вторая  \n")
+        self.assertEqual(list(read_descriptions(path)), ["Первая", "Вторая"])
+
+    def test_import_appends_journal_only(self):
+        """--import пишет одну пачку в журнал и не перезаписывает снимок"""
+        path = os.path.join(self.tmpdir, "import.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("Первая\nВторая\nТретья\n")
+        cwd = os.getcwd()
+        os.chdir(self.tmpdir)
+        try:
+            with patch("sys.argv", ["main.py", "--import", path]):
+                task_main()
+        finally:
+            os.chdir(cwd)
+
+        self.assertFalse(os.path.exists(self.filename))
+        reloaded = TaskManager(self.filename, storage=JournalStorage(self.filename))
+        self.assertEqual([t.description for t in reloaded.iter_tasks()], ["Первая", "Вторая", "Третья"])
+        reloaded.close()
+
+
+class TestSearch(TaskManagerTestCase):
+    """Тесты полнотекстового поиска"""
+
+    DESCRIPTIONS = ["Написать отчёт по РК2", "Купить молоко", "Отчет по лабораторной 5",
+                    "Позвонить маме", "купить хлеб и МОЛОКО"]
+
+    def check(self, manager):
+        manager.add_tasks(self.DESCRIPTIONS)
+        ids = lambda query: [task.id for task in manager.search_tasks(query)]
+
+        self.assertEqual(ids("молоко"), [2, 5])
+        self.assertEqual(ids("КУПИТЬ молоко"), [2, 5])
+        self.assertEqual(ids("хлеб молоко"), [5])
+        self.assertEqual(ids("отч"), [1, 3])
+        self.assertEqual(ids("самолёт"), [])
+        self.assertEqual(ids("  "), [])
+
+        manager.delete_task(2)
+        manager.add_task("Молоко для кота")
+        self.assertEqual(ids("молоко"), [5, 6])
+        self.assertEqual(len(manager.search_tasks("молоко", limit=1)), 1)
+
+    def test_search_index(self):
+        """Индекс строится лениво и обновляется при добавлении/удалении"""
+        manager = TaskManager(self.filename)
+        self.check(manager)
+        self.assertIsNotNone(manager.search_index)
+
+        reloaded = TaskManager(self.filename)
+        self.assertIsNone(reloaded.search_index)
+        self.assertEqual([t.id for t in reloaded.search_tasks("молоко")], [5, 6])
+
+    def test_search_sqlite(self):
+        """Поиск в SQLite через FTS5"""
+        manager = SqliteTaskManager(os.path.join(self.tmpdir, "tasks.db"))
+        self.check(manager)
+        manager.close()
+
+    def test_sqlite_matches_index(self):
+        """SQLite (FTS5 и запасной LIKE) находит те же задачи, что и SearchIndex"""
+        descriptions = self.DESCRIPTIONS + ["ОТЧЕТ второй", "Мой ёжик", "мои заметки", "snake_case и SNAKE"]
+        queries = ["отчёт", "ОТЧЁТ вт", "Отч", "ёж", "ЕЖИК", "мой", "мои", "snake_", "snake_c", "snake",
+                   "молоко купить", "о", "50%", "лаб 5"]
+        memory = TaskManager(self.filename)
+        memory.add_tasks(descriptions)
+        expected = {query: [task.id for task in memory.search_tasks(query)] for query in queries}
+        self.assertEqual(expected["отчёт"], [1, 3, 6])
+
+        manager = SqliteTaskManager(os.path.join(self.tmpdir, "tasks.db"))
+        manager.add_tasks(descriptions)
+        for fts in (manager.fts, False):
+            manager.fts = fts
+            for query in queries:
+                with self.subTest(fts=fts, query=query):
+                    self.assertEqual([task.id for task in manager.search_tasks(query)], expected[query])
+        manager.close()
+
+    def test_sqlite_adds_folded_column(self):
+        """База без колонки folded дополняется при открытии, поиск работает"""
+        path = os.path.join(self.tmpdir, "old.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, description TEXT NOT NULL,"
+                     " created TEXT NOT NULL, completed INTEGER NOT NULL DEFAULT 0, completed_at TEXT)")
+        conn.execute("INSERT INTO tasks (description, created) VALUES ('Написать отчёт', '2024-01-01 10:00:00')")
+        conn.commit()
+        conn.close()
+
+        manager = SqliteTaskManager(path)
+        manager.add_task("ОТЧЕТ второй")
+        self.assertEqual([task.id for task in manager.search_tasks("отчет")], [1, 2])
+        manager.close()
+
+    def test_yo_is_folded(self):
+        """ё и е при поиске не различаются"""
+        index = SearchIndex.from_tasks([Task(1, "Ёлка", 0), Task(2, "елка", 0)])
+        self.assertEqual(index.search("ЕЛКА"), [1, 2])
+        self.assertEqual(index.search("ёл"), [1, 2])
+
+
+class TestSqliteTaskManager(TaskManagerTestCase):
+    """Тесты варианта TaskManager на SQLite"""
+
+    def setUp(self):
+        super().setUp()
+        self.manager = SqliteTaskManager(os.path.join(self.tmpdir, "tasks.db"))
+
+    def tearDown(self):
+        self.manager.close()
+        super().tearDown()
+
+    def test_add_complete_delete(self):
+        """Основные операции и статистика через запросы"""
+        for i in range(5):
+            self.manager.add_task(f"Задача {i}")
+        self.manager.complete_task(2)
+        self.manager.complete_task(2)
+        self.manager.delete_task(3)
+        self.manager.delete_task(3)
+
+        self.assertEqual(self.manager.count_tasks(), (4, 1))
+        self.assertEqual([t.id for t in self.manager.iter_tasks(show_all=False)], [1, 4, 5])
+        self.assertTrue(self.manager.get_task(2).completed)
+        self.assertIn("уже выполнена", self.out.getvalue())
+        self.assertIn("не найдена", self.out.getvalue())
+
+    def test_ids_survive_reopen(self):
+        """Id не переиспользуются после удаления и переоткрытия базы"""
+        self.manager.add_task("a")
+        self.manager.add_task("b")
+        self.manager.delete_task(2)
+        self.manager.close()
+
+        self.manager = SqliteTaskManager(os.path.join(self.tmpdir, "tasks.db"))
+        self.manager.add_task("c")
+        self.assertEqual([t.id for t in self.manager.iter_tasks()], [1, 3])
+
+    def test_import_tasks(self):
+        """Импорт задач из JSON-хранилища"""
+        manager = TaskManager(self.filename)
+        manager.add_task("a")
+        manager.add_task("b")
+        manager.complete_task(1)
+
+        self.manager.import_tasks(manager.iter_tasks())
+        self.assertEqual(list(self.manager.iter_tasks()), list(manager.iter_tasks()))
+        self.assertEqual(self.manager.count_tasks(), (2, 1))
+        self.assertEqual(self.manager.activity(day_start()), (2, 1))
+
+
+class TestTaskServer(unittest.IsolatedAsyncioTestCase):
+    """Тесты HTTP-сервиса и группового коммита"""
+
+    async def asyncSetUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        filename = os.path.join(self.tmpdir, "tasks.json")
+        self.server = TaskServer(TaskManager(filename, storage=JournalStorage(filename)))
+        self.listener = await self.server.start(port=0)
+        port = self.listener.sockets[0].getsockname()[1]
+        self.reader, self.writer = await asyncio.open_connection("127.0.0.1", port)
+
+    async def asyncTearDown(self):
+        self.writer.close()
+        self.listener.close()
+        await self.server.stop()
+        shutil.rmtree(self.tmpdir)
+
+    async def test_http_round_trip(self):
+        """Запросы по keep-alive соединению"""
+        status, task = await request(self.reader, self.writer, "POST", "/tasks", {'description': "Купить молоко"})
+        self.assertEqual((status, task['id']), (201, 1))
+        status, _ = await request(self.reader, self.writer, "POST", "/tasks/1/complete")
+        self.assertEqual(status, 200)
+        status, _ = await request(self.reader, self.writer, "POST", "/tasks/1/complete")
+        self.assertEqual(status, 409)
+        status, found = await request(self.reader, self.writer, "GET", "/search?q=%D0%BC%D0%BE%D0%BB")
+        self.assertEqual([t['id'] for t in found['tasks']], [1])
+        status, _ = await request(self.reader, self.writer, "DELETE", "/tasks/1")
+        self.assertEqual(status, 200)
+        status, _ = await request(self.reader, self.writer, "GET", "/tasks/1")
+        self.assertEqual(status, 404)
+        status, _ = await request(self.reader, self.writer, "POST", "/tasks", {'description': " "})
+        self.assertEqual(status, 400)
+
+    async def test_bad_limit(self):
+        """limit < 1 - ответ 400, соединение остаётся рабочим"""
+        await request(self.reader, self.writer, "POST", "/tasks", {'description': "Купить молоко"})
+        for target in ("/tasks?limit=0", "/tasks?limit=-1", "/search?q=%D0%BC%D0%BE%D0%BB&limit=-1"):
+            with self.subTest(target=target):
+                status, payload = await request(self.reader, self.writer, "GET", target)
+                self.assertEqual(status, 400)
+                self.assertIn('error', payload)
+        status, page = await request(self.reader, self.writer, "GET", "/tasks?limit=1")
+        self.assertEqual((status, [t['id'] for t in page['tasks']]), (200, [1]))
+
+    async def test_handler_error_is_500(self):
+        """Непредвиденная ошибка обработчика - ответ 500, а не оборванное соединение"""
+        with patch.object(self.server, '_stats', side_effect=RuntimeError("сбой")):
+            status, payload = await request(self.reader, self.writer, "GET", "/stats")
+        self.assertEqual(status, 500)
+        self.assertIn("сбой", payload['error'])
+        status, _ = await request(self.reader, self.writer, "GET", "/stats")
+        self.assertEqual(status, 200)
+
+    async def test_group_commit(self):
+        """Одновременные изменения записываются общими пачками"""
+        results = await asyncio.gather(*(self.server.dispatch("POST", "/tasks", json.dumps(
+            {'description': f"Задача {i}"}).encode('utf-8')) for i in range(50)))
+        self.assertEqual(sorted(task['id'] for _, task in results), list(range(1, 51)))
+        self.assertEqual(self.server.writes, 50)
+        self.assertLess(self.server.batches, 50)
+
+        status, page = await self.server.dispatch("GET", "/tasks?limit=10&after=45", b"")
+        self.assertEqual([t['id'] for t in page['tasks']], [46, 47, 48, 49, 50])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
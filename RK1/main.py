@@ -1,9 +1,13 @@
 class ProgrammingLanguage:
+    __slots__ = ('id', 'name')
+
     def __init__(self, id, name):
         self.id = id
         self.name = name
 
 class DevelopmentTool:
+    __slots__ = ('id', 'name', 'license_cost', 'lang_id')
+
     def __init__(self, id, name, license_cost, lang_id=None):
         self.id = id
         self.name = name
@@ -11,6 +15,8 @@ class DevelopmentTool:
         self.lang_id = lang_id
 
 class ToolLanguage:
+    __slots__ = ('tool_id', 'lang_id')
+
     def __init__(self, tool_id, lang_id):
         self.tool_id = tool_id
         self.lang_id = lang_id
@@ -48,20 +54,30 @@ tool_langs = [
 
 
 def main():
+    # Хеш-индексы вместо вложенных циклов: id -> объект и связи по языку
+    langs_by_id = {lang.id: lang for lang in reversed(langs)}
+    tools_by_id = {tool.id: tool for tool in reversed(tools)}
+    tools_by_lang = {}
+    for tool in tools:
+        tools_by_lang.setdefault(tool.lang_id, []).append(tool)
+    linked_tool_ids = {}
+    for tl in tool_langs:
+        linked_tool_ids.setdefault(tl.lang_id, []).append(tl.tool_id)
+
     print("Запрос 1:")
-    query1 = [(tool.name, next(lang.name for lang in langs if lang.id == tool.lang_id))
+    query1 = [(tool.name, langs_by_id[tool.lang_id].name)
               for tool in tools if tool.name.endswith('ov') or tool.name.endswith('OV')]
     print("Средства разработки с названиями на 'ov':", query1)
 
     print("\nЗапрос 1 (альтернатива - окончание 'Studio'):")
-    query1_alt = [(tool.name, next(lang.name for lang in langs if lang.id == tool.lang_id))
+    query1_alt = [(tool.name, langs_by_id[tool.lang_id].name)
                   for tool in tools if tool.name.endswith('Studio')]
     print(query1_alt)
 
     print("\nЗапрос 2:")
     lang_tool_stats = {}
     for lang in langs:
-        lang_tools = [tool for tool in tools if tool.lang_id == lang.id]
+        lang_tools = tools_by_lang.get(lang.id)
         if lang_tools:
             total_cost = sum(tool.license_cost for tool in lang_tools)
             count = len(lang_tools)
@@ -78,11 +94,10 @@ def main():
     for lang in langs:
         if lang.name.startswith('A'):
             supporting_tools = []
-            for tl in tool_langs:
-                if tl.lang_id == lang.id:
-                    tool = next((t for t in tools if t.id == tl.tool_id), None)
-                    if tool:
-                        supporting_tools.append(tool.name)
+            for tool_id in linked_tool_ids.get(lang.id, ()):
+                tool = tools_by_id.get(tool_id)
+                if tool:
+                    supporting_tools.append(tool.name)
             query3.append((lang.name, supporting_tools))
 
     print("Языки на 'A' и их инструменты (многие-ко-многим):")
@@ -0,0 +1,173 @@
+# bench_catalog.py
+# Замеры всех запросов ProgrammingToolsService и ColumnarToolsService на
+# синтетических каталогах: время на вызов и пик памяти (tracemalloc).
+# Время меряется без трассировки, память - отдельным проходом под tracemalloc:
+# он сильно замедляет выделение памяти и исказил бы время.
+# Результаты можно записать в JSON Lines и сравнить с прошлым запуском:
+# при замедлении больше чем в --tolerance раз код возврата 1.
+#
+# Запуск: python bench_catalog.py [--sizes 1000 100000 1000000] [--json out.jsonl]
+#                                 [--compare baseline.jsonl] [--tolerance 1.5]
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from columnar import ColumnarToolsService
+from programming_tools import DevelopmentTool, ProgrammingToolsService
+from synthetic import LANG_ROOTS, NAME_DISTRIBUTIONS, TOOL_WORDS, generate_catalog, generate_tables
+
+BACKENDS = ("objects", "columns")
+
+
+def measure_memory(fn):
+    """(результат, пик памяти в байтах сверх уже занятой)"""
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, peak - base
+
+
+def measure_time(fn, min_time, max_calls):
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while calls < max_calls and (calls == 0 or elapsed < min_time):
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+    return calls, elapsed / calls
+
+
+def workload(service, size, langs, rng):
+    """Имя метода -> вызов со случайными, но существующими аргументами"""
+    ids = lambda n: rng.randrange(1, n + 1)
+    methods = {
+        'get_tool_by_id': lambda: service.get_tool_by_id(ids(size)),
+        'get_language_by_id': lambda: service.get_language_by_id(ids(langs)),
+        'get_tools_by_name_ending': lambda: service.get_tools_by_name_ending(rng.choice(TOOL_WORDS)),
+        'get_tools_by_name_ending_ignore_case':
+            lambda: service.get_tools_by_name_ending(rng.choice(TOOL_WORDS).lower(), ignore_case=True),
+        'get_languages_starting_with_letter':
+            lambda: service.get_languages_starting_with_letter(rng.choice(LANG_ROOTS)),
+        'get_average_tool_cost_by_language': service.get_average_tool_cost_by_language,
+        'get_cost_summary_by_language': service.get_cost_summary_by_language,
+        'tools_of_language': lambda: service.tools_of_language(ids(langs)),
+        'tools_linked_to_language': lambda: service.tools_linked_to_language(ids(langs)),
+        'query_free_tools_by_language': lambda: (service.query_tools()
+                                                 .filter(lambda tool: tool.license_cost == 0)
+                                                 .join_language()
+                                                 .group(lambda pair: pair[1].id, len)
+                                                 .to_list()),
+    }
+    if not isinstance(service, ColumnarToolsService):
+        next_id = iter(range(size + 1, 2 ** 62))
+
+        def add_remove():
+            tool_id = next(next_id)
+            service.add_tool(DevelopmentTool(tool_id, f"T{tool_id} Bench", 1, ids(langs)))
+            service.remove_tool(tool_id)
+        methods['add_tool+remove_tool'] = add_remove
+    return methods
+
+
+def bench(size, backend, args):
+    langs = args.langs or max(10, size // 100)
+    params = dict(tools=size, langs=langs, fanout=args.fanout, names=args.names, seed=args.seed)
+    records = []
+
+    def record(method, calls, seconds, peak):
+        row = {'size': size, 'backend': backend, 'method': method, 'calls': calls,
+               'seconds_per_call': seconds, 'peak_bytes': peak}
+        records.append(row)
+        print(f"{size:>9} {backend:>8} {method:>38} {calls:>7} {seconds * 1e6:14.1f} {peak / 2 ** 20:10.2f}",
+              flush=True)
+
+    if backend == "objects":
+        generate = lambda: generate_catalog(**params)
+        build = lambda: ProgrammingToolsService(*data, cache_size=0)
+    else:
+        generate = lambda: generate_tables(**params)
+        build = lambda: ColumnarToolsService.from_tables(*data, cache_size=0)
+
+    start = time.perf_counter()
+    data = generate()
+    generate_time = time.perf_counter() - start
+    start = time.perf_counter()
+    service = build()
+    build_time = time.perf_counter() - start
+    if args.memory:
+        del service
+        data, generate_peak = measure_memory(generate)
+        service, build_peak = measure_memory(build)
+    else:
+        generate_peak = build_peak = 0
+    record('generate', 1, generate_time, generate_peak)
+    record('build', 1, build_time, build_peak)
+
+    rng = random.Random(args.seed)
+    for method, fn in workload(service, size, langs, rng).items():
+        # Первый вызов отдельно: он же строит ленивые индексы
+        if args.memory:
+            _, peak = measure_memory(fn)
+        else:
+            fn()
+            peak = 0
+        calls, seconds = measure_time(fn, args.min_time, args.max_calls)
+        record(method, calls, seconds, peak)
+    return records
+
+
+def compare(records, baseline_path, tolerance):
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(row['size'], row['backend'], row['method']): row for row in map(json.loads, f)}
+    regressions = []
+    for row in records:
+        old = baseline.get((row['size'], row['backend'], row['method']))
+        if old and row['seconds_per_call'] > old['seconds_per_call'] * tolerance:
+            regressions.append((row, old))
+    for row, old in regressions:
+        print(f"❌ {row['backend']} {row['method']} ({row['size']}): "
+              f"{old['seconds_per_call'] * 1e6:.1f} -> {row['seconds_per_call'] * 1e6:.1f} мкс")
+    if not regressions:
+        print("✅ Замедлений относительно базового запуска нет")
+    return not regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замеры запросов каталога инструментов")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--backend', choices=BACKENDS, nargs='+', default=list(BACKENDS))
+    parser.add_argument('--langs', type=int, default=0, help="по умолчанию 1 язык на 100 инструментов")
+    parser.add_argument('--fanout', type=int, default=2)
+    parser.add_argument('--names', choices=NAME_DISTRIBUTIONS, default="zipf")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--min-time', type=float, default=0.2, help="секунд на метод")
+    parser.add_argument('--max-calls', type=int, default=10000)
+    parser.add_argument('--no-memory', dest='memory', action='store_false',
+                        help="не мерить память (проход под tracemalloc медленный)")
+    parser.add_argument('--json', metavar='FILE', help="записать результаты в JSON Lines")
+    parser.add_argument('--compare', metavar='FILE', help="сравнить с прошлыми результатами")
+    parser.add_argument('--tolerance', type=float, default=1.5)
+    args = parser.parse_args()
+
+    print(f"{'строк':>9} {'хранение':>8} {'метод':>38} {'вызовов':>7} {'мкс/вызов':>14} {'пик,МБ':>10}")
+    records = []
+    for size in args.sizes:
+        for backend in args.backend:
+            records += bench(size, backend, args)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            for row in records:
+                f.write(json.dumps(row) + "\n")
+    if args.compare and not compare(records, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
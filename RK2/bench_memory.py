@@ -0,0 +1,77 @@
+# bench_memory.py
+# Память на хранение каталога: объекты с __dict__, объекты со __slots__
+# и колоночные таблицы; затем сервисы целиком вместе с индексами.
+# Запуск: python bench_memory.py [число инструментов ...]   (по умолчанию 100000 1000000)
+import sys
+import tracemalloc
+
+from columnar import ColumnarToolsService, LanguageTable, LinkTable, ToolTable
+from programming_tools import DevelopmentTool, ProgrammingLanguage, ProgrammingToolsService, ToolLanguage
+
+LANGS = 1000
+LINKS_PER_TOOL = 3
+
+
+# Те же классы, но с __dict__ у каждого экземпляра - как было до __slots__
+class DictLanguage(ProgrammingLanguage):
+    pass
+
+
+class DictTool(DevelopmentTool):
+    pass
+
+
+class DictLink(ToolLanguage):
+    pass
+
+
+def build_objects(count, lang_cls, tool_cls, link_cls):
+    langs = [lang_cls(i, f"Lang{i}") for i in range(1, LANGS + 1)]
+    tools = [tool_cls(i, f"Tool{i % 5000}", i % 300, i % LANGS + 1) for i in range(1, count + 1)]
+    tool_langs = [link_cls(i, (i * k) % LANGS + 1) for i in range(1, count + 1) for k in range(1, LINKS_PER_TOOL + 1)]
+    return langs, tools, tool_langs
+
+
+def build_tables(count):
+    langs, tools, links = LanguageTable(), ToolTable(), LinkTable()
+    for i in range(1, LANGS + 1):
+        langs.append(i, f"Lang{i}")
+    for i in range(1, count + 1):
+        tools.append(i, f"Tool{i % 5000}", i % 300, i % LANGS + 1)
+        for k in range(1, LINKS_PER_TOOL + 1):
+            links.append(i, (i * k) % LANGS + 1)
+    return langs, tools, links
+
+
+def measure(build):
+    tracemalloc.start()
+    result = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, peak
+
+
+def bench(count):
+    variants = [
+        ("__dict__", lambda: build_objects(count, DictLanguage, DictTool, DictLink)),
+        ("__slots__", lambda: build_objects(count, ProgrammingLanguage, DevelopmentTool, ToolLanguage)),
+        ("колонки", lambda: build_tables(count)),
+        ("сервис", lambda: ProgrammingToolsService(*build_objects(count, ProgrammingLanguage,
+                                                                 DevelopmentTool, ToolLanguage))),
+        ("сервис-колонки", lambda: ColumnarToolsService.from_tables(*build_tables(count))),
+    ]
+    for name, build in variants:
+        current, peak = measure(build)
+        print(f"{count:>11} {count * LINKS_PER_TOOL:>9} {name:>15} {current / 2 ** 20:10.1f} {peak / 2 ** 20:10.1f}")
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [100000, 1000000]
+    print(f"{'инструментов':>11} {'связей':>9} {'хранение':>15} {'память,МБ':>10} {'пик,МБ':>10}")
+    for count in counts:
+        bench(count)
+
+
+if __name__ == "__main__":
+    main()
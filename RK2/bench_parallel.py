@@ -0,0 +1,38 @@
+# bench_parallel.py
+# Отчёт по стоимости (get_cost_summary_by_language) в одном процессе и в пуле
+# процессов с общей памятью. Первый параллельный вызов дополнительно
+# копирует столбец стоимостей в общую память и запускает пул.
+# Запуск: python bench_parallel.py [строк] [процессов ...]   (по умолчанию 1000000 и 1 2 4)
+import sys
+import time
+
+from columnar import ColumnarToolsService
+from parallel import ParallelToolsService
+from synthetic import generate_tables
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    worker_counts = [int(arg) for arg in sys.argv[2:]] or [1, 2, 4]
+    tables = generate_tables(tools=rows, langs=max(10, rows // 100))
+
+    sequential = ColumnarToolsService.from_tables(*tables, cache_size=0)
+    base = timed(sequential.get_cost_summary_by_language)
+    print(f"{'процессов':>9} {'первый,с':>9} {'повтор,с':>9} {'ускорение':>10}")
+    print(f"{'-':>9} {base:9.3f} {base:9.3f} {1:10.2f}")
+
+    for workers in worker_counts:
+        with ParallelToolsService.from_tables(*tables, cache_size=0, workers=workers) as service:
+            first = timed(service.get_cost_summary_by_language)
+            again = timed(service.get_cost_summary_by_language)
+        print(f"{workers:>9} {first:9.3f} {again:9.3f} {base / again:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
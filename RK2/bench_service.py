@@ -0,0 +1,72 @@
+# bench_service.py
+# Смешанная нагрузка на ProgrammingToolsService: 80% чтений, 20% изменений.
+# Для сравнения печатается время полной перестройки через set_data,
+# которое без инкрементальных изменений пришлось бы платить на каждую запись.
+# Запуск: python bench_service.py [операций] [число инструментов ...]
+#         (по умолчанию 20000 операций и 10000 100000 инструментов)
+import random
+import sys
+import time
+
+from programming_tools import DevelopmentTool, ProgrammingLanguage, ProgrammingToolsService, ToolLanguage
+
+
+def make_catalog(tools_count, langs_count=500):
+    langs = [ProgrammingLanguage(i, f"Lang{i}") for i in range(1, langs_count + 1)]
+    tools = [DevelopmentTool(i, f"Tool{i}", i % 300, i % langs_count + 1) for i in range(1, tools_count + 1)]
+    tool_langs = [ToolLanguage(i, (i * 7) % langs_count + 1) for i in range(1, tools_count + 1)]
+    return langs, tools, tool_langs
+
+
+def bench(tools_count, operations):
+    langs, tools, tool_langs = make_catalog(tools_count)
+    start = time.perf_counter()
+    service = ProgrammingToolsService(langs, tools, tool_langs)
+    rebuild = time.perf_counter() - start
+
+    rng = random.Random(tools_count)
+    live = list(range(1, tools_count + 1))
+    next_id = tools_count + 1
+    reads = writes = 0
+    start = time.perf_counter()
+    for _ in range(operations):
+        roll = rng.random()
+        if roll < 0.4:
+            service.get_tool_by_id(rng.choice(live))
+        elif roll < 0.6:
+            service.get_tools_by_name_ending(f"{rng.randrange(1000)}7")
+        elif roll < 0.7:
+            service.get_languages_starting_with_letter(f"Lang{rng.randrange(100, len(langs))}")
+        elif roll < 0.8:
+            service.get_average_tool_cost_by_language()
+        elif roll < 0.9:
+            lang_id = rng.randrange(1, len(langs) + 1)
+            service.add_tool(DevelopmentTool(next_id, f"Tool{next_id}", rng.randrange(300), lang_id))
+            service.link_tool_language(next_id, lang_id)
+            live.append(next_id)
+            next_id += 1
+        else:
+            index = rng.randrange(len(live))
+            live[index], live[-1] = live[-1], live[index]
+            service.remove_tool(live.pop())
+        if roll < 0.8:
+            reads += 1
+        else:
+            writes += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"{tools_count:>11} {rebuild:13.3f} {operations:>9} {elapsed:9.3f} "
+          f"{operations / elapsed:11.0f} {writes:>9}")
+
+
+def main():
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    counts = [int(arg) for arg in sys.argv[2:]] or [10000, 100000]
+    print(f"{'инструментов':>11} {'set_data,с':>13} {'операций':>9} {'время,с':>9} "
+          f"{'операций/с':>11} {'изменений':>9}")
+    for tools_count in counts:
+        bench(tools_count, operations)
+
+
+if __name__ == "__main__":
+    main()
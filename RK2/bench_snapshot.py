@@ -0,0 +1,54 @@
+# bench_snapshot.py
+# Запуск процесса, обслуживающего каталог: построение индексов с нуля
+# против открытия готового снимка через mmap, плюс первые запросы.
+# Запуск: python bench_snapshot.py [число инструментов ...]   (по умолчанию 100000 1000000)
+import os
+import sys
+import tempfile
+import time
+
+from columnar import ColumnarToolsService
+from snapshot import SnapshotToolsService, save_snapshot
+from synthetic import generate_tables
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def first_queries(service):
+    service.get_tool_by_id(len(service.tool_table) // 2)
+    service.get_languages_starting_with_letter("Rust")
+    service.get_average_tool_cost_by_language()
+
+
+def bench(count, tmpdir):
+    path = os.path.join(tmpdir, f"catalog_{count}.snap")
+    tables = generate_tables(tools=count, langs=max(10, count // 100))
+
+    built, build_time = timed(lambda: ColumnarToolsService.from_tables(*tables))
+    _, built_query_time = timed(lambda: first_queries(built))
+    _, save_time = timed(lambda: save_snapshot(built, path))
+
+    snapshot, open_time = timed(lambda: SnapshotToolsService.open(path))
+    _, snapshot_query_time = timed(lambda: first_queries(snapshot))
+    snapshot.close()
+
+    size = os.path.getsize(path) / 2 ** 20
+    print(f"{count:>11} {build_time:10.3f} {built_query_time:10.3f} {save_time:10.3f} "
+          f"{open_time * 1000:10.2f} {snapshot_query_time:10.3f} {size:10.1f}")
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [100000, 1000000]
+    print(f"{'инструментов':>11} {'индексы,с':>10} {'запросы,с':>10} {'снимок,с':>10} "
+          f"{'открытие,мс':>10} {'запросы,с':>10} {'размер,МБ':>10}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for count in counts:
+            bench(count, tmpdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+# columnar.py
+# Колоночное представление каталога: числа лежат в array, имена интернируются.
+# Вместо миллионов объектов с атрибутами - по одному массиву на столбец.
+import sys
+from array import array
+from bisect import bisect_left
+
+from programming_tools import (
+    DevelopmentTool,
+    NameIndex,
+    ProgrammingLanguage,
+    ProgrammingToolsService,
+    ReadOnlyCatalogError,
+    ToolLanguage,
+    aggregate_costs,
+    cached_query,
+    copy_groups
+)
+from query import Query
+
+# lang_id = None в колонке int64
+NULL_ID = -2 ** 63
+
+
+def to_column(value):
+    return NULL_ID if value is None else value
+
+
+def from_column(value):
+    return None if value == NULL_ID else value
+
+
+class LanguageTable:
+    def __init__(self):
+        self.ids = array('q')
+        self.names = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, id, name):
+        self.ids.append(id)
+        self.names.append(sys.intern(name))
+
+    def row(self, i):
+        return ProgrammingLanguage(self.ids[i], self.names[i])
+
+    @classmethod
+    def from_columns(cls, ids, names):
+        """Таблица поверх готовых столбцов (например, из снимка) без копирования"""
+        table = cls()
+        table.ids, table.names = ids, names
+        return table
+
+    @classmethod
+    def from_objects(cls, langs):
+        table = cls()
+        for lang in langs:
+            table.append(lang.id, lang.name)
+        return table
+
+
+class ToolTable:
+    def __init__(self):
+        self.ids = array('q')
+        self.names = []
+        self.costs = array('d')
+        self.lang_ids = array('q')
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, id, name, license_cost, lang_id=None):
+        self.ids.append(id)
+        self.names.append(sys.intern(name))
+        self.costs.append(license_cost)
+        self.lang_ids.append(to_column(lang_id))
+
+    def row(self, i):
+        return DevelopmentTool(self.ids[i], self.names[i], self.costs[i], from_column(self.lang_ids[i]))
+
+    @classmethod
+    def from_columns(cls, ids, names, costs, lang_ids):
+        table = cls()
+        table.ids, table.names, table.costs, table.lang_ids = ids, names, costs, lang_ids
+        return table
+
+    @classmethod
+    def from_objects(cls, tools):
+        table = cls()
+        for tool in tools:
+            table.append(tool.id, tool.name, tool.license_cost, tool.lang_id)
+        return table
+
+
+class LinkTable:
+    def __init__(self):
+        self.tool_ids = array('q')
+        self.lang_ids = array('q')
+
+    def __len__(self):
+        return len(self.tool_ids)
+
+    def append(self, tool_id, lang_id):
+        self.tool_ids.append(tool_id)
+        self.lang_ids.append(lang_id)
+
+    def row(self, i):
+        return ToolLanguage(self.tool_ids[i], self.lang_ids[i])
+
+    @classmethod
+    def from_columns(cls, tool_ids, lang_ids):
+        table = cls()
+        table.tool_ids, table.lang_ids = tool_ids, lang_ids
+        return table
+
+    @classmethod
+    def from_objects(cls, tool_langs):
+        table = cls()
+        for tl in tool_langs:
+            table.append(tl.tool_id, tl.lang_id)
+        return table
+
+
+def order_by_id(ids):
+    """Номера строк, отсортированные по id (устойчиво: при повторе id первой идёт первая строка)"""
+    return array('q', sorted(range(len(ids)), key=ids.__getitem__))
+
+
+def group_rows(keys):
+    """Строки, устойчиво отсортированные по ключу, и ключ -> (начало, конец) в этом порядке"""
+    order = array('q', sorted(range(len(keys)), key=keys.__getitem__))
+    ranges = {}
+    start = 0
+    for end in range(1, len(order) + 1):
+        if end == len(order) or keys[order[end]] != keys[order[start]]:
+            ranges[keys[order[start]]] = (start, end)
+            start = end
+    return order, ranges
+
+
+def find_row(order, ids, value):
+    if value is None:
+        # Отсутствующий id (инструмент без языка) не сравним с int
+        return None
+    i = bisect_left(order, value, key=ids.__getitem__)
+    if i < len(order) and ids[order[i]] == value:
+        return order[i]
+    return None
+
+
+class ColumnarToolsService(ProgrammingToolsService):
+    """Тот же набор запросов поверх колонок, только для чтения.
+
+    Поиск по id - бисекция по массиву номеров строк, отсортированных по id;
+    связи многие-ко-многим хранятся сгруппированными по lang_id (как CSR):
+    один массив tool_id и словарь lang_id -> (начало, конец); так же
+    сгруппированы строки инструментов по их lang_id.
+    """
+
+    read_only = True
+
+    def set_data(self, langs, tools, tool_langs):
+        self.set_tables(LanguageTable.from_objects(langs), ToolTable.from_objects(tools),
+                        LinkTable.from_objects(tool_langs))
+
+    @classmethod
+    def from_tables(cls, lang_table, tool_table, link_table, **options):
+        service = cls(**options)
+        service.set_tables(lang_table, tool_table, link_table)
+        return service
+
+    def set_tables(self, lang_table, tool_table, link_table):
+        self.cache.clear()
+        self.lang_table = lang_table
+        self.tool_table = tool_table
+        self.link_table = link_table
+        self._lang_order = order_by_id(lang_table.ids)
+        self._tool_order = order_by_id(tool_table.ids)
+
+        # Связи, устойчиво отсортированные по lang_id: порядок внутри языка сохраняется
+        links, self._link_ranges = group_rows(link_table.lang_ids)
+        self._link_tool_ids = array('q', (link_table.tool_ids[i] for i in links))
+        self._tool_rows_by_lang, self._tool_ranges = group_rows(tool_table.lang_ids)
+
+        # Индексы имён строятся при первом запросе
+        self._name_indexes = {}
+
+    @property
+    def langs(self):
+        return [self.lang_table.row(i) for i in range(len(self.lang_table))]
+
+    @property
+    def tools(self):
+        return [self.tool_table.row(i) for i in range(len(self.tool_table))]
+
+    @property
+    def tool_langs(self):
+        return [self.link_table.row(i) for i in range(len(self.link_table))]
+
+    def _name_index(self, table, ignore_case):
+        index = self._name_indexes.get((table, ignore_case))
+        if index is None:
+            names = self.tool_table.names if table == 'tools' else self.lang_table.names
+            index = NameIndex(names, ignore_case)
+            self._name_indexes[(table, ignore_case)] = index
+        return index
+
+    def _lang_row(self, lang_id):
+        return find_row(self._lang_order, self.lang_table.ids, lang_id)
+
+    def _tool_row(self, tool_id):
+        return find_row(self._tool_order, self.tool_table.ids, tool_id)
+
+    # --- изменения не поддерживаются ---
+
+    def _read_only(self, *args):
+        raise ReadOnlyCatalogError("колоночный каталог только для чтения, используйте set_tables")
+
+    add_language = add_tool = remove_tool = link_tool_language = unlink = _read_only
+
+    # --- запросы ---
+
+    def query_tools(self):
+        return Query(self, (self.tool_table.row(i) for i in range(len(self.tool_table))))
+
+    def query_languages(self):
+        return Query(self, (self.lang_table.row(i) for i in range(len(self.lang_table))))
+
+    def tools_of_language(self, lang_id):
+        start, end = self._tool_ranges.get(to_column(lang_id), (0, 0))
+        return [self.tool_table.row(row) for row in self._tool_rows_by_lang[start:end]]
+
+    def tools_linked_to_language(self, lang_id):
+        start, end = self._link_ranges.get(lang_id, (0, 0))
+        tools = []
+        for tool_id in self._link_tool_ids[start:end]:
+            row = self._tool_row(tool_id)
+            if row is not None:
+                tools.append(self.tool_table.row(row))
+        return tools
+
+    @cached_query('tools', 'langs')
+    def get_tools_by_name_ending(self, ending, ignore_case=False):
+        result = []
+        for row in self._name_index('tools', ignore_case).ending_with(ending):
+            lang_row = self._lang_row(self.tool_table.lang_ids[row])
+            lang_name = self.lang_table.names[lang_row] if lang_row is not None else "Unknown"
+            result.append((self.tool_table.names[row], lang_name))
+        return result
+
+    @cached_query('tools', copy=dict)
+    def get_cost_summary_by_language(self):
+        return self._summarize_costs()
+
+    def _summarize_costs(self):
+        summaries = aggregate_costs(self.tool_table.lang_ids, self.tool_table.costs)
+        return {from_column(lang_id): summary for lang_id, summary in summaries.items()}
+
+    @cached_query('tools', 'langs')
+    def get_average_tool_cost_by_language(self):
+        lang_tool_stats = {}
+        summaries = self.get_cost_summary_by_language()
+
+        for lang_id, name in zip(self.lang_table.ids, self.lang_table.names):
+            summary = summaries.get(lang_id)
+            if summary:
+                lang_tool_stats[name] = summary.mean
+
+        return sorted(lang_tool_stats.items(), key=lambda x: x[1])
+
+    @cached_query('langs', 'tools', 'tool_langs', copy=copy_groups)
+    def get_languages_starting_with_letter(self, letter, ignore_case=False):
+        result = []
+
+        for row in self._name_index('langs', ignore_case).starting_with(letter):
+            start, end = self._link_ranges.get(self.lang_table.ids[row], (0, 0))
+            supporting_tools = []
+            for tool_id in self._link_tool_ids[start:end]:
+                tool_row = self._tool_row(tool_id)
+                if tool_row is not None:
+                    supporting_tools.append(self.tool_table.names[tool_row])
+            result.append((self.lang_table.names[row], supporting_tools))
+
+        return result
+
+    def get_language_by_id(self, lang_id):
+        row = self._lang_row(lang_id)
+        return None if row is None else self.lang_table.row(row)
+
+    def get_tool_by_id(self, tool_id):
+        row = self._tool_row(tool_id)
+        return None if row is None else self.tool_table.row(row)
@@ -0,0 +1,184 @@
+# loader.py
+# Потоковая загрузка каталога из CSV или JSON Lines (по расширению файла).
+# Строки читаются по одной, внешние ключи проверяются по уже загруженным id,
+# промежуточные списки не строятся.
+#
+#   языки:        id,name
+#   инструменты:  id,name,license_cost,lang_id   (lang_id может быть пустым)
+#   связи:        tool_id,lang_id
+#
+# Запуск: python loader.py языки инструменты связи
+import csv
+import json
+import os
+import sys
+
+from columnar import LanguageTable, LinkTable, ToolTable
+from programming_tools import DevelopmentTool, ProgrammingLanguage, ReadOnlyCatalogError, ToolLanguage
+
+
+class CatalogError(ValueError):
+    """Ошибка в строке файла каталога"""
+
+
+def read_rows(path):
+    """Выдаёт (номер строки, словарь полей) из .csv или .jsonl/.ndjson"""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, newline='', encoding='utf-8') as f:
+        if extension == '.csv':
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        elif extension in ('.jsonl', '.ndjson'):
+            for line_num, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise CatalogError(f"{path}:{line_num}: {e}") from e
+                yield line_num, row
+        else:
+            raise CatalogError(f"{path}: неизвестный формат, ожидается .csv или .jsonl")
+
+
+def _required(value):
+    """Пустое поле - ошибка строки (короткая строка CSV даёт None, JSON - null)"""
+    if value is None or isinstance(value, str) and not value.strip():
+        raise ValueError("пустое обязательное поле")
+    return value
+
+
+def _number(value):
+    value = _required(value)
+    if isinstance(value, (int, float)):
+        return value
+    if not isinstance(value, str):
+        raise TypeError(f"ожидается число, получено {value!r}")
+    text = value.strip()
+    return float(text) if any(c in text for c in '.eE') else int(text)
+
+
+def _optional_id(value):
+    return None if value is None or value == "" else int(value)
+
+
+def parse_language(row):
+    return ProgrammingLanguage(int(_required(row['id'])), str(_required(row['name'])))
+
+
+def parse_tool(row):
+    return DevelopmentTool(int(_required(row['id'])), str(_required(row['name'])),
+                           _number(row['license_cost']), _optional_id(row.get('lang_id')))
+
+
+def parse_link(row):
+    return ToolLanguage(int(row['tool_id']), int(row['lang_id']))
+
+
+class _Reader:
+    """Разбор строк с учётом ошибок: исключение или пропуск строки со счётчиком"""
+
+    def __init__(self, skip_invalid):
+        self.skip_invalid = skip_invalid
+        self.stats = {'langs': 0, 'tools': 0, 'links': 0, 'skipped': 0}
+
+    def records(self, path, parse):
+        for line_num, row in read_rows(path):
+            try:
+                yield (path, line_num), parse(row)
+            except (KeyError, TypeError, ValueError) as e:
+                self.reject((path, line_num), f"некорректная строка: {e!r}")
+
+    def reject(self, where, message):
+        if not self.skip_invalid:
+            raise CatalogError(f"{where[0]}:{where[1]}: {message}")
+        self.stats['skipped'] += 1
+
+
+def load_into_service(service, langs_path, tools_path, links_path, skip_invalid=False):
+    """Добавляет каталог в ProgrammingToolsService по одной записи; внешние ключи -
+    по индексам самого сервиса. Возвращает счётчики загруженных и пропущенных строк."""
+    if service.read_only:
+        raise ReadOnlyCatalogError(f"{type(service).__name__} только для чтения, используйте load_tables")
+    reader = _Reader(skip_invalid)
+
+    for where, lang in reader.records(langs_path, parse_language):
+        try:
+            service.add_language(lang)
+            reader.stats['langs'] += 1
+        except ValueError as e:
+            reader.reject(where, str(e))
+
+    for where, tool in reader.records(tools_path, parse_tool):
+        if tool.lang_id is not None and service.get_language_by_id(tool.lang_id) is None:
+            reader.reject(where, f"нет языка с id {tool.lang_id}")
+            continue
+        try:
+            service.add_tool(tool)
+            reader.stats['tools'] += 1
+        except ValueError as e:
+            reader.reject(where, str(e))
+
+    for where, tl in reader.records(links_path, parse_link):
+        try:
+            service.link_tool_language(tl.tool_id, tl.lang_id)
+            reader.stats['links'] += 1
+        except ValueError as e:
+            reader.reject(where, str(e))
+
+    return reader.stats
+
+
+def load_tables(langs_path, tools_path, links_path, skip_invalid=False):
+    """Читает каталог прямо в колоночные таблицы (для ColumnarToolsService.from_tables).
+    Возвращает (языки, инструменты, связи, счётчики)."""
+    reader = _Reader(skip_invalid)
+    langs, tools, links = LanguageTable(), ToolTable(), LinkTable()
+    lang_ids, tool_ids = set(), set()
+
+    for where, lang in reader.records(langs_path, parse_language):
+        if lang.id in lang_ids:
+            reader.reject(where, f"язык с id {lang.id} уже есть")
+            continue
+        lang_ids.add(lang.id)
+        langs.append(lang.id, lang.name)
+        reader.stats['langs'] += 1
+
+    for where, tool in reader.records(tools_path, parse_tool):
+        if tool.id in tool_ids:
+            reader.reject(where, f"инструмент с id {tool.id} уже есть")
+        elif tool.lang_id is not None and tool.lang_id not in lang_ids:
+            reader.reject(where, f"нет языка с id {tool.lang_id}")
+        else:
+            tool_ids.add(tool.id)
+            tools.append(tool.id, tool.name, tool.license_cost, tool.lang_id)
+            reader.stats['tools'] += 1
+
+    for where, tl in reader.records(links_path, parse_link):
+        if tl.tool_id not in tool_ids:
+            reader.reject(where, f"нет инструмента с id {tl.tool_id}")
+        elif tl.lang_id not in lang_ids:
+            reader.reject(where, f"нет языка с id {tl.lang_id}")
+        else:
+            links.append(tl.tool_id, tl.lang_id)
+            reader.stats['links'] += 1
+
+    return langs, tools, links, reader.stats
+
+
+def main():
+    if len(sys.argv) != 4:
+        print("Использование: python loader.py языки инструменты связи")
+        sys.exit(2)
+    try:
+        *_, stats = load_tables(*sys.argv[1:], skip_invalid=True)
+    except (OSError, CatalogError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"✅ Загружено: языков {stats['langs']}, инструментов {stats['tools']}, "
+          f"связей {stats['links']}, пропущено строк {stats['skipped']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# parallel.py
+# Параллельный подсчёт агрегатов стоимости по языкам в нескольких процессах.
+#
+# Стоимости один раз переупорядочиваются по lang_id и кладутся в общую
+# память (multiprocessing.shared_memory), так что строки каждого языка идут
+# подряд. Языки делятся на шарды с примерно равным числом строк; процесс
+# получает только имя блока памяти и список (lang_id, начало, конец) своих
+# языков и считает агрегаты целиком - слияние в родителе сводится к
+# объединению словарей, медиана остаётся точной.
+import os
+import weakref
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from columnar import ColumnarToolsService, from_column
+from programming_tools import CostSummary, sorted_median
+
+
+def summarize_shard(shm_name, groups):
+    """Выполняется в рабочем процессе: lang_id -> (сумма, число, min, max, медиана)"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    costs = shm.buf.cast('d')
+    try:
+        result = {}
+        for lang_id, start, end in groups:
+            values = sorted(costs[start:end])
+            result[lang_id] = (sum(values), len(values), values[0], values[-1], sorted_median(values))
+        return result
+    finally:
+        costs.release()
+        shm.close()
+
+
+def unlink_shared(shm):
+    shm.close()
+    shm.unlink()
+
+
+def split_groups(groups, shards):
+    """Делит идущие подряд группы (lang_id, начало, конец) на шарды с близким числом строк"""
+    total = groups[-1][2] if groups else 0
+    target = total / shards if shards else total
+    result, current = [], []
+    for group in groups:
+        current.append(group)
+        if group[2] >= target * (len(result) + 1) and len(result) < shards - 1:
+            result.append(current)
+            current = []
+    if current:
+        result.append(current)
+    return result
+
+
+class ParallelToolsService(ColumnarToolsService):
+    """Колоночный каталог, у которого отчёты по стоимости считаются в пуле процессов.
+
+    Пул и блок общей памяти создаются при первом отчёте и освобождаются
+    в close() (или при выходе из with), а если сервис просто забыт -
+    при его сборке мусором или при выходе из интерпретатора (weakref.finalize).
+    """
+
+    def __init__(self, langs=None, tools=None, tool_langs=None, cache_size=128, workers=None, shards=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.shards = shards or self.workers * 4
+        self._executor = None
+        self._shared = None
+        self._finalizers = {}  # ресурс -> weakref.finalize, освобождающий его
+        self._groups = []
+        super().__init__(langs, tools, tool_langs, cache_size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def set_tables(self, lang_table, tool_table, link_table):
+        self._release_shared()
+        super().set_tables(lang_table, tool_table, link_table)
+
+    def close(self):
+        if self._executor is not None:
+            self._finalizers.pop('executor')()
+            self._executor = None
+        self._release_shared()
+
+    def _release_shared(self):
+        if self._shared is not None:
+            self._finalizers.pop('shared')()
+            self._shared = None
+
+    def _share_costs(self):
+        """Стоимости в порядке lang_id - в общую память, один раз на набор таблиц"""
+        if self._shared is None:
+            costs = self.tool_table.costs
+            ordered = array('d', (costs[row] for row in self._tool_rows_by_lang))
+            self._shared = shared_memory.SharedMemory(create=True, size=len(ordered) * ordered.itemsize)
+            self._finalizers['shared'] = weakref.finalize(self, unlink_shared, self._shared)
+            self._shared.buf[:len(ordered) * ordered.itemsize] = ordered.tobytes()
+            self._groups = [(lang_id, start, end) for lang_id, (start, end) in self._tool_ranges.items()]
+        return self._shared.name
+
+    def _summarize_costs(self):
+        if not len(self.tool_table):
+            return {}
+        name = self._share_costs()
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers)
+            self._finalizers['executor'] = weakref.finalize(self, self._executor.shutdown)
+        futures = [self._executor.submit(summarize_shard, name, shard)
+                   for shard in split_groups(self._groups, self.shards)]
+
+        summaries = {}
+        for future in futures:
+            for lang_id, values in future.result().items():
+                summaries[from_column(lang_id)] = CostSummary(*values)
+        return summaries
@@ -1,12 +1,30 @@
 # programming_tools.py
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, namedtuple
+from functools import wraps
+from itertools import count
+from statistics import median
+
+from query import Query
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него агрегаты считаются на чистом Python
+    np = None
+
 
 class ProgrammingLanguage:
+    __slots__ = ('id', 'name')
+
     def __init__(self, id, name):
         self.id = id
         self.name = name
 
 
 class DevelopmentTool:
+    __slots__ = ('id', 'name', 'license_cost', 'lang_id')
+
     def __init__(self, id, name, license_cost, lang_id=None):
         self.id = id
         self.name = name
@@ -15,69 +33,552 @@ class DevelopmentTool:
 
 
 class ToolLanguage:
+    __slots__ = ('tool_id', 'lang_id')
+
     def __init__(self, tool_id, lang_id):
         self.tool_id = tool_id
         self.lang_id = lang_id
 
 
+class CostSummary(namedtuple('CostSummary', 'total count min max median')):
+    """Агрегаты стоимости лицензий для одной группы инструментов (неизменяемые)"""
+
+    __slots__ = ()
+
+    @property
+    def mean(self):
+        return self.total / self.count
+
+    def __repr__(self):
+        return (f"CostSummary(count={self.count}, mean={self.mean:.2f}, min={self.min}, "
+                f"max={self.max}, median={self.median})")
+
+
+def aggregate_costs(lang_ids, costs, use_numpy=None):
+    """Группировка стоимостей по lang_id за один проход: lang_id -> CostSummary.
+
+    lang_ids и costs - столбцы одинаковой длины. Если установлен NumPy
+    (или use_numpy=True), суммы и количества считаются через np.bincount,
+    а min/max/медиана - по одной сортировке всех строк.
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy and len(lang_ids):
+        return _aggregate_numpy(lang_ids, costs)
+
+    groups = {}
+    for lang_id, cost in zip(lang_ids, costs):
+        group = groups.get(lang_id)
+        if group is None:
+            groups[lang_id] = [cost]
+        else:
+            group.append(cost)
+
+    return {lang_id: CostSummary(sum(values), len(values), min(values), max(values), median(values))
+            for lang_id, values in groups.items()}
+
+
+def _aggregate_numpy(lang_ids, costs):
+    if np is None:
+        raise RuntimeError("для векторного подсчёта нужен NumPy")
+
+    if isinstance(lang_ids, array):
+        # Колонка int64 (см. columnar.py): группы без цикла на Python
+        unique, codes = np.unique(np.frombuffer(lang_ids, dtype=np.int64), return_inverse=True)
+        keys = dict(zip(unique.tolist(), range(len(unique))))
+    else:
+        # Номера групп 0..n-1 в порядке первого появления lang_id
+        keys = {}
+        codes = np.fromiter((keys.setdefault(lang_id, len(keys)) for lang_id in lang_ids),
+                            dtype=np.intp, count=len(lang_ids))
+    values = np.asarray(costs, dtype=np.float64)
+
+    counts = np.bincount(codes, minlength=len(keys))
+    totals = np.bincount(codes, weights=values, minlength=len(keys))
+
+    # Сортировка по группе, внутри группы - по стоимости: границы групп дают min/max/медиану
+    ordered = values[np.lexsort((values, codes))]
+    starts = np.cumsum(counts) - counts
+    minimums = ordered[starts]
+    maximums = ordered[starts + counts - 1]
+    medians = (ordered[starts + (counts - 1) // 2] + ordered[starts + counts // 2]) / 2
+
+    return {lang_id: CostSummary(totals[i].item(), counts[i].item(), minimums[i].item(),
+                                 maximums[i].item(), medians[i].item())
+            for lang_id, i in keys.items()}
+
+
+class SortedList:
+    """Отсортированный список ключей, разбитый на блоки не длиннее 2 * LOAD.
+
+    Вставка и удаление - бисекция по максимумам блоков и сдвиг внутри
+    одного блока: O(log n + LOAD) вместо O(n) у list.insert. Рядом с
+    ключами можно хранить items - значения, которые переставляются вместе
+    с ключами (в NameIndex это номера строк).
+    """
+
+    LOAD = 512
+
+    def __init__(self, keys=(), items=None):
+        if items is None:
+            self._set_blocks(sorted(keys), None)
+        else:
+            pairs = sorted(zip(keys, items))
+            self._set_blocks([key for key, _ in pairs], [item for _, item in pairs])
+
+    def _set_blocks(self, keys, items):
+        step = self.LOAD
+        self._keys = [keys[i:i + step] for i in range(0, len(keys), step)]
+        self._items = None if items is None else [items[i:i + step] for i in range(0, len(items), step)]
+        self._maxes = [block[-1] for block in self._keys]
+        self._len = len(keys)
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return (key for block in self._keys for key in block)
+
+    def __getitem__(self, i):
+        """Ключ по позиции: O(число блоков)"""
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError(i)
+        for block in self._keys:
+            if i < len(block):
+                return block[i]
+            i -= len(block)
+
+    def add(self, key, item=None):
+        if not self._maxes:
+            self._keys.append([key])
+            self._maxes.append(key)
+            if self._items is not None:
+                self._items.append([item])
+            self._len = 1
+            return
+        i = min(bisect_right(self._maxes, key), len(self._maxes) - 1)
+        block = self._keys[i]
+        j = bisect_right(block, key)
+        block.insert(j, key)
+        if self._items is not None:
+            self._items[i].insert(j, item)
+        self._maxes[i] = block[-1]
+        self._len += 1
+        if len(block) > 2 * self.LOAD:
+            self._split(i)
+
+    def _split(self, i):
+        keys = self._keys[i]
+        self._keys.insert(i + 1, keys[self.LOAD:])
+        del keys[self.LOAD:]
+        if self._items is not None:
+            items = self._items[i]
+            self._items.insert(i + 1, items[self.LOAD:])
+            del items[self.LOAD:]
+        self._maxes.insert(i, keys[-1])
+
+    def remove(self, key, item=None):
+        """Удаляет ключ (при items - пару ключ и item); KeyError, если его нет"""
+        for i, j in self._positions(key):
+            if self._keys[i][j] != key:
+                break
+            if self._items is None or self._items[i][j] == item:
+                self._delete(i, j)
+                return
+        raise KeyError(key)
+
+    def _delete(self, i, j):
+        block = self._keys[i]
+        del block[j]
+        if self._items is not None:
+            del self._items[i][j]
+        self._len -= 1
+        if block:
+            self._maxes[i] = block[-1]
+        else:
+            del self._keys[i], self._maxes[i]
+            if self._items is not None:
+                del self._items[i]
+
+    def _positions(self, key):
+        """(блок, позиция) всех элементов начиная с первого ключа >= key"""
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            return
+        yield from ((i, j) for j in range(bisect_left(self._keys[i], key), len(self._keys[i])))
+        for i in range(i + 1, len(self._keys)):
+            yield from ((i, j) for j in range(len(self._keys[i])))
+
+    def items_with_prefix(self, prefix):
+        """items всех строковых ключей, начинающихся с prefix: O(log n + k)"""
+        found = []
+        for i, j in self._positions(prefix):
+            if not self._keys[i][j].startswith(prefix):
+                break
+            found.append(self._items[i][j])
+        return found
+
+
+class NameIndex:
+    """Отсортированные имена и перевёрнутые имена.
+
+    Поиск по префиксу - бисекция в отсортированных именах, по суффиксу -
+    бисекция в отсортированных перевёрнутых именах: O(log n + k).
+    Возвращает по возрастанию значения items, связанные с найденными
+    именами (по умолчанию - позиции имён в исходном списке).
+    """
+
+    def __init__(self, names, ignore_case=False, items=None):
+        self.ignore_case = ignore_case
+        keys = [self._fold(name) for name in names]
+        items = range(len(keys)) if items is None else items
+        self._by_prefix = SortedList(keys, items)
+        self._by_suffix = SortedList([key[::-1] for key in keys], items)
+
+    def _fold(self, text):
+        return text.casefold() if self.ignore_case else text
+
+    def starting_with(self, prefix):
+        return sorted(self._by_prefix.items_with_prefix(self._fold(prefix)))
+
+    def ending_with(self, suffix):
+        return sorted(self._by_suffix.items_with_prefix(self._fold(suffix)[::-1]))
+
+    def add(self, name, item):
+        key = self._fold(name)
+        self._by_prefix.add(key, item)
+        self._by_suffix.add(key[::-1], item)
+
+    def remove(self, name, item):
+        key = self._fold(name)
+        self._by_prefix.remove(key, item)
+        self._by_suffix.remove(key[::-1], item)
+
+
+class ReadOnlyCatalogError(TypeError):
+    """Попытка изменить каталог, доступный только для чтения"""
+
+
+def sorted_median(values):
+    """Медиана уже отсортированного непустого списка"""
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2
+
+
+class QueryCache:
+    """LRU-кэш результатов запросов с инвалидацией по таблицам.
+
+    Каждая запись помнит, от каких таблиц (langs, tools, tool_langs) она
+    зависит; изменение таблицы удаляет только зависящие от неё записи.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # ключ -> (результат, таблицы)
+        self._keys_by_table = {}       # таблица -> множество ключей
+
+    def get(self, key, tables, compute):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        result = compute()
+        if self.maxsize > 0:
+            self._entries[key] = (result, tables)
+            for table in tables:
+                self._keys_by_table.setdefault(table, set()).add(key)
+            if len(self._entries) > self.maxsize:
+                self._discard(next(iter(self._entries)))
+        return result
+
+    def _discard(self, key):
+        _, tables = self._entries.pop(key)
+        for table in tables:
+            self._keys_by_table[table].discard(key)
+
+    def invalidate(self, *tables):
+        for table in tables:
+            for key in list(self._keys_by_table.get(table, ())):
+                self._discard(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._keys_by_table.clear()
+
+    def info(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self._entries), 'maxsize': self.maxsize}
+
+
+def copy_groups(rows):
+    """Копия результата вида [(имя, [значения])] для cached_query"""
+    return [(name, list(values)) for name, values in rows]
+
+
+def cached_query(*tables, copy=list):
+    """Кэширует результат метода сервиса по имени метода и аргументам.
+
+    Каждый вызов получает copy(результат): свежий контейнер поверх
+    неизменяемых элементов, так что изменения у вызывающего не попадают в кэш.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = (method.__name__, args, tuple(sorted(kwargs.items())))
+            return copy(self.cache.get(key, tables, lambda: method(self, *args, **kwargs)))
+        return wrapper
+    return decorator
+
+
 class ProgrammingToolsService:
-    def __init__(self, langs=None, tools=None, tool_langs=None):
-        self.langs = langs or []
-        self.tools = tools or []
-        self.tool_langs = tool_langs or []
+    """Каталог языков, инструментов и связей между ними.
 
-    def set_data(self, langs, tools, tool_langs):
-        self.langs = langs
-        self.tools = tools
-        self.tool_langs = tool_langs
+    Строки хранятся в словарях seq -> объект в порядке добавления, поэтому
+    результаты запросов идут в исходном порядке, а удаление - O(1).
+    Индексы и агрегаты стоимости поддерживаются при каждом изменении,
+    set_data нужен только для полной замены данных.
+    """
+
+    read_only = False
 
-    def get_tools_by_name_ending(self, ending):
+    def __init__(self, langs=None, tools=None, tool_langs=None, cache_size=128):
+        self.cache = QueryCache(cache_size)
+        self.set_data(langs or [], tools or [], tool_langs or [])
+
+    def set_data(self, langs, tools, tool_langs):
+        self.cache.clear()
+        self._seq = count()
+        self._langs = {}             # seq -> язык
+        self._tools = {}             # seq -> инструмент
+        self._links = {}             # seq -> связь ToolLanguage
+        self._link_seqs = {}         # (tool_id, lang_id) -> [seq]
+
+        # id -> seq; при повторяющихся id побеждает первый, как при линейном поиске
+        self._lang_seq_by_id = {}
+        self._tool_seq_by_id = {}
+
+        self._tools_by_lang = {}     # один-ко-многим: lang_id -> {seq: инструмент}
+        self._tool_ids_by_lang = {}  # многие-ко-многим: lang_id -> {seq связи: tool_id}
+        self._lang_ids_by_tool = {}  # обратная сторона: tool_id -> {lang_id: None}
+        self._costs_by_lang = {}     # lang_id -> SortedList стоимостей лицензий
+        self._cost_totals = {}       # lang_id -> сумма стоимостей
+
+        for lang in langs:
+            seq = next(self._seq)
+            self._langs[seq] = lang
+            self._lang_seq_by_id.setdefault(lang.id, seq)
+
+        for tool in tools:
+            seq = next(self._seq)
+            self._tools[seq] = tool
+            self._tool_seq_by_id.setdefault(tool.id, seq)
+            self._tools_by_lang.setdefault(tool.lang_id, {})[seq] = tool
+            self._costs_by_lang.setdefault(tool.lang_id, []).append(tool.license_cost)
+        self._cost_totals = {lang_id: sum(costs) for lang_id, costs in self._costs_by_lang.items()}
+        self._costs_by_lang = {lang_id: SortedList(costs) for lang_id, costs in self._costs_by_lang.items()}
+
+        for tl in tool_langs:
+            self._add_link(tl)
+
+        # Индексы имён: с учётом регистра строятся сразу, без учёта - при первом запросе
+        self._name_indexes = {}
+        self._name_index('tools', False)
+        self._name_index('langs', False)
+
+    # --- данные в исходном порядке ---
+
+    @property
+    def langs(self):
+        return list(self._langs.values())
+
+    @property
+    def tools(self):
+        return list(self._tools.values())
+
+    @property
+    def tool_langs(self):
+        return list(self._links.values())
+
+    def _name_index(self, table, ignore_case):
+        index = self._name_indexes.get((table, ignore_case))
+        if index is None:
+            rows = self._tools if table == 'tools' else self._langs
+            index = NameIndex([row.name for row in rows.values()], ignore_case, list(rows))
+            self._name_indexes[(table, ignore_case)] = index
+        return index
+
+    def _table_indexes(self, table):
+        return [index for (name, _), index in self._name_indexes.items() if name == table]
+
+    # --- изменения ---
+
+    def add_language(self, lang):
+        if lang.id in self._lang_seq_by_id:
+            raise ValueError(f"язык с id {lang.id} уже есть")
+        seq = next(self._seq)
+        self._langs[seq] = lang
+        self._lang_seq_by_id[lang.id] = seq
+        for index in self._table_indexes('langs'):
+            index.add(lang.name, seq)
+        self.cache.invalidate('langs')
+        return lang
+
+    def add_tool(self, tool):
+        if tool.id in self._tool_seq_by_id:
+            raise ValueError(f"инструмент с id {tool.id} уже есть")
+        seq = next(self._seq)
+        self._tools[seq] = tool
+        self._tool_seq_by_id[tool.id] = seq
+        self._tools_by_lang.setdefault(tool.lang_id, {})[seq] = tool
+        costs = self._costs_by_lang.get(tool.lang_id)
+        if costs is None:
+            costs = self._costs_by_lang[tool.lang_id] = SortedList()
+        costs.add(tool.license_cost)
+        self._cost_totals[tool.lang_id] = self._cost_totals.get(tool.lang_id, 0) + tool.license_cost
+        for index in self._table_indexes('tools'):
+            index.add(tool.name, seq)
+        self.cache.invalidate('tools')
+        return tool
+
+    def remove_tool(self, tool_id):
+        """Удаляет инструмент вместе с его связями; None, если такого нет"""
+        seq = self._tool_seq_by_id.pop(tool_id, None)
+        if seq is None:
+            return None
+        tool = self._tools.pop(seq)
+
+        group = self._tools_by_lang[tool.lang_id]
+        del group[seq]
+        if not group:
+            del self._tools_by_lang[tool.lang_id]
+
+        costs = self._costs_by_lang[tool.lang_id]
+        costs.remove(tool.license_cost)
+        if costs:
+            self._cost_totals[tool.lang_id] -= tool.license_cost
+        else:
+            del self._costs_by_lang[tool.lang_id]
+            del self._cost_totals[tool.lang_id]
+
+        for index in self._table_indexes('tools'):
+            index.remove(tool.name, seq)
+        for lang_id in list(self._lang_ids_by_tool.get(tool_id, ())):
+            self.unlink(tool_id, lang_id)
+        self.cache.invalidate('tools')
+        return tool
+
+    def link_tool_language(self, tool_id, lang_id):
+        if tool_id not in self._tool_seq_by_id:
+            raise ValueError(f"нет инструмента с id {tool_id}")
+        if lang_id not in self._lang_seq_by_id:
+            raise ValueError(f"нет языка с id {lang_id}")
+        tl = self._add_link(ToolLanguage(tool_id, lang_id))
+        self.cache.invalidate('tool_langs')
+        return tl
+
+    def _add_link(self, tl):
+        seq = next(self._seq)
+        self._links[seq] = tl
+        self._link_seqs.setdefault((tl.tool_id, tl.lang_id), []).append(seq)
+        self._tool_ids_by_lang.setdefault(tl.lang_id, {})[seq] = tl.tool_id
+        self._lang_ids_by_tool.setdefault(tl.tool_id, {})[tl.lang_id] = None
+        return tl
+
+    def unlink(self, tool_id, lang_id):
+        """Удаляет все связи инструмента с языком; False, если их не было"""
+        seqs = self._link_seqs.pop((tool_id, lang_id), None)
+        if seqs is None:
+            return False
+        tool_ids = self._tool_ids_by_lang[lang_id]
+        for seq in seqs:
+            del self._links[seq]
+            del tool_ids[seq]
+        if not tool_ids:
+            del self._tool_ids_by_lang[lang_id]
+        lang_ids = self._lang_ids_by_tool[tool_id]
+        del lang_ids[lang_id]
+        if not lang_ids:
+            del self._lang_ids_by_tool[tool_id]
+        self.cache.invalidate('tool_langs')
+        return True
+
+    # --- запросы ---
+
+    def query_tools(self):
+        return Query(self, iter(self._tools.values()))
+
+    def query_languages(self):
+        return Query(self, iter(self._langs.values()))
+
+    def tools_of_language(self, lang_id):
+        """Инструменты, у которых lang_id - этот язык (один-ко-многим)"""
+        return list(self._tools_by_lang.get(lang_id, {}).values())
+
+    def tools_linked_to_language(self, lang_id):
+        """Инструменты, связанные с языком через tool_langs (многие-ко-многим)"""
+        tools = []
+        for tool_id in self._tool_ids_by_lang.get(lang_id, {}).values():
+            tool = self.get_tool_by_id(tool_id)
+            if tool:
+                tools.append(tool)
+        return tools
+
+    @cached_query('tools', 'langs')
+    def get_tools_by_name_ending(self, ending, ignore_case=False):
         result = []
-        for tool in self.tools:
-            if tool.name.endswith(ending):
-                lang = next((l for l in self.langs if l.id == tool.lang_id), None)
-                lang_name = lang.name if lang else "Unknown"
-                result.append((tool.name, lang_name))
+        for seq in self._name_index('tools', ignore_case).ending_with(ending):
+            tool = self._tools[seq]
+            lang = self.get_language_by_id(tool.lang_id)
+            lang_name = lang.name if lang else "Unknown"
+            result.append((tool.name, lang_name))
         return result
 
+    @cached_query('tools', copy=dict)
+    def get_cost_summary_by_language(self):
+        """lang_id -> CostSummary по всем инструментам (один-ко-многим)"""
+        return {lang_id: CostSummary(self._cost_totals[lang_id], len(costs), costs[0], costs[-1],
+                                     sorted_median(costs))
+                for lang_id, costs in self._costs_by_lang.items()}
+
+    @cached_query('tools', 'langs')
     def get_average_tool_cost_by_language(self):
         lang_tool_stats = {}
 
-        for lang in self.langs:
-            # Находим инструменты для этого языка (один-ко-многим)
-            lang_tools = [tool for tool in self.tools if tool.lang_id == lang.id]
-
-            if lang_tools:
-                total_cost = sum(tool.license_cost for tool in lang_tools)
-                count = len(lang_tools)
-                avg_cost = total_cost / count
-                lang_tool_stats[lang.name] = avg_cost
+        for lang in self._langs.values():
+            costs = self._costs_by_lang.get(lang.id)
+            if costs:
+                lang_tool_stats[lang.name] = self._cost_totals[lang.id] / len(costs)
 
         return sorted(lang_tool_stats.items(), key=lambda x: x[1])
 
-    def get_languages_starting_with_letter(self, letter):
+    @cached_query('langs', 'tools', 'tool_langs', copy=copy_groups)
+    def get_languages_starting_with_letter(self, letter, ignore_case=False):
         result = []
 
-        for lang in self.langs:
-            if lang.name.startswith(letter):
-                supporting_tools = []
-
-                # Находим связи многие-ко-многим через tool_langs
-                for tl in self.tool_langs:
-                    if tl.lang_id == lang.id:
-                        tool = next((t for t in self.tools if t.id == tl.tool_id), None)
-                        if tool:
-                            supporting_tools.append(tool.name)
-
-                result.append((lang.name, supporting_tools))
+        for seq in self._name_index('langs', ignore_case).starting_with(letter):
+            lang = self._langs[seq]
+            # Связи многие-ко-многим через индекс по tool_langs
+            supporting_tools = [tool.name for tool in self.tools_linked_to_language(lang.id)]
+            result.append((lang.name, supporting_tools))
 
         return result
 
     def get_language_by_id(self, lang_id):
-        return next((lang for lang in self.langs if lang.id == lang_id), None)
+        seq = self._lang_seq_by_id.get(lang_id)
+        return None if seq is None else self._langs[seq]
 
     def get_tool_by_id(self, tool_id):
-        return next((tool for tool in self.tools if tool.id == tool_id), None)
+        seq = self._tool_seq_by_id.get(tool_id)
+        return None if seq is None else self._tools[seq]
 
 
 # Функции для работы с данными по умолчанию
@@ -122,9 +623,7 @@ def main():
     service.set_data(langs, tools, tool_langs)
 
     print("Запрос 1: Средства разработки с названиями на 'ov' или 'OV'")
-    query1 = service.get_tools_by_name_ending('ov')
-    if not query1:
-        query1 = service.get_tools_by_name_ending('OV')
+    query1 = service.get_tools_by_name_ending('ov', ignore_case=True)
     print("Результат:", query1)
 
     print("\nЗапрос 1 (альтернатива - окончание 'Studio'):")
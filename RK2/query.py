@@ -0,0 +1,80 @@
+# query.py
+# Небольшой слой запросов над ProgrammingToolsService: фильтр, соединения,
+# группировка и сортировка. Шаги ленивые и выполняются при обходе результата.
+# Соединения - только по индексам сервиса или хешем, без вложенных циклов.
+
+
+class Query:
+    """Цепочка шагов над строками каталога.
+
+    Строки - объекты сервиса (языки, инструменты) или кортежи, которые
+    получаются после соединений: (левая строка, правая строка).
+    """
+
+    def __init__(self, service, rows):
+        self.service = service
+        self._rows = rows
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def _then(self, rows):
+        return Query(self.service, rows)
+
+    def to_list(self):
+        return list(self._rows)
+
+    def filter(self, predicate):
+        return self._then(row for row in self._rows if predicate(row))
+
+    def map(self, fn):
+        return self._then(fn(row) for row in self._rows)
+
+    def sort(self, key=None, reverse=False):
+        # Сортировка требует всех строк, но запускается тоже только при обходе
+        def rows():
+            yield from sorted(self._rows, key=key, reverse=reverse)
+        return self._then(rows())
+
+    def group(self, key, aggregate=list):
+        """(ключ, aggregate(строки группы)) в порядке первого появления ключа"""
+        def rows():
+            groups = {}
+            for row in self._rows:
+                groups.setdefault(key(row), []).append(row)
+            for group_key, group_rows in groups.items():
+                yield group_key, aggregate(group_rows)
+        return self._then(rows())
+
+    def join(self, right, left_key, right_key):
+        """Хеш-соединение: словарь строится по правой стороне, левая читается один раз"""
+        def rows():
+            table = {}
+            for row in right:
+                table.setdefault(right_key(row), []).append(row)
+            for row in self._rows:
+                for match in table.get(left_key(row), ()):
+                    yield row, match
+        return self._then(rows())
+
+    def join_language(self, tool=lambda row: row, keep_missing=False):
+        """Инструмент -> его язык по lang_id (один-ко-многим) через индекс id.
+        keep_missing=True оставляет инструменты без языка с None справа."""
+        def rows():
+            for row in self._rows:
+                lang = self.service.get_language_by_id(tool(row).lang_id)
+                if lang is not None or keep_missing:
+                    yield row, lang
+        return self._then(rows())
+
+    def join_tools(self, via='tool_langs', lang=lambda row: row):
+        """Язык -> его инструменты: via='lang_id' (один-ко-многим)
+        или via='tool_langs' (многие-ко-многим) через списки смежности сервиса."""
+        related = {'lang_id': self.service.tools_of_language,
+                   'tool_langs': self.service.tools_linked_to_language}[via]
+
+        def rows():
+            for row in self._rows:
+                for match in related(lang(row).id):
+                    yield row, match
+        return self._then(rows())
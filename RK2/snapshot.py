@@ -0,0 +1,288 @@
+# snapshot.py
+# Двоичный снимок каталога вместе с индексами. Файл открывается через mmap,
+# столбцы читаются прямо из отображённой памяти, имена декодируются только
+# при обращении - открытие не зависит от размера каталога.
+#
+# Формат: сигнатура, заголовок '<II' (версия, число секций), таблица секций
+# '<8sQQ' (имя, смещение, длина) и сами секции, выровненные по 8 байт.
+# Числа - little-endian int64 ('q') и float64 ('d'); имена - UTF-8 подряд
+# плюс столбец смещений длиной n + 1.
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+from columnar import (
+    ColumnarToolsService,
+    LanguageTable,
+    LinkTable,
+    ToolTable,
+    from_column,
+    to_column
+)
+from programming_tools import CostSummary
+
+SNAPSHOT_MAGIC = b"RK2CATL\x00"
+SNAPSHOT_VERSION = 1
+HEADER = struct.Struct('<II')
+SECTION = struct.Struct('<8sQQ')
+ALIGN = 8
+
+
+class SnapshotError(ValueError):
+    """Файл не является снимком каталога или повреждён"""
+
+
+class NameColumn:
+    """Имена из снимка: декодируются из UTF-8 при каждом обращении"""
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode('utf-8')
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class GroupRanges:
+    """Ключ -> (начало, конец) по отсортированным ключам и началам групп (как CSR)"""
+
+    def __init__(self, keys, starts):
+        self.keys = keys
+        self.starts = starts
+
+    def get(self, key, default=None):
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return self.starts[i], self.starts[i + 1]
+        return default
+
+    def items(self):
+        return ((key, (self.starts[i], self.starts[i + 1])) for i, key in enumerate(self.keys))
+
+
+class StoredNameIndex:
+    """Поиск по префиксу и суффиксу по сохранённым порядкам строк (см. NameIndex)"""
+
+    def __init__(self, names, by_prefix, by_suffix):
+        self.names = names
+        self.by_prefix = by_prefix
+        self.by_suffix = by_suffix
+
+    @staticmethod
+    def _range(order, key, prefix):
+        start = end = bisect_left(order, prefix, key=key)
+        while end < len(order) and key(order[end]).startswith(prefix):
+            end += 1
+        return sorted(order[start:end])
+
+    def starting_with(self, prefix):
+        return self._range(self.by_prefix, self.names.__getitem__, prefix)
+
+    def ending_with(self, suffix):
+        return self._range(self.by_suffix, lambda row: self.names[row][::-1], suffix[::-1])
+
+
+def _ints(values):
+    return array('q', values)
+
+
+def _floats(values):
+    return array('d', values)
+
+
+def _names(names):
+    encoded = [name.encode('utf-8') for name in names]
+    offsets = array('q', [0])
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    return offsets, b"".join(encoded)
+
+
+def _to_bytes(section):
+    if isinstance(section, array):
+        if sys.byteorder != 'little':
+            section = array(section.typecode, section)
+            section.byteswap()
+        return section.tobytes()
+    return section
+
+
+def save_snapshot(service, path):
+    """Записывает каталог любого сервиса и его индексы в файл (атомарно)"""
+    if not isinstance(service, ColumnarToolsService):
+        service = ColumnarToolsService.from_tables(LanguageTable.from_objects(service.langs),
+                                                   ToolTable.from_objects(service.tools),
+                                                   LinkTable.from_objects(service.tool_langs))
+    langs, tools, links = service.lang_table, service.tool_table, service.link_table
+    lang_offsets, lang_blob = _names(langs.names)
+    tool_offsets, tool_blob = _names(tools.names)
+
+    def by_name(names, reverse=False):
+        key = (lambda i: names[i][::-1]) if reverse else names.__getitem__
+        return _ints(sorted(range(len(names)), key=key))
+
+    def groups(order, ranges, total):
+        keys = _ints(key for key, _ in ranges.items())
+        starts = _ints([start for _, (start, _) in ranges.items()] + [total])
+        return _ints(order), keys, starts
+
+    link_tool_ids, link_keys, link_starts = groups(service._link_tool_ids, service._link_ranges, len(links))
+    tool_rows, tool_keys, tool_starts = groups(service._tool_rows_by_lang, service._tool_ranges, len(tools))
+    summaries = service.get_cost_summary_by_language()
+    summary_keys = sorted(summaries, key=to_column)
+
+    sections = {
+        b"lang_id": _ints(langs.ids), b"lang_nof": lang_offsets, b"lang_nam": lang_blob,
+        b"tool_id": _ints(tools.ids), b"tool_lng": _ints(tools.lang_ids), b"tool_cst": _floats(tools.costs),
+        b"tool_nof": tool_offsets, b"tool_nam": tool_blob,
+        b"link_tid": _ints(links.tool_ids), b"link_lid": _ints(links.lang_ids),
+        b"lang_ord": _ints(service._lang_order), b"tool_ord": _ints(service._tool_order),
+        b"lang_pre": by_name(langs.names), b"lang_suf": by_name(langs.names, True),
+        b"tool_pre": by_name(tools.names), b"tool_suf": by_name(tools.names, True),
+        b"lnk_tids": link_tool_ids, b"lnk_keys": link_keys, b"lnk_strt": link_starts,
+        b"tgr_rows": tool_rows, b"tgr_keys": tool_keys, b"tgr_strt": tool_starts,
+        b"sum_keys": _ints(to_column(key) for key in summary_keys),
+        b"sum_tot": _floats(summaries[key].total for key in summary_keys),
+        b"sum_cnt": _ints(summaries[key].count for key in summary_keys),
+        b"sum_min": _floats(summaries[key].min for key in summary_keys),
+        b"sum_max": _floats(summaries[key].max for key in summary_keys),
+        b"sum_med": _floats(summaries[key].median for key in summary_keys),
+    }
+
+    offset = len(SNAPSHOT_MAGIC) + HEADER.size + SECTION.size * len(sections)
+    table, body = [], []
+    for name, section in sections.items():
+        data = _to_bytes(section)
+        padding = -offset % ALIGN
+        body.append(b"\x00" * padding)
+        offset += padding
+        table.append(SECTION.pack(name, offset, len(data)))
+        body.append(data)
+        offset += len(data)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(HEADER.pack(SNAPSHOT_VERSION, len(sections)))
+        f.writelines(table)
+        f.writelines(body)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class SnapshotToolsService(ColumnarToolsService):
+    """Каталог, читающий столбцы и индексы прямо из mmap снимка.
+
+    Открытие разбирает только таблицу секций; запросы по id, имени и
+    связям читают нужные строки бисекцией по сохранённым индексам.
+    Индексы без учёта регистра при первом запросе строятся в памяти.
+    """
+
+    @classmethod
+    def open(cls, path, cache_size=128):
+        service = cls(cache_size=cache_size)
+        service._open(path)
+        return service
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _open(self, path):
+        with open(path, 'rb') as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:
+                raise SnapshotError(f"пустой файл снимка: {path}") from e
+        self._views = []
+        try:
+            self._map_sections(self._read_sections())
+        except SnapshotError:
+            self.close()
+            raise
+        except (struct.error, KeyError, TypeError) as e:
+            self.close()
+            raise SnapshotError(f"повреждённый снимок каталога: {e!r}") from e
+
+    def _map_sections(self, sections):
+        ints = lambda name: self._column(sections[name], 'q')
+        floats = lambda name: self._column(sections[name], 'd')
+        lang_names = NameColumn(sections[b"lang_nam"], ints(b"lang_nof"))
+        tool_names = NameColumn(sections[b"tool_nam"], ints(b"tool_nof"))
+
+        self.cache.clear()
+        self.lang_table = LanguageTable.from_columns(ints(b"lang_id"), lang_names)
+        self.tool_table = ToolTable.from_columns(ints(b"tool_id"), tool_names, floats(b"tool_cst"),
+                                                 ints(b"tool_lng"))
+        self.link_table = LinkTable.from_columns(ints(b"link_tid"), ints(b"link_lid"))
+        self._lang_order = ints(b"lang_ord")
+        self._tool_order = ints(b"tool_ord")
+        self._link_tool_ids = ints(b"lnk_tids")
+        self._link_ranges = GroupRanges(ints(b"lnk_keys"), ints(b"lnk_strt"))
+        self._tool_rows_by_lang = ints(b"tgr_rows")
+        self._tool_ranges = GroupRanges(ints(b"tgr_keys"), ints(b"tgr_strt"))
+        self._name_indexes = {
+            ('langs', False): StoredNameIndex(lang_names, ints(b"lang_pre"), ints(b"lang_suf")),
+            ('tools', False): StoredNameIndex(tool_names, ints(b"tool_pre"), ints(b"tool_suf")),
+        }
+        self._summary_columns = (ints(b"sum_keys"), floats(b"sum_tot"), ints(b"sum_cnt"),
+                                 floats(b"sum_min"), floats(b"sum_max"), floats(b"sum_med"))
+
+    def _read_sections(self):
+        if self._mmap[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise SnapshotError("файл не является снимком каталога")
+        version, count = HEADER.unpack_from(self._mmap, len(SNAPSHOT_MAGIC))
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(f"неизвестная версия снимка: {version}")
+        view = memoryview(self._mmap)
+        self._views.append(view)
+        sections = {}
+        position = len(SNAPSHOT_MAGIC) + HEADER.size
+        for _ in range(count):
+            name, offset, length = SECTION.unpack_from(self._mmap, position)
+            position += SECTION.size
+            if offset + length > len(self._mmap):
+                raise SnapshotError(f"секция {name!r} выходит за конец файла")
+            sections[name.rstrip(b"\x00")] = view[offset:offset + length]
+        self._views.extend(sections.values())
+        return sections
+
+    def _column(self, section, typecode):
+        if sys.byteorder != 'little':
+            # На big-endian машине столбец приходится копировать с переворотом байтов
+            column = array(typecode, section.tobytes())
+            column.byteswap()
+            return column
+        column = section.cast(typecode)
+        self._views.append(column)
+        return column
+
+    def close(self):
+        """Освобождает отображение файла; после close запросы недоступны"""
+        if getattr(self, '_mmap', None) is None:
+            return
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+        self._mmap = None
+
+    def _summarize_costs(self):
+        if getattr(self, '_mmap', None) is None:
+            # Каталог не из снимка (например, после set_tables) - обычный подсчёт
+            return super()._summarize_costs()
+        keys, totals, counts, minimums, maximums, medians = self._summary_columns
+        return {from_column(keys[i]): CostSummary(totals[i], counts[i], minimums[i], maximums[i], medians[i])
+                for i in range(len(keys))}
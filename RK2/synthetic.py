@@ -0,0 +1,113 @@
+# synthetic.py
+# Генератор синтетического каталога: число языков и инструментов, среднее
+# число связей на инструмент и распределение слов в именах (равномерное или
+# Ципфа - несколько слов встречаются очень часто, как в реальных каталогах).
+# Одинаковые параметры и seed дают одинаковый каталог.
+#
+# Запуск: python synthetic.py каталог [инструментов] [языков] [csv|jsonl]
+import csv
+import json
+import os
+import random
+import sys
+
+from columnar import LanguageTable, LinkTable, ToolTable
+from programming_tools import DevelopmentTool, ProgrammingLanguage, ToolLanguage
+
+LANG_ROOTS = ["Ada", "Basic", "C", "Dart", "Elixir", "Fortran", "Go", "Haskell", "Java", "Kotlin",
+              "Lua", "ML", "Nim", "OCaml", "Pascal", "Python", "Ruby", "Rust", "Scala", "Zig"]
+TOOL_WORDS = ["Studio", "IDE", "Code", "Pro", "Lint", "Debugger", "Profiler", "Build", "Test",
+              "Format", "Shell", "Cloud", "Forge", "Lab", "Kit", "Suite", "Server", "Analyzer"]
+NAME_DISTRIBUTIONS = ("uniform", "zipf")
+
+
+def _picker(words, distribution, rng):
+    if distribution == "uniform":
+        return lambda: rng.choice(words)
+    if distribution == "zipf":
+        weights = [1 / rank for rank in range(1, len(words) + 1)]
+        return lambda: rng.choices(words, weights)[0]
+    raise ValueError(f"неизвестное распределение имён: {distribution}, ожидается {NAME_DISTRIBUTIONS}")
+
+
+def iter_languages(langs, names="uniform", seed=0):
+    rng = random.Random(f"{seed}-langs")
+    root = _picker(LANG_ROOTS, names, rng)
+    for lang_id in range(1, langs + 1):
+        yield lang_id, f"{root()}{lang_id}"
+
+
+def iter_tools(tools, langs, names="uniform", free_share=0.3, seed=0):
+    """(id, имя, стоимость, lang_id); примерно free_share инструментов бесплатны"""
+    rng = random.Random(f"{seed}-tools")
+    word = _picker(TOOL_WORDS, names, rng)
+    for tool_id in range(1, tools + 1):
+        cost = 0 if rng.random() < free_share else rng.randrange(10, 1000)
+        yield tool_id, f"T{tool_id} {word()} {word()}", cost, rng.randrange(1, langs + 1)
+
+
+def iter_links(tools, langs, fanout=2, seed=0):
+    """(tool_id, lang_id): у каждого инструмента от 1 до 2*fanout-1 разных языков"""
+    rng = random.Random(f"{seed}-links")
+    for tool_id in range(1, tools + 1):
+        count = min(langs, rng.randint(1, 2 * fanout - 1))
+        for lang_id in rng.sample(range(1, langs + 1), count):
+            yield tool_id, lang_id
+
+
+def generate_catalog(tools=1000, langs=100, fanout=2, names="uniform", seed=0):
+    """Каталог объектами: (языки, инструменты, связи) для ProgrammingToolsService"""
+    return ([ProgrammingLanguage(*row) for row in iter_languages(langs, names, seed)],
+            [DevelopmentTool(*row) for row in iter_tools(tools, langs, names, seed=seed)],
+            [ToolLanguage(*row) for row in iter_links(tools, langs, fanout, seed)])
+
+
+def generate_tables(tools=1000, langs=100, fanout=2, names="uniform", seed=0):
+    """Тот же каталог сразу в колоночные таблицы, без промежуточных объектов"""
+    lang_table, tool_table, link_table = LanguageTable(), ToolTable(), LinkTable()
+    for row in iter_languages(langs, names, seed):
+        lang_table.append(*row)
+    for row in iter_tools(tools, langs, names, seed=seed):
+        tool_table.append(*row)
+    for row in iter_links(tools, langs, fanout, seed):
+        link_table.append(*row)
+    return lang_table, tool_table, link_table
+
+
+def write_catalog(directory, file_format="csv", tools=1000, langs=100, fanout=2, names="uniform", seed=0):
+    """Записывает каталог в файлы для loader.py; возвращает их пути"""
+    files = [
+        ("langs", ("id", "name"), iter_languages(langs, names, seed)),
+        ("tools", ("id", "name", "license_cost", "lang_id"), iter_tools(tools, langs, names, seed=seed)),
+        ("links", ("tool_id", "lang_id"), iter_links(tools, langs, fanout, seed)),
+    ]
+    paths = []
+    for name, columns, rows in files:
+        path = os.path.join(directory, f"{name}.{file_format}")
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            if file_format == "csv":
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                writer.writerows(rows)
+            else:
+                for row in rows:
+                    f.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n")
+        paths.append(path)
+    return paths
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Использование: python synthetic.py каталог [инструментов] [языков] [csv|jsonl]")
+        sys.exit(2)
+    directory = sys.argv[1]
+    tools = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    langs = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+    file_format = sys.argv[4] if len(sys.argv) > 4 else "csv"
+    os.makedirs(directory, exist_ok=True)
+    for path in write_catalog(directory, file_format, tools, langs):
+        print(f"✅ {path}")
+
+
+if __name__ == "__main__":
+    main()
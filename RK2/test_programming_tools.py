@@ -1,13 +1,43 @@
 # test_programming_tools.py
 
+import gc
+import json
+import os
+import random
+import tempfile
 import unittest
+from multiprocessing import shared_memory
+from unittest.mock import patch
 from programming_tools import (
     ProgrammingLanguage,
     DevelopmentTool,
     ToolLanguage,
     ProgrammingToolsService,
-    create_sample_data
+    NameIndex,
+    ReadOnlyCatalogError,
+    SortedList,
+    aggregate_costs,
+    create_sample_data,
+    np
 )
+from columnar import ColumnarToolsService, ToolTable
+from loader import CatalogError, load_into_service, load_tables
+from parallel import ParallelToolsService, split_groups
+from snapshot import SnapshotError, SnapshotToolsService, save_snapshot
+from synthetic import generate_catalog, generate_tables, write_catalog
+
+
+def indexed_catalog(missing_lang_every=0):
+    """Каталог для сверки индексов: 200 языков с повторяющимися именами и
+    1000 инструментов, каждый пятый оканчивается на "ov". При
+    missing_lang_every=N у каждого N-го инструмента не указан язык."""
+    langs = [ProgrammingLanguage(i, f"Lang{i % 7}") for i in range(1, 201)]
+    tools = [DevelopmentTool(i, f"Tool{i}ov" if i % 5 == 0 else f"Tool{i}", i % 300,
+                             None if missing_lang_every and i % missing_lang_every == 0 else i % 200 + 1)
+             for i in range(1, 1001)]
+    tool_langs = [ToolLanguage(t, (t * 7) % 200 + 1) for t in range(1, 1001)]
+    tool_langs += [ToolLanguage(t, (t * 3) % 200 + 1) for t in range(1, 1001, 3)]
+    return langs, tools, tool_langs
 
 
 class TestProgrammingToolsService(unittest.TestCase):
@@ -112,6 +142,500 @@ class TestProgrammingToolsService(unittest.TestCase):
         tool_none = self.service.get_tool_by_id(999)
         self.assertIsNone(tool_none)
 
+    def test_indexes_match_linear_scan(self):
+        """Дополнительный тест: индексы дают те же ответы, что и перебор"""
+        langs, tools, tool_langs = indexed_catalog()
+        service = ProgrammingToolsService(langs, tools, tool_langs)
+
+        expected = []
+        for lang in langs:
+            if lang.name.startswith('Lang3'):
+                names = [next(t.name for t in tools if t.id == tl.tool_id)
+                         for tl in tool_langs if tl.lang_id == lang.id]
+                expected.append((lang.name, names))
+        self.assertEqual(service.get_languages_starting_with_letter('Lang3'), expected)
+
+        ending = service.get_tools_by_name_ending('ov')
+        self.assertEqual(len(ending), 200)
+        self.assertEqual(ending[0], ("Tool5ov", "Lang6"))
+        self.assertIs(service.get_tool_by_id(500), tools[499])
+
+    def test_duplicate_ids_return_first(self):
+        """Дополнительный тест: при повторе id возвращается первый объект"""
+        first, second = ProgrammingLanguage(1, "First"), ProgrammingLanguage(1, "Second")
+        service = ProgrammingToolsService([first, second])
+        self.assertIs(service.get_language_by_id(1), first)
+
+    def test_set_data_rebuilds_indexes(self):
+        """Дополнительный тест: set_data перестраивает индексы"""
+        self.service.set_data([ProgrammingLanguage(1, "Go")], [], [])
+        self.assertEqual(self.service.get_language_by_id(1).name, "Go")
+        self.assertIsNone(self.service.get_tool_by_id(4))
+        self.assertEqual(self.service.get_average_tool_cost_by_language(), [])
+
+    def test_name_index_prefix_and_suffix(self):
+        """Дополнительный тест: поиск по префиксу и суффиксу через индекс имён"""
+        index = NameIndex(["Visual Studio", "studio", "Studio X", "GNAT Studio", "Eclipse"])
+        self.assertEqual(index.ending_with("Studio"), [0, 3])
+        self.assertEqual(index.starting_with("Stud"), [2])
+        self.assertEqual(index.starting_with(""), [0, 1, 2, 3, 4])
+        self.assertEqual(index.ending_with("zzz"), [])
+
+        folded = NameIndex(["Visual Studio", "studio", "Studio X", "GNAT STUDIO"], ignore_case=True)
+        self.assertEqual(folded.ending_with("studio"), [0, 1, 3])
+        self.assertEqual(folded.starting_with("STUD"), [1, 2])
+
+    def test_sorted_list_matches_list(self):
+        """Дополнительный тест: блочный SortedList ведёт себя как отсортированный список"""
+        rng = random.Random(3)
+        with patch.object(SortedList, 'LOAD', 4):
+            values = SortedList([rng.randrange(50) for _ in range(30)])
+            expected = sorted(values)
+            for _ in range(500):
+                value = rng.randrange(50)
+                if rng.random() < 0.6:
+                    values.add(value)
+                    expected.append(value)
+                    expected.sort()
+                elif value in expected:
+                    values.remove(value)
+                    expected.remove(value)
+                else:
+                    self.assertRaises(KeyError, values.remove, value)
+                self.assertEqual(len(values), len(expected))
+            self.assertEqual(list(values), expected)
+            self.assertEqual([values[i] for i in range(-len(expected), len(expected))], expected * 2)
+            self.assertGreater(len(values._keys), 2)
+
+            index = NameIndex(["Ada"] * 20)
+            for item in range(20, 40):
+                index.add("Ada", item)
+            index.remove("Ada", 7)
+            self.assertEqual(index.starting_with("A"), [i for i in range(40) if i != 7])
+
+    def test_queries_ignore_case(self):
+        """Дополнительный тест: запросы без учёта регистра"""
+        self.assertEqual(self.service.get_tools_by_name_ending('studio'), [])
+        self.assertEqual(self.service.get_tools_by_name_ending('studio', ignore_case=True),
+                         [("GNAT Programming Studio", "Ada")])
+        result = self.service.get_languages_starting_with_letter('j', ignore_case=True)
+        self.assertEqual([name for name, _ in result], ["Java", "JavaScript"])
+
+    def test_add_and_remove_tool_update_queries(self):
+        """Дополнительный тест: добавление и удаление инструмента обновляет индексы и агрегаты"""
+        self.service.get_tools_by_name_ending('studio', ignore_case=True)  # строим индекс без учёта регистра
+        self.service.add_tool(DevelopmentTool(8, "Android Studio", 51, 2))
+        self.assertEqual(self.service.get_tools_by_name_ending('studio', ignore_case=True),
+                         [("GNAT Programming Studio", "Ada"), ("Android Studio", "Java")])
+        java = self.service.get_cost_summary_by_language()[2]
+        self.assertEqual((java.total, java.count, java.median), (300, 3, 51))
+
+        self.assertEqual(self.service.remove_tool(2).name, "IntelliJ IDEA Ultimate")
+        self.assertIsNone(self.service.remove_tool(2))
+        self.assertIsNone(self.service.get_tool_by_id(2))
+        self.assertIn(("Java", 25.5), self.service.get_average_tool_cost_by_language())
+        self.assertEqual(self.service.get_languages_starting_with_letter('Java')[0],
+                         ("Java", ["VS Code", "Eclipse IDE"]))
+
+        self.service.remove_tool(4)
+        self.assertNotIn("JavaScript", dict(self.service.get_average_tool_cost_by_language()))
+        self.assertFalse(any(tl.tool_id == 4 for tl in self.service.tool_langs))
+
+    def test_link_and_unlink(self):
+        """Дополнительный тест: связи многие-ко-многим добавляются и удаляются"""
+        self.service.add_language(ProgrammingLanguage(6, "Assembler"))
+        self.service.link_tool_language(3, 6)
+        self.service.link_tool_language(4, 6)
+        self.assertIn(("Assembler", ["Visual Studio Enterprise", "VS Code"]),
+                      self.service.get_languages_starting_with_letter('A'))
+
+        self.assertTrue(self.service.unlink(3, 6))
+        self.assertFalse(self.service.unlink(3, 6))
+        self.assertEqual(self.service.get_languages_starting_with_letter('As'), [("Assembler", ["VS Code"])])
+
+    def test_mutations_reject_bad_ids(self):
+        """Дополнительный тест: повтор id и связи с несуществующими объектами"""
+        with self.assertRaises(ValueError):
+            self.service.add_tool(DevelopmentTool(1, "Дубликат", 0, 1))
+        with self.assertRaises(ValueError):
+            self.service.add_language(ProgrammingLanguage(1, "Дубликат"))
+        with self.assertRaises(ValueError):
+            self.service.link_tool_language(99, 1)
+        with self.assertRaises(ValueError):
+            self.service.link_tool_language(1, 99)
+
+    def test_query_cache_hits_and_invalidation(self):
+        """Дополнительный тест: повторный запрос берётся из кэша до изменения таблиц"""
+        first = self.service.get_languages_starting_with_letter('A')
+        again = self.service.get_languages_starting_with_letter('A')
+        self.assertEqual(again, first)
+        self.assertIsNot(again, first)
+        self.service.get_languages_starting_with_letter('J')
+        self.service.get_average_tool_cost_by_language()
+        self.assertEqual(self.service.cache.info(), {'hits': 1, 'misses': 3, 'size': 3, 'maxsize': 128})
+
+        # Новая связь затрагивает только запросы по tool_langs
+        self.service.link_tool_language(3, 5)
+        self.assertEqual(self.service.cache.info()['size'], 1)
+        self.assertEqual(self.service.get_languages_starting_with_letter('A'),
+                         [("Ada", ["GNAT Programming Studio", "AdaCore", "Visual Studio Enterprise"])])
+        self.service.get_average_tool_cost_by_language()
+        self.assertEqual(self.service.cache.hits, 2)
+
+        self.service.add_tool(DevelopmentTool(8, "SPARK Pro", 1, 5))
+        self.assertEqual(self.service.cache.info()['size'], 0)
+        self.assertIn(("Ada", 350 / 3), self.service.get_average_tool_cost_by_language())
+
+    def test_cached_results_are_not_shared(self):
+        """Дополнительный тест: изменение полученного результата не портит кэш"""
+        for service in (self.service, ColumnarToolsService(*create_sample_data())):
+            languages = service.get_languages_starting_with_letter('A')
+            languages[0][1].append("Лишний")
+            languages.sort(reverse=True)
+            endings = service.get_tools_by_name_ending('Studio')
+            endings.clear()
+            averages = service.get_average_tool_cost_by_language()
+            averages.append(("Лишний", 0))
+            summaries = service.get_cost_summary_by_language()
+            summaries.pop(5)
+            with self.assertRaises(AttributeError):
+                summaries[1].total = 0
+
+            self.assertEqual(service.get_languages_starting_with_letter('A'),
+                             [("Ada", ["GNAT Programming Studio", "AdaCore"])])
+            self.assertEqual(service.get_tools_by_name_ending('Studio'), [("GNAT Programming Studio", "Ada")])
+            self.assertNotIn(("Лишний", 0), service.get_average_tool_cost_by_language())
+            self.assertEqual(service.get_cost_summary_by_language()[5].count, 2)
+            self.assertGreater(service.cache.hits, 0)
+
+    def test_query_cache_is_bounded(self):
+        """Дополнительный тест: LRU вытесняет самую давнюю запись"""
+        service = ProgrammingToolsService(*create_sample_data(), cache_size=2)
+        for letter in ('A', 'J', 'A', 'P'):
+            service.get_languages_starting_with_letter(letter)
+        self.assertEqual(service.cache.info(), {'hits': 1, 'misses': 3, 'size': 2, 'maxsize': 2})
+        service.get_languages_starting_with_letter('A')
+        service.get_languages_starting_with_letter('J')
+        self.assertEqual((service.cache.hits, service.cache.misses), (2, 4))
+
+    def test_cost_summary_by_language(self):
+        """Дополнительный тест: сумма, количество, min, max и медиана по языкам"""
+        summaries = self.service.get_cost_summary_by_language()
+        java = summaries[2]
+        self.assertEqual((java.total, java.count, java.min, java.max), (249, 2, 0, 249))
+        self.assertAlmostEqual(java.mean, 124.5)
+        self.assertAlmostEqual(java.median, 124.5)
+        self.assertEqual(summaries[1].median, 199)
+        self.assertNotIn(6, summaries)
+
+    def test_aggregate_costs_odd_and_even_groups(self):
+        """Дополнительный тест: медиана для групп чётного и нечётного размера"""
+        summaries = aggregate_costs([1, 2, 1, 2, 1, None], [30, 5, 10, 7, 20, 1], use_numpy=False)
+        self.assertEqual((summaries[1].min, summaries[1].max, summaries[1].median), (10, 30, 20))
+        self.assertEqual(summaries[2].median, 6)
+        self.assertEqual(summaries[None].count, 1)
+        self.assertEqual(aggregate_costs([], []), {})
+
+    @unittest.skipIf(np is None, "NumPy не установлен")
+    def test_numpy_path_matches_python(self):
+        """Дополнительный тест: векторный путь совпадает с чистым Python"""
+        lang_ids = [i % 13 for i in range(1000)]
+        costs = [(i * 37) % 500 for i in range(1000)]
+        expected = aggregate_costs(lang_ids, costs, use_numpy=False)
+        actual = aggregate_costs(lang_ids, costs, use_numpy=True)
+        self.assertEqual(expected.keys(), actual.keys())
+        for lang_id, summary in expected.items():
+            for field in ('total', 'count', 'mean', 'min', 'max', 'median'):
+                self.assertAlmostEqual(getattr(actual[lang_id], field), getattr(summary, field))
+
+
+class TestColumnarToolsService(unittest.TestCase):
+    """Тесты колоночного каталога: ответы совпадают с объектным сервисом"""
+
+    def setUp(self):
+        langs, tools, tool_langs = indexed_catalog(missing_lang_every=97)
+        self.objects = ProgrammingToolsService(langs, tools, tool_langs)
+        self.columns = ColumnarToolsService(langs, tools, tool_langs)
+
+    def test_queries_match_object_service(self):
+        """Колоночный сервис отвечает так же, как объектный"""
+        self.assertEqual(self.columns.get_tools_by_name_ending('ov'),
+                         self.objects.get_tools_by_name_ending('ov'))
+        self.assertEqual(self.columns.get_languages_starting_with_letter('Lang3'),
+                         self.objects.get_languages_starting_with_letter('Lang3'))
+        self.assertEqual(self.columns.get_average_tool_cost_by_language(),
+                         self.objects.get_average_tool_cost_by_language())
+        expected = self.objects.get_cost_summary_by_language()
+        actual = self.columns.get_cost_summary_by_language()
+        self.assertEqual(expected.keys(), actual.keys())
+        self.assertEqual(actual[None].count, expected[None].count)
+        self.assertEqual(self.columns.get_tool_by_id(97).lang_id, None)
+        self.assertEqual(self.columns.get_language_by_id(42).name, "Lang0")
+        self.assertIsNone(self.columns.get_tool_by_id(5000))
+
+    def test_sample_data_and_read_only(self):
+        """Демонстрационные данные и запрет изменений"""
+        service = ColumnarToolsService(*create_sample_data())
+        self.assertEqual(dict(service.get_average_tool_cost_by_language())["Java"], 124.5)
+        self.assertEqual([tl.lang_id for tl in service.tool_langs][:5], [1, 2, 3, 4, 1])
+        with self.assertRaises(ReadOnlyCatalogError):
+            service.add_tool(DevelopmentTool(8, "Новый", 0, 1))
+        self.assertIsNone(service.get_language_by_id(None))
+        self.assertIsNone(service.get_tool_by_id(None))
+
+    def test_tables_intern_names_and_entities_use_slots(self):
+        """Имена интернируются, у сущностей нет __dict__"""
+        table = ToolTable()
+        table.append(1, "".join(["VS ", "Code"]), 0)
+        table.append(2, "".join(["VS ", "Code"]), 0)
+        self.assertIs(table.names[0], table.names[1])
+        self.assertFalse(hasattr(DevelopmentTool(1, "VS Code", 0), '__dict__'))
+
+
+class TestCatalogLoader(unittest.TestCase):
+    """Тесты потоковой загрузки каталога из CSV и JSON Lines"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.langs = self.write("langs.csv", "id,name\n1,Python\n2,Java\n5,Ada\n")
+        self.tools = self.write("tools.jsonl", "\n".join(json.dumps(row) for row in [
+            {'id': 1, 'name': "PyCharm", 'license_cost': 199, 'lang_id': 1},
+            {'id': 2, 'name': "Eclipse IDE", 'license_cost': 0, 'lang_id': 2},
+            {'id': 6, 'name': "GNAT Programming Studio", 'license_cost': 150.5, 'lang_id': 5},
+            {'id': 9, 'name': "Notepad", 'license_cost': 0, 'lang_id': None},
+        ]) + "\n")
+        self.links = self.write("links.csv", "tool_id,lang_id\n1,1\n2,2\n2,5\n6,5\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def test_load_into_service_and_tables(self):
+        """Один и тот же каталог в объектный и колоночный сервис"""
+        service = ProgrammingToolsService()
+        stats = load_into_service(service, self.langs, self.tools, self.links)
+        self.assertEqual(stats, {'langs': 3, 'tools': 4, 'links': 4, 'skipped': 0})
+
+        *tables, table_stats = load_tables(self.langs, self.tools, self.links)
+        columns = ColumnarToolsService.from_tables(*tables)
+        self.assertEqual(table_stats, stats)
+        for result in (service, columns):
+            self.assertEqual(result.get_languages_starting_with_letter('A'),
+                             [("Ada", ["Eclipse IDE", "GNAT Programming Studio"])])
+            self.assertEqual(result.get_tools_by_name_ending('pad'), [("Notepad", "Unknown")])
+        self.assertEqual(service.get_tool_by_id(6).license_cost, 150.5)
+
+    def test_foreign_key_errors(self):
+        """Ссылка на несуществующий язык - ошибка с номером строки или пропуск"""
+        links = self.write("bad_links.csv", "tool_id,lang_id\n1,1\n1,7\n42,1\nx,1\n")
+        with self.assertRaises(CatalogError) as error:
+            load_tables(self.langs, self.tools, links)
+        self.assertIn("bad_links.csv:3", str(error.exception))
+
+        service = ProgrammingToolsService()
+        stats = load_into_service(service, self.langs, self.tools, links, skip_invalid=True)
+        self.assertEqual((stats['links'], stats['skipped']), (1, 3))
+
+    def test_missing_fields_are_invalid_rows(self):
+        """Короткая строка CSV и null в JSON - некорректная строка, а не падение"""
+        langs = self.write("short_langs.csv", "id,name\n1,Python\n2\n")
+        tools_csv = self.write("short_tools.csv", "id,name,license_cost,lang_id\n1,PyCharm,199,1\n2,B\n")
+        tools_jsonl = self.write("null_tools.jsonl", "\n".join(json.dumps(row) for row in [
+            {'id': 1, 'name': "PyCharm", 'license_cost': 199, 'lang_id': 1},
+            {'id': 2, 'name': "Eclipse IDE", 'license_cost': None, 'lang_id': None},
+        ]) + "\n")
+        for tools in (tools_csv, tools_jsonl):
+            with self.subTest(tools=os.path.basename(tools)):
+                with self.assertRaises(CatalogError):
+                    load_tables(self.langs, tools, self.links)
+                *_, stats = load_tables(langs, tools, self.links, skip_invalid=True)
+                self.assertEqual(stats, {'langs': 1, 'tools': 1, 'links': 1, 'skipped': 5})
+                stats = load_into_service(ProgrammingToolsService(), langs, tools, self.links, skip_invalid=True)
+                self.assertEqual(stats, {'langs': 1, 'tools': 1, 'links': 1, 'skipped': 5})
+
+    def test_synthetic_catalog_round_trip(self):
+        """Синтетический каталог: детерминирован и загружается обратно из файлов"""
+        langs, tools, tool_langs = generate_catalog(tools=300, langs=20, fanout=3, names="zipf", seed=7)
+        again = generate_catalog(tools=300, langs=20, fanout=3, names="zipf", seed=7)
+        self.assertEqual([tool.name for tool in tools], [tool.name for tool in again[1]])
+        fanout = len(tool_langs) / len(tools)
+        self.assertTrue(2 < fanout < 4, fanout)
+
+        paths = write_catalog(self.tmpdir.name, "jsonl", tools=300, langs=20, fanout=3, names="zipf", seed=7)
+        *tables, stats = load_tables(*paths)
+        self.assertEqual(stats, {'langs': 20, 'tools': 300, 'links': len(tool_langs), 'skipped': 0})
+        self.assertEqual(list(tables[1].names), list(generate_tables(300, 20, 3, "zipf", 7)[1].names))
+
+    def test_read_only_service_is_rejected(self):
+        """В колоночный каталог по одной записи не загрузить - ясная ошибка до чтения файлов"""
+        with self.assertRaises(ReadOnlyCatalogError):
+            load_into_service(ColumnarToolsService(), self.langs, self.tools, self.links)
+
+    def test_unknown_format(self):
+        """Неизвестное расширение файла"""
+        path = self.write("langs.txt", "1 Python\n")
+        with self.assertRaises(CatalogError):
+            load_tables(path, self.tools, self.links)
+
+
+class TestParallelToolsService(unittest.TestCase):
+    """Тесты параллельного подсчёта агрегатов по шардам lang_id"""
+
+    def test_matches_sequential_summary(self):
+        """Шарды в пуле процессов дают те же агрегаты, что и один процесс"""
+        tables = generate_tables(tools=2000, langs=37, fanout=2, seed=3)
+        expected = ColumnarToolsService.from_tables(*tables).get_cost_summary_by_language()
+        with ParallelToolsService.from_tables(*tables, workers=2, shards=5) as service:
+            actual = service.get_cost_summary_by_language()
+            self.assertEqual(expected.keys(), actual.keys())
+            for lang_id, summary in expected.items():
+                for field in ('total', 'count', 'min', 'max', 'median'):
+                    self.assertAlmostEqual(getattr(actual[lang_id], field), getattr(summary, field))
+            self.assertEqual(len(service.get_average_tool_cost_by_language()), len(expected))
+        self.assertIsNone(service._shared)
+
+    def test_forgotten_service_releases_resources(self):
+        """Без close() блок общей памяти удаляется, а пул останавливается при сборке сервиса"""
+        service = ParallelToolsService(*create_sample_data(), workers=1)
+        service.get_average_tool_cost_by_language()
+        name, executor = service._shared.name, service._executor
+        del service
+        gc.collect()
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+        with self.assertRaises(RuntimeError):
+            executor.submit(len, ())
+
+    def test_split_groups_balances_rows(self):
+        """Группы делятся на шарды подряд и примерно поровну по строкам"""
+        groups = [(1, 0, 10), (2, 10, 20), (3, 20, 60), (4, 60, 70), (5, 70, 80)]
+        self.assertEqual(split_groups(groups, 2), [groups[:3], groups[3:]])
+        self.assertEqual(split_groups(groups, 1), [groups])
+        self.assertEqual(split_groups([], 4), [])
+
+
+class TestSnapshot(unittest.TestCase):
+    """Тесты двоичного снимка каталога, открываемого через mmap"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "catalog.snap")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_snapshot_answers_like_source(self):
+        """Снимок отвечает на запросы так же, как исходный каталог"""
+        source = ColumnarToolsService.from_tables(*generate_tables(tools=3000, langs=60, names="zipf", seed=5))
+        save_snapshot(source, self.path)
+        with SnapshotToolsService.open(self.path) as snapshot:
+            for query, args in (('get_tools_by_name_ending', ('Lab',)),
+                                ('get_tools_by_name_ending', ('lab', True)),
+                                ('get_languages_starting_with_letter', ('Ru',)),
+                                ('get_average_tool_cost_by_language', ())):
+                self.assertEqual(getattr(snapshot, query)(*args), getattr(source, query)(*args), query)
+            tool = snapshot.get_tool_by_id(1234)
+            self.assertEqual((tool.name, tool.lang_id), (source.get_tool_by_id(1234).name,
+                                                         source.get_tool_by_id(1234).lang_id))
+            self.assertIsNone(snapshot.get_language_by_id(61))
+            self.assertEqual([t.id for t in snapshot.tools_linked_to_language(7)],
+                             [t.id for t in source.tools_linked_to_language(7)])
+            self.assertEqual(snapshot.get_cost_summary_by_language()[7].median,
+                             source.get_cost_summary_by_language()[7].median)
+
+    def test_object_service_snapshot(self):
+        """Снимок объектного сервиса с демонстрационными данными"""
+        service = ProgrammingToolsService(*create_sample_data())
+        service.add_tool(DevelopmentTool(8, "Блокнот", 0))
+        save_snapshot(service, self.path)
+        with SnapshotToolsService.open(self.path) as snapshot:
+            self.assertEqual(snapshot.get_languages_starting_with_letter('A'),
+                             [("Ada", ["GNAT Programming Studio", "AdaCore"])])
+            self.assertEqual(snapshot.get_tools_by_name_ending('нот'), [("Блокнот", "Unknown")])
+            self.assertEqual(snapshot.get_cost_summary_by_language()[None].count, 1)
+
+    def test_not_a_snapshot(self):
+        """Чужой или пустой файл - SnapshotError"""
+        for content in (b"", b"not a snapshot at all", b"RK2CATL\x00\x01\x00\x00\x00\x05\x00\x00\x00"):
+            with open(self.path, 'wb') as f:
+                f.write(content)
+            with self.assertRaises(SnapshotError):
+                SnapshotToolsService.open(self.path)
+
+
+class TestQuery(unittest.TestCase):
+    """Тесты слоя запросов: фильтр, соединения, группировка, сортировка"""
+
+    def setUp(self):
+        data = create_sample_data()
+        self.services = [ProgrammingToolsService(*data), ColumnarToolsService(*data)]
+
+    def test_join_language_group_and_sort(self):
+        """Самый дорогой инструмент каждого языка через один-ко-многим"""
+        for service in self.services:
+            report = (service.query_tools()
+                      .join_language()
+                      .group(lambda pair: pair[1].name,
+                             lambda pairs: max(tool.license_cost for tool, _ in pairs))
+                      .sort(key=lambda row: (-row[1], row[0]))
+                      .to_list())
+            self.assertEqual(report, [("C++", 299), ("Java", 249), ("Ada", 199),
+                                      ("Python", 199), ("JavaScript", 0)])
+
+    def test_join_language_keeps_tools_without_language(self):
+        """keep_missing=True: инструмент без языка остаётся в паре с None"""
+        langs, tools, tool_langs = create_sample_data()
+        tools.append(DevelopmentTool(8, "Notepad", 0))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "catalog.snap")
+            save_snapshot(ProgrammingToolsService(langs, tools, tool_langs), path)
+            with SnapshotToolsService.open(path) as snapshot:
+                for service in (ProgrammingToolsService(langs, tools, tool_langs),
+                                ColumnarToolsService(langs, tools, tool_langs), snapshot):
+                    pairs = service.query_tools().join_language(keep_missing=True).to_list()
+                    self.assertEqual(len(pairs), 8)
+                    self.assertEqual((pairs[-1][0].name, pairs[-1][1]), ("Notepad", None))
+                    self.assertEqual(len(service.query_tools().join_language().to_list()), 7)
+
+    def test_join_tools_many_to_many(self):
+        """Через tool_langs получается то же, что в get_languages_starting_with_letter"""
+        for service in self.services:
+            pairs = (service.query_languages()
+                     .filter(lambda lang: lang.name.startswith('J'))
+                     .join_tools(via='tool_langs')
+                     .map(lambda pair: (pair[0].name, pair[1].name))
+                     .to_list())
+            self.assertEqual(pairs, [("Java", "IntelliJ IDEA Ultimate"), ("Java", "VS Code"),
+                                     ("Java", "Eclipse IDE"), ("JavaScript", "VS Code")])
+            one_to_many = service.query_languages().join_tools(via='lang_id').to_list()
+            self.assertEqual(len(one_to_many), 7)
+
+    def test_steps_run_only_on_iteration(self):
+        """Ни фильтр, ни сортировка не читают строки до обхода результата"""
+        calls = []
+        service = self.services[0]
+        query = (service.query_tools()
+                 .filter(lambda tool: calls.append('filter') or True)
+                 .sort(key=lambda tool: calls.append('sort') or tool.id))
+        self.assertEqual(calls, [])
+        self.assertEqual([tool.id for tool in query], list(range(1, 8)))
+        self.assertEqual(calls.count('sort'), 7)
+
+    def test_hash_join(self):
+        """Произвольное хеш-соединение по ключам"""
+        service = self.services[0]
+        free = [tool for tool in service.tools if tool.license_cost == 0]
+        rows = (service.query_languages()
+                .join(free, lambda lang: lang.id, lambda tool: tool.lang_id)
+                .map(lambda pair: (pair[0].name, pair[1].name))
+                .to_list())
+        self.assertEqual(rows, [("Java", "Eclipse IDE"), ("JavaScript", "VS Code")])
+
 
 class TestDataModels(unittest.TestCase):
     """Тесты для моделей данных"""
@@ -1,5 +1,14 @@
-import sys
+import argparse
+import itertools
 import math
+import sys
+from array import array
+from contextlib import ExitStack
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него solve_batch решает уравнения по одному
+    np = None
 
 def read_coefficient(name, args, index):
     value = None
@@ -18,29 +27,86 @@ def read_coefficient(name, args, index):
     return value
 
 
-def solve_equation(a, b, c):
-    print(f"\nУравнение: {a} * x^4 + {b} * x^2 + {c} = 0")
+def real_roots(a, b, c):
+    """Действительные корни a * x^4 + b * x^2 + c = 0 без вывода на экран.
 
-    D = b**2 - 4*a*c
-    print(f"D = {D}")
+    Для каждого корня y уравнения по y = x^2 (квадратного, а при a == 0 -
+    линейного b * y + c = 0): y > 0 даёт два корня ±sqrt(y), y == 0 - один
+    корень 0. При a == b == 0 список пуст: при c != 0 корней нет, при
+    c == 0 корнем является любое x.
+    """
+    if a == 0:
+        if b == 0:
+            return []
+        ys = (-c / b,)
+    else:
+        D = b**2 - 4*a*c
+        if D < 0:
+            return []
+        ys = ((-b + math.sqrt(D)) / (2 * a), (-b - math.sqrt(D)) / (2 * a))
 
     roots = []
-
-    if D < 0:
-        print("Действительных корней нет.")
-        return roots
-
-    y1 = (-b + math.sqrt(D)) / (2 * a)
-    y2 = (-b - math.sqrt(D)) / (2 * a)
-
-    for y in (y1, y2):
+    for y in ys:
         if y > 0:
             roots.append(math.sqrt(y))
             roots.append(-math.sqrt(y))
         elif y == 0:
             roots.append(0)
 
-    if roots:
+    return roots
+
+
+def solve_batch(a, b, c):
+    """Решает сразу много уравнений: a, b, c - массивы коэффициентов одной формы.
+
+    Возвращает (roots, counts): roots формы (..., 4) с корнями в том же
+    порядке, что и real_roots, дополненными NaN, и counts - число корней
+    каждого уравнения. С NumPy всё считается векторно, без цикла по
+    уравнениям; без NumPy - списки той же структуры.
+    """
+    if np is None:
+        roots, counts = [], []
+        for coefficients in zip(a, b, c):
+            found = real_roots(*coefficients)
+            roots.append(found + [math.nan] * (4 - len(found)))
+            counts.append(len(found))
+        return roots, counts
+
+    a, b, c = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (a, b, c)))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        D = b * b - 4 * a * c
+        sqrt_d = np.sqrt(np.where(D >= 0, D, np.nan))
+        y = np.stack([(-b + sqrt_d) / (2 * a), (-b - sqrt_d) / (2 * a)], axis=-1)
+        # a == 0: единственный y = -c / b, при a == b == 0 корней в списке нет
+        linear = np.where(b != 0, -c / b, np.nan)
+        y = np.where(a[..., None] != 0, y, np.stack([linear, np.full_like(linear, np.nan)], axis=-1))
+        sqrt_y = np.sqrt(np.where(y >= 0, y, np.nan))
+
+    # Кандидаты +sqrt(y1), -sqrt(y1), +sqrt(y2), -sqrt(y2); при y == 0 годится только первый из пары
+    shape = y.shape[:-1] + (4,)
+    candidates = np.stack([sqrt_y, -sqrt_y], axis=-1).reshape(shape)
+    valid = np.stack([y >= 0, y > 0], axis=-1).reshape(shape)
+
+    # Устойчивая сортировка по признаку "не корень" сдвигает корни влево, сохраняя порядок
+    order = np.argsort(~valid, axis=-1, kind='stable')
+    roots = np.take_along_axis(candidates, order, axis=-1)
+    counts = valid.sum(axis=-1)
+    roots[np.arange(4) >= counts[..., None]] = np.nan
+    return roots, counts
+
+
+def solve_equation(a, b, c):
+    print(f"\nУравнение: {a} * x^4 + {b} * x^2 + {c} = 0")
+
+    D = b**2 - 4*a*c
+    print(f"D = {D}")
+
+    batch_roots, counts = solve_batch([a], [b], [c])
+    roots = [0 if root == 0 else float(root) for root in list(batch_roots[0])[:int(counts[0])]]
+
+    if a == b == c == 0:
+        print("Корнем является любое x.")
+    elif roots:
         print("Действительные корни:", ", ".join(map(str, roots)))
     else:
         print("Действительных корней нет.")
@@ -48,11 +114,146 @@ def solve_equation(a, b, c):
     return roots
 
 
-def main():
-    args = sys.argv[1:]
-    a = read_coefficient("A", args, 0)
-    b = read_coefficient("B", args, 1)
-    c = read_coefficient("C", args, 2)
+CHUNK_SIZE = 65536
+TRIPLE_BYTES = 3 * 8  # три float64 little-endian на уравнение
+
+
+def read_chunks(stream, file_format="csv", chunk_size=CHUNK_SIZE):
+    """Читает тройки коэффициентов кусками по chunk_size уравнений: выдаёт (a, b, c).
+
+    csv - строки "a,b,c" (пустые строки и строки с # пропускаются),
+    binary - подряд идущие тройки float64 little-endian.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"размер куска должен быть не меньше 1, получено {chunk_size}")
+    if file_format == "binary":
+        while True:
+            data = stream.read(chunk_size * TRIPLE_BYTES)
+            if not data:
+                return
+            if len(data) % TRIPLE_BYTES:
+                raise ValueError("длина двоичного входа не кратна 24 байтам (три float64)")
+            if np is not None:
+                values = np.frombuffer(data, dtype='<f8').reshape(-1, 3)
+                yield values[:, 0], values[:, 1], values[:, 2]
+            else:
+                values = array('d', data)
+                if sys.byteorder != 'little':
+                    values.byteswap()
+                yield values[0::3], values[1::3], values[2::3]
+        return
+
+    line_number = 0
+    while True:
+        lines = list(itertools.islice(stream, chunk_size))
+        if not lines:
+            return
+        rows = []
+        for line in lines:
+            line_number += 1
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                a, b, c = (float(value) for value in line.split(','))
+            except ValueError:
+                raise ValueError(f"строка {line_number}: ожидается 'a,b,c', получено {line!r}") from None
+            rows.append((a, b, c))
+        if rows:
+            if np is not None:
+                values = np.array(rows, dtype=np.float64)
+                yield values[:, 0], values[:, 1], values[:, 2]
+            else:
+                yield tuple(list(column) for column in zip(*rows))
+
+
+def write_roots(stream, roots, counts, file_format="csv"):
+    """csv - по строке на уравнение с корнями через запятую (пустая, если корней нет);
+    binary - по четыре float64 little-endian на уравнение, недостающие корни - NaN."""
+    if file_format == "binary":
+        if np is not None:
+            stream.write(np.asarray(roots, dtype='<f8').tobytes())
+        else:
+            values = array('d', (root for row in roots for root in row))
+            if sys.byteorder != 'little':
+                values.byteswap()
+            stream.write(values.tobytes())
+        return
+
+    rows = roots.tolist() if np is not None else roots
+    counts = counts.tolist() if np is not None else counts
+    # + 0.0 приводит -0.0 и целый 0 из real_roots к одному виду 0.0
+    stream.write("".join(",".join(repr(root + 0.0) for root in row[:count]) + "\n"
+                         for row, count in zip(rows, counts)))
+
+
+def stream_solve(source, output, input_format="csv", output_format="csv", chunk_size=CHUNK_SIZE):
+    """Решает уравнения из source кусками и сразу пишет корни в output;
+    в памяти одновременно не больше одного куска. Возвращает число уравнений."""
+    total = 0
+    for a, b, c in read_chunks(source, input_format, chunk_size):
+        roots, counts = solve_batch(a, b, c)
+        write_roots(output, roots, counts, output_format)
+        total += len(counts)
+    return total
+
+
+def run_stream(args):
+    def open_stream(path, mode, std):
+        binary = 'b' in mode
+        if path == '-':
+            return std.buffer if binary else std
+        return open(path, mode, **({} if binary else {'encoding': 'utf-8', 'newline': ''}))
+
+    try:
+        with ExitStack() as stack:
+            source = open_stream(args.stream, 'rb' if args.input_format == 'binary' else 'r', sys.stdin)
+            if source not in (sys.stdin, sys.stdin.buffer):
+                stack.enter_context(source)
+            output = open_stream(args.output, 'wb' if args.output_format == 'binary' else 'w', sys.stdout)
+            if output not in (sys.stdout, sys.stdout.buffer):
+                stack.enter_context(output)
+            total = stream_solve(source, output, args.input_format, args.output_format, args.chunk_size)
+    except (OSError, ValueError) as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Решено уравнений: {total}", file=sys.stderr)
+
+
+def chunk_size_arg(value):
+    size = int(value)
+    if size < 1:
+        raise argparse.ArgumentTypeError(f"ожидается целое число не меньше 1, получено {value}")
+    return size
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+
+    # Отрицательные коэффициенты ("-5", "-1e3", "-inf") argparse принял бы за
+    # опции, поэтому без флагов "--..." аргументы разбираются как раньше
+    if not any(arg.startswith('--') for arg in args):
+        solve_equation(read_coefficient("A", args, 0), read_coefficient("B", args, 1),
+                       read_coefficient("C", args, 2))
+        return
+
+    parser = argparse.ArgumentParser(description="Решение биквадратного уравнения A*x^4 + B*x^2 + C = 0")
+    parser.add_argument('coefficients', nargs='*', help="коэффициенты A B C (недостающие спрашиваются)")
+    parser.add_argument('--stream', metavar='FILE', nargs='?', const='-',
+                        help="потоковый режим: тройки коэффициентов из файла или stdin ('-')")
+    parser.add_argument('--input-format', choices=['csv', 'binary'], default='csv')
+    parser.add_argument('--output', metavar='FILE', default='-', help="куда писать корни (по умолчанию stdout)")
+    parser.add_argument('--output-format', choices=['csv', 'binary'], default='csv')
+    parser.add_argument('--chunk-size', type=chunk_size_arg, default=CHUNK_SIZE, help="уравнений в одном куске")
+    options = parser.parse_args(args)
+
+    if options.stream is not None:
+        run_stream(options)
+        return
+
+    a = read_coefficient("A", options.coefficients, 0)
+    b = read_coefficient("B", options.coefficients, 1)
+    c = read_coefficient("C", options.coefficients, 2)
 
     solve_equation(a, b, c)
 
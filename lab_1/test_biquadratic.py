@@ -0,0 +1,178 @@
+# test_biquadratic.py
+import importlib.util
+import io
+import math
+import os
+import struct
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest.mock import patch
+
+# main.py есть и в других каталогах репозитория, поэтому модуль
+# загружается по пути под собственным именем
+_spec = importlib.util.spec_from_file_location(
+    "biquadratic_main", os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py"))
+main = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(main)
+
+# (a, b, c, ожидаемые корни в порядке real_roots)
+CASES = [
+    (1, -5, 4, [2.0, -2.0, 1.0, -1.0]),    # два положительных y
+    (1, 2, 3, []),                         # D < 0
+    (1, -2, 1, [1.0, -1.0, 1.0, -1.0]),    # D == 0, y > 0
+    (1, 2, 1, []),                         # D == 0, y < 0
+    (1, -4, 0, [2.0, -2.0, 0]),            # один из y == 0
+    (1, 0, 0, [0, 0]),                     # D == 0, y == 0
+    (1, 0, -16, [2.0, -2.0]),              # y разных знаков
+    (0, 1, -4, [2.0, -2.0]),               # a == 0: x^2 = 4
+    (0, 1, 4, []),                         # a == 0: x^2 = -4
+    (0, 3, 0, [0]),                        # a == 0: x^2 = 0
+    (0, 0, 5, []),                         # a == b == 0, c != 0
+    (0, 0, 0, []),                         # a == b == c == 0
+]
+
+
+class TestBiquadratic(unittest.TestCase):
+
+    def assertBatchMatchesScalar(self, roots, counts):
+        for (a, b, c, expected), row, count in zip(CASES, roots, counts):
+            with self.subTest(a=a, b=b, c=c):
+                self.assertEqual(main.real_roots(a, b, c), expected)
+                self.assertEqual(count, len(expected))
+                self.assertEqual(list(row[:count]), expected)
+                self.assertEqual(len(row), 4)
+                self.assertTrue(all(math.isnan(root) for root in row[count:]))
+
+    def columns(self):
+        return [[case[i] for case in CASES] for i in range(3)]
+
+    def test_real_roots_cases(self):
+        """real_roots на граничных случаях: D < 0, D == 0, y == 0, a == 0"""
+        for a, b, c, expected in CASES:
+            with self.subTest(a=a, b=b, c=c):
+                self.assertEqual(main.real_roots(a, b, c), expected)
+
+    @unittest.skipIf(main.np is None, "нужен NumPy")
+    def test_solve_batch_matches_real_roots(self):
+        """Векторное решение совпадает с поштучным, хвост дополнен NaN"""
+        roots, counts = main.solve_batch(*self.columns())
+        self.assertEqual(roots.shape, (len(CASES), 4))
+        self.assertBatchMatchesScalar(roots.tolist(), counts.tolist())
+
+    @unittest.skipIf(main.np is None, "нужен NumPy")
+    def test_solve_batch_broadcasts(self):
+        """Коэффициенты разной формы приводятся к общей"""
+        roots, counts = main.solve_batch([[1], [0]], [-5, 1], 4)
+        self.assertEqual(roots.shape, (2, 2, 4))
+        self.assertEqual(counts.tolist(), [[4, 0], [2, 0]])
+
+    def test_solve_batch_without_numpy(self):
+        """Без NumPy solve_batch возвращает списки той же структуры"""
+        with patch.object(main, 'np', None):
+            roots, counts = main.solve_batch(*self.columns())
+        self.assertIsInstance(roots, list)
+        self.assertBatchMatchesScalar(roots, counts)
+
+
+class TestStreamSolve(unittest.TestCase):
+
+    CSV = "1,-5,4\n# комментарий\n\n1,2,3\n0,1,-4\n1,0,0\n"
+    EXPECTED = "2.0,-2.0,1.0,-1.0\n\n2.0,-2.0\n0.0,0.0\n"
+    TRIPLES = [(1, -5, 4), (1, 2, 3), (0, 1, -4), (1, 0, 0)]
+
+    def binary_input(self):
+        return io.BytesIO(b"".join(struct.pack('<3d', *triple) for triple in self.TRIPLES))
+
+    def test_csv_round_trip(self):
+        """CSV -> CSV кусками разного размера: комментарии и пустые строки пропускаются"""
+        for chunk_size in (1, 2, 100):
+            with self.subTest(chunk_size=chunk_size):
+                output = io.StringIO()
+                self.assertEqual(main.stream_solve(io.StringIO(self.CSV), output, chunk_size=chunk_size), 4)
+                self.assertEqual(output.getvalue(), self.EXPECTED)
+
+    def test_binary_round_trip(self):
+        """binary -> binary: по четыре float64 на уравнение, недостающие корни - NaN"""
+        output = io.BytesIO()
+        total = main.stream_solve(self.binary_input(), output, 'binary', 'binary', chunk_size=3)
+        self.assertEqual(total, 4)
+        rows = list(struct.iter_unpack('<4d', output.getvalue()))
+        self.assertEqual(len(rows), 4)
+        for (a, b, c), row in zip(self.TRIPLES, rows):
+            expected = main.real_roots(a, b, c)
+            self.assertEqual(list(row[:len(expected)]), expected)
+            self.assertTrue(all(math.isnan(root) for root in row[len(expected):]))
+
+    def test_binary_to_csv_without_numpy(self):
+        """Без NumPy результат тот же"""
+        output = io.StringIO()
+        with patch.object(main, 'np', None):
+            main.stream_solve(self.binary_input(), output, 'binary', chunk_size=2)
+        self.assertEqual(output.getvalue(), self.EXPECTED)
+
+    def test_malformed_csv_line(self):
+        """Ошибка называет номер строки; уже решённые куски записаны"""
+        output = io.StringIO()
+        with self.assertRaisesRegex(ValueError, "строка 3"):
+            main.stream_solve(io.StringIO("1,-5,4\n1,2,3\n1,x\n"), output, chunk_size=2)
+        self.assertEqual(output.getvalue(), "2.0,-2.0,1.0,-1.0\n\n")
+
+    def test_truncated_binary_tail(self):
+        """Обрезанная последняя тройка - ошибка, а не молча потерянное уравнение"""
+        data = self.binary_input().getvalue()[:-8]
+        with self.assertRaisesRegex(ValueError, "24 байтам"):
+            main.stream_solve(io.BytesIO(data), io.BytesIO(), 'binary', 'binary')
+
+    def test_chunk_size_must_be_positive(self):
+        for chunk_size in (0, -1):
+            with self.subTest(chunk_size=chunk_size), self.assertRaises(ValueError):
+                main.stream_solve(io.StringIO(self.CSV), io.StringIO(), chunk_size=chunk_size)
+
+
+class TestCommandLine(unittest.TestCase):
+
+    def run_main(self, *args):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            main.main(list(args))
+        return out.getvalue()
+
+    def test_negative_coefficients(self):
+        """Отрицательные коэффициенты в argv - числа, а не опции"""
+        self.assertIn("Действительные корни: 2.0, -2.0, 1.0, -1.0", self.run_main("1", "-5", "4"))
+        self.assertIn("Уравнение: 1.0 * x^4 + -1000.0 * x^2 + 4.0 = 0", self.run_main("1", "-1e3", "4"))
+        self.assertIn("Уравнение: -5.0 * x^4 + -inf * x^2 + 1.0 = 0", self.run_main("-5.", "-inf", "1"))
+        self.assertIn("Действительные корни: 2.0, -2.0", self.run_main("--", "0", "-1", "4"))
+
+    def test_stream_file_errors(self):
+        """Недоступный файл - сообщение и ненулевой код, входной файл закрыт"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = os.path.join(tmpdir, "in.csv")
+            with open(source, "w", encoding="utf-8") as f:
+                f.write("1,-5,4\n")
+            opened = []
+            real_open = open
+
+            def tracking_open(*args, **kwargs):
+                opened.append(real_open(*args, **kwargs))
+                return opened[-1]
+
+            cases = [
+                ("--stream", os.path.join(tmpdir, "missing.csv")),
+                ("--stream", source, "--output", os.path.join(tmpdir, "no-such-dir", "out.csv")),
+            ]
+            for args in cases:
+                with self.subTest(args=args):
+                    err = io.StringIO()
+                    with patch("builtins.open", tracking_open), redirect_stderr(err), \
+                            self.assertRaises(SystemExit) as cm:
+                        main.main(list(args))
+                    self.assertEqual(cm.exception.code, 1)
+                    self.assertIn("Ошибка:", err.getvalue())
+            self.assertEqual(len(opened), 1)
+            self.assertTrue(opened[0].closed)
+
+
+if __name__ == '__main__':
+    unittest.main()